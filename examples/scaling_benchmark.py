@@ -0,0 +1,51 @@
+# scaling_benchmark.py - benchmark for nondimensionalized simulation
+# AP, 19 Oct 2026
+#
+# This script compares the number of integrator steps (and the run
+# time) needed to simulate a gene expression mixture in concentration
+# units and in nondimensional variables (see
+# ReactionNetwork.set_scaling()).  The steps are counted by recording
+# the outputs at every step of the integrator (sampling='adaptive').
+#
+
+import time
+import numpy as np
+import txtl
+
+# Gene expression mixture (as in tests/geneexpr_test.py)
+tube1 = txtl.extract('BL21_DE3')
+tube2 = txtl.buffer('stdbuffer')
+tube3 = txtl.newtube('geneexpr')
+txtl.add_dna(tube3, txtl.assemble_dna('ptet(50)', 'BCD2(20)', 'tetR(1200)'),
+             1, 'plasmid')
+txtl.add_dna(tube3, txtl.assemble_dna(
+    txtl.RepressedPromoter('ptet', 'tetR', dimer=True), 'BCD2(20)',
+    txtl.ProteinCDS('deGFP', maturation_time=30*txtl.minutes),
+    txtl.DegradationTag('lva', 'clpXP')), 1, 'plasmid')
+well = txtl.combine_tubes([tube1, tube2, tube3])
+
+network = txtl.compile_mixture(well)
+scaled = txtl.compile_mixture(well, scale=True)
+print(network)
+print("characteristic time: %g s" % scaled.scaling.time)
+
+duration = 8 * txtl.hours
+print("%-8s %14s %14s %10s" % ("method", "steps", "time [ms]", "max error"))
+for method in ('LSODA', 'BDF', 'Radau'):
+    results, times = [], []
+    for model in (network, scaled):
+        start = time.perf_counter()
+        results.append(txtl.runsim(model, duration, sampling='adaptive',
+                                   method=method))
+        times.append(1000 * (time.perf_counter() - start))
+
+    # Compare the trajectories at common time points
+    reference, values = [txtl.runsim(model, duration, npts=50,
+                                     method=method).values
+                         for model in (network, scaled)]
+    error = np.max(np.abs(values - reference) /
+                   (np.abs(reference).max(axis=0) + 1e-9))
+
+    steps = [len(result.timepoints) - 1 for result in results]
+    print("%-8s %6d -> %-6d %6.0f -> %-6.0f %10.1e" % (
+        method, steps[0], steps[1], times[0], times[1], error))
@@ -16,13 +16,17 @@ setup(
     description = 'TX-TL simulation toolbox in Python',
     long_description = long_description,
     packages = ['txtl', 'tests'],
+    python_requires = '>=3.8',
+    entry_points = {
+        'console_scripts': ['txtl = txtl.cli:main'],
+    },
     classifiers = [
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Science/Research',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: BSD License',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.8',
         'Topic :: Software Development',
         'Topic :: Scientific/Engineering',
         'Operating System :: POSIX',
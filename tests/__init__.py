@@ -0,0 +1,5 @@
+# __init__.py - initialization of the txtl test suite
+# AP, 19 Oct 2026
+
+# This file is here so that the test modules form a package and can
+# share helper modules (eg, conversion.py) using relative imports.
@@ -1,6 +1,9 @@
 # assemble_dna_test.py - test suite for DNA assembly
 # RMM, 26 Aug 2018
 
+import gc
+import sys
+import weakref
 import unittest
 import txtl
 
@@ -39,5 +42,58 @@ class TestAssembleDNA(unittest.TestCase):
         
         #! TODO: make sure everything was set up correctly
 
+class TestAssemblySpecies(unittest.TestCase):
+
+    def setUp(self):
+        self.mixture = txtl.create_extract('BL21_DE3')
+        self.repressor = txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', 'tetR(1200)')
+        txtl.add_dna(self.mixture, self.repressor, 1, 'plasmid')
+        self.gene = txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', txtl.ProteinCDS('deGFP', 1000))
+        txtl.add_dna(self.mixture, self.gene, 1, 'plasmid')
+
+    def test_species_indices(self):
+        network = txtl.compile_mixture(self.mixture)
+        gene = self.gene
+        for name, index in [
+                ('DNA_ptet_BCD2_deGFP', gene.dna),
+                ('RNA_BCD2_deGFP', gene.rna),
+                ('Protein_deGFP', gene.protein),
+                ('Protein_deGFP', gene.cds.protein),
+                ('Complex_RNAP_ptet_BCD2_deGFP', gene.rnap_bound),
+                ('Complex_Ribo_BCD2_deGFP', gene.ribo_bound),
+                ('Complex_Protein_tetR_dimer_ptet_BCD2_deGFP',
+                 gene.promoter.tf_bound)]:
+            self.assertIsInstance(index, int)
+            self.assertEqual(network.species[index], name)
+            self.assertEqual(
+                txtl.species_index(self.mixture, name), index)
+        self.assertEqual(gene.rnaname, 'BCD2--deGFP')
+        self.assertEqual(gene.protname, 'deGFP')
+        self.assertEqual(network.species[self.repressor.cds.dimer],
+                         'Protein_tetR_dimer')
+
+        # Both assemblies were created from templates
+        self.assertEqual(set(self.mixture._templates.instances), {1, 2})
+
+    def test_slots(self):
+        self.mixture._update_sbml_model()
+        for obj in (self.gene, self.gene.promoter, self.gene.utr5,
+                    self.gene.cds):
+            self.assertFalse(hasattr(obj, '__dict__'))
+        self.assertLess(sys.getsizeof(self.gene), 256)
+
+    def test_release_document(self):
+        self.mixture._update_sbml_model()
+        document = weakref.ref(self.mixture.document)
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            del self.mixture
+            self.assertIsNone(document())
+        finally:
+            if enabled: gc.enable()
+
 if __name__ == '__main__':
     unittest.main()
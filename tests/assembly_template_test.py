@@ -0,0 +1,120 @@
+# assembly_template_test.py - test suite for assembly templates
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from txtl.parameter import load_config
+from txtl.network import compile_mixture
+from txtl.template import AssemblyTemplate, TemplateError
+
+class TestAssemblyTemplates(unittest.TestCase):
+
+    def tearDown(self):
+        txtl.Mixture.use_templates = True
+
+    # Create a mixture with several genes of the same architecture
+    def make_mixture(self, ngenes=4):
+        mixture = txtl.create_extract('BL21_DE3')
+        parameters = load_config('BL21_DE3.csv')
+        mixture.components[0].parameters = parameters
+        mixture.parameters = parameters
+        txtl.add_dna(mixture, txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', 'tetR(1200)'), 1, 'plasmid')
+        genes = []
+        for i in range(ngenes):
+            genes.append(txtl.assemble_dna(
+                'ptet(50)', 'BCD2(20)', txtl.ProteinCDS('deGFP%d' % i, 1000)))
+            txtl.add_dna(mixture, genes[-1], 1 + i, 'plasmid')
+        return mixture, genes
+
+    # Compile a mixture with and without templates
+    def compile(self, setup=None):
+        networks = []
+        for use_templates in (True, False):
+            txtl.Mixture.use_templates = use_templates
+            mixture, genes = self.make_mixture()
+            if setup is not None:
+                setup(genes)
+            networks.append(compile_mixture(mixture))
+        return networks
+
+    # Check that two networks describe the same dynamics
+    def assertSameNetwork(self, first, second):
+        self.assertEqual(list(first.species), list(second.species))
+        np.testing.assert_allclose(first.x0, second.x0)
+        self.assertEqual(first.nreactions, second.nreactions)
+        x = np.random.default_rng(1).random(first.nspecies)
+        np.testing.assert_allclose(
+            first.rhs(0, x, first.k), second.rhs(0, x, second.k))
+
+    def test_network(self):
+        first, second = self.compile()
+        self.assertSameNetwork(first, second)
+
+    def test_parameter_substitution(self):
+        def setup(genes):
+            genes[2].promoter.parameters['RNAPbound_F'] = 7.5
+        first, second = self.compile(setup)
+        self.assertSameNetwork(first, second)
+
+    def test_sbml(self):
+        models = []
+        for use_templates in (True, False):
+            txtl.Mixture.use_templates = use_templates
+            mixture, genes = self.make_mixture()
+            mixture._update_sbml_model()
+            model = mixture.model
+            models.append((
+                sorted(s.getId() for s in model.getListOfSpecies()),
+                sorted((sorted(r.getId() for r in rxn.getListOfReactants()),
+                        sorted(p.getId() for p in rxn.getListOfProducts()))
+                       for rxn in model.getListOfReactions())))
+        self.assertEqual(models[0], models[1])
+
+    def test_compiled_model(self):
+        # The model of a compiled mixture includes the templated reactions
+        mixture, genes = self.make_mixture()
+        network = compile_mixture(mixture)
+        self.assertEqual(mixture.model.getNumReactions(), network.nreactions)
+        self.assertEqual(mixture.model.getNumSpecies(), network.nspecies)
+
+    def test_rounding(self):
+        # Concentrations that differ by rounding error are recognized
+        template = AssemblyTemplate.__new__(AssemblyTemplate)
+        value = template._classify(0.75 * 0.1, 1.25 * 0.1)
+        self.assertEqual(value.kind, 'conc')
+        self.assertAlmostEqual(value.data, 0.1)
+        self.assertRaises(TemplateError, template._classify, 0.75, 1.5)
+
+    def test_reuse(self):
+        mixture, genes = self.make_mixture()
+        mixture._update_sbml_model()
+        templates = [t for t in mixture._templates.templates.values()
+                     if t is not None]
+        self.assertEqual(len(mixture._templates.instances), len(genes) + 1)
+        self.assertEqual(len(templates), 2)
+
+        # Assemblies can opt out of templates
+        genes[0].template = False
+        mixture._update_sbml_model()
+        self.assertEqual(len(mixture._templates.instances), len(genes))
+
+    def test_recording_errors(self):
+        # Errors other than TemplateError are not hidden by a fallback
+        # to the update functions (here, the element only fails while
+        # the template is being recorded)
+        class BrokenCDS(txtl.ProteinCDS):
+            __slots__ = ()
+            def update_reactions(self, mixture, debug=False):
+                if self.name.startswith('__txtl'):
+                    raise RuntimeError("broken element")
+                txtl.ProteinCDS.update_reactions(self, mixture, debug)
+
+        mixture, genes = self.make_mixture(0)
+        txtl.add_dna(mixture, txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', BrokenCDS('deGFP', 1000)), 1, 'plasmid')
+        self.assertRaises(RuntimeError, mixture._update_sbml_model)
+
+if __name__ == '__main__':
+    unittest.main()
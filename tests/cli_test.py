@@ -0,0 +1,84 @@
+# cli_test.py - test suite for the txtl console command
+# AP, 19 Oct 2026
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from txtl.cli import main, load_experiment, expand_runs
+
+experiment = {
+    'name': 'geneexpr',
+    'mixture': {
+        'extract': 'BL21_DE3', 'buffer': 'stdbuffer',
+        'dna': [
+            {'parts': ['ptet(50)', 'BCD2(20)', 'tetR(1200)'], 'conc': 1,
+             'type': 'plasmid'},
+            {'parts': ['ptet(50)', 'BCD2(20)',
+                       {'type': 'ProteinCDS', 'name': 'deGFP'}],
+             'conc': 1}]},
+    'duration': 3600,
+    'npts': 5,
+    'species': ['Protein_deGFP', 'Protein_tetR'],
+    'sweep': {'dna.1.conc': [0.5, 2], 'dna.0.conc': [0, 1]},
+    'output': 'results'}
+
+class TestCommandLine(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'geneexpr.json')
+        with open(self.filename, 'w') as file:
+            json.dump(experiment, file)
+        self.output = os.path.join(self.tmpdir, 'results')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_expand(self):
+        runs = expand_runs(load_experiment(self.filename))
+        self.assertEqual([values for name, values, spec, key in runs], [
+            {'dna.0.conc': 0, 'dna.1.conc': 0.5},
+            {'dna.0.conc': 0, 'dna.1.conc': 2},
+            {'dna.0.conc': 1, 'dna.1.conc': 0.5},
+            {'dna.0.conc': 1, 'dna.1.conc': 2}])
+        self.assertEqual(runs[3][2]['dna'][1]['conc'], 2)
+        self.assertEqual(len(set(key for name, values, spec, key in runs)), 4)
+
+        with self.assertRaises(ValueError):
+            expand_runs(dict(experiment, sweep={'dna.5.conc': [1]}))
+        with self.assertRaises(ValueError):
+            expand_runs(dict(experiment, sweeps={}))
+
+    def test_run(self):
+        self.assertEqual(main(['run', '-q', '-j', '2', self.filename]), 0)
+        with open(os.path.join(self.output, 'manifest.json')) as file:
+            manifest = json.load(file)['runs']
+        self.assertEqual(sorted(manifest), ['run_0000', 'run_0001',
+                                            'run_0002', 'run_0003'])
+
+        # More DNA gives more protein; no tetR without the tetR gene
+        data = [np.genfromtxt(os.path.join(self.output, manifest[name]['file']),
+                              delimiter=',', names=True)
+                for name in sorted(manifest)]
+        self.assertEqual(data[0].dtype.names,
+                         ('time', 'Protein_deGFP', 'Protein_tetR'))
+        self.assertTrue(np.all(data[0]['Protein_tetR'] == 0))
+        self.assertGreater(data[1]['Protein_deGFP'][-1],
+                           data[0]['Protein_deGFP'][-1])
+        self.assertGreater(data[0]['Protein_deGFP'][-1],
+                           data[2]['Protein_deGFP'][-1])
+
+        # Completed runs are not repeated
+        os.remove(os.path.join(self.output, 'run_0001.csv'))
+        mtime = os.path.getmtime(os.path.join(self.output, 'run_0000.csv'))
+        self.assertEqual(main(['run', '-q', self.filename]), 0)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.output, 'run_0001.csv')))
+        self.assertEqual(mtime, os.path.getmtime(
+            os.path.join(self.output, 'run_0000.csv')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# codegen_test.py - test suite for generated network code
+# AP, 19 Oct 2026
+
+import os
+import sys
+import time
+import pickle
+import tempfile
+import unittest
+import unittest.mock
+import numpy as np
+import txtl
+from txtl.parameter import load_config
+from .conversion import conversion_mixture
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+class TestCodegen(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.network = txtl.compile_mixture(conversion_mixture())
+        self.x = np.array([50., 5., 5., 20.])
+
+    def check_generated(self, network):
+        generic = txtl.compile_mixture(conversion_mixture())
+        np.testing.assert_allclose(network.rhs(0, self.x),
+                                   generic.rhs(0, self.x))
+        np.testing.assert_allclose(network.jacobian(0, self.x),
+                                   generic.jacobian(0, self.x))
+        np.testing.assert_allclose(network.sparse_jacobian(0, self.x).toarray(),
+                                   generic.jacobian(0, self.x))
+
+    def test_generated_code(self):
+        self.network.generate_code(jit=False, cache_dir=self.cache_dir)
+        self.check_generated(self.network)
+
+        # The generated module is cached using the structure hash
+        files = os.listdir(self.cache_dir)
+        self.assertTrue(any(self.network.structure_hash() in f for f in files))
+
+        # Generated functions are restored when a network is unpickled
+        network = pickle.loads(pickle.dumps(self.network))
+        self.assertIsNotNone(network._functions)
+        self.check_generated(network)
+
+    @unittest.skipIf(numba is None, "numba not installed")
+    def test_jit(self):
+        self.network.generate_code(jit=True, cache_dir=self.cache_dir)
+        self.check_generated(self.network)
+
+        # Simulation results should not depend on the generated code
+        simdata = txtl.runsim(self.network, 1000, npts=11)
+        np.testing.assert_allclose(
+            simdata.values,
+            txtl.runsim(conversion_mixture(), 1000, npts=11).values,
+            rtol=1e-5, atol=1e-6)
+
+    def test_without_numba(self):
+        # Without Numba the numpy code is kept, with a warning
+        with unittest.mock.patch.dict(sys.modules, {'numba': None}):
+            with self.assertWarns(UserWarning):
+                self.network.generate_code(cache_dir=self.cache_dir)
+            self.assertIsNone(self.network._functions)
+            self.assertRaises(ImportError, self.network.generate_code,
+                              jit=True, cache_dir=self.cache_dir)
+
+    @unittest.skipIf(numba is None, "numba not installed")
+    def test_timing(self):
+        # Network with about 1,000 reactions
+        mixture = txtl.create_extract('BL21_DE3')
+        parameters = load_config('BL21_DE3.csv')
+        mixture.components[0].parameters = parameters
+        mixture.parameters = parameters
+        txtl.add_dna(mixture, txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', 'tetR(1200)'), 1, 'plasmid')
+        for i in range(120):
+            txtl.add_dna(mixture, txtl.assemble_dna(
+                'ptet(50)', 'BCD2(20)', txtl.ProteinCDS('deGFP%d' % i, 1000)),
+                1, 'plasmid')
+        network = txtl.compile_mixture(mixture)
+        self.assertGreater(network.nreactions, 900)
+        network.generate_code(jit=True, cache_dir=self.cache_dir)
+        x = np.random.default_rng(0).uniform(0.1, 1, network.nspecies)
+
+        # Best average time per call over a few repetitions
+        def timing(function, ncalls=200):
+            function(0, x)
+            times = []
+            for repeat in range(5):
+                start = time.perf_counter()
+                for call in range(ncalls):
+                    function(0, x)
+                times.append((time.perf_counter() - start) / ncalls)
+            return min(times)
+
+        # The right hand side and Jacobian take microseconds
+        self.assertLess(timing(network.rhs), 200e-6)
+        self.assertLess(timing(network.jacobian_values), 200e-6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+# conversion.py - enzymatic conversion mixture shared by the test suites
+# AP, 19 Oct 2026
+
+import txtl
+from txtl.sbmlutil import add_species, add_reaction
+
+# Simple enzymatic conversion: S + E <-> C -> P + E
+class Conversion(txtl.Component):
+    def __init__(self, name, parameters={}):
+        self.name = name
+        self.default_mechanisms = {}
+        self.custom_mechanisms = {}
+        defaults = {'k_on': 0.01, 'k_off': 0.1, 'k_cat': 0.05}
+        self.parameters = txtl.get_parameters(
+            None, dict(defaults, **parameters))
+
+    def update_species(self, mixture, conc):
+        self.substrate = add_species(mixture, None, 'S', 100 * conc)
+        self.enzyme = add_species(mixture, None, 'E', 10 * conc)
+        self.complex = add_species(mixture, 'Complex', 'S:E', 0)
+        self.product = add_species(mixture, None, 'P', 0)
+
+    def update_reactions(self, mixture):
+        params = self.parameters
+        add_reaction(mixture, [self.substrate, self.enzyme], [self.complex],
+                     kf=params['k_on'], kr=params['k_off'])
+        add_reaction(mixture, [self.complex], [self.enzyme, self.product],
+                     kf=params['k_cat'])
+
+# Mixture with a single conversion component
+def conversion_mixture(**parameters):
+    mixture = txtl.Mixture('conversion')
+    mixture.components = [Conversion('conv', parameters)]
+    mixture.concentrations = [1]
+    return mixture
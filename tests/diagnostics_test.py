@@ -0,0 +1,118 @@
+# diagnostics_test.py - test suite for simulation diagnostics
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import scipy.integrate
+import txtl
+from txtl.simulate import SolverStats, _proposed_step
+from txtl.diagnostics import reaction_origins, stiffness_analysis
+
+# Mixture with a repressor and a repressed reporter
+def reporter_mixture():
+    tube1 = txtl.extract('BL21_DE3')
+    tube2 = txtl.buffer('stdbuffer')
+    tube3 = txtl.newtube('geneexpr')
+    txtl.add_dna(tube3, txtl.assemble_dna(
+        'ptet(50)', 'BCD2(20)', 'tetR(1200)'), 1, 'plasmid')
+    txtl.add_dna(tube3, txtl.assemble_dna(
+        txtl.RepressedPromoter('ptet', 'tetR', dimer=True), 'BCD2(20)',
+        txtl.ProteinCDS('deGFP', length=1000)), 1, 'plasmid')
+    return txtl.combine_tubes([tube1, tube2, tube3])
+
+class TestDiagnostics(unittest.TestCase):
+
+    def setUp(self):
+        self.mixture = reporter_mixture()
+        self.network = txtl.compile_mixture(self.mixture)
+
+    def test_solver_stats(self):
+        self.assertIsNone(txtl.runsim(self.network, 100, npts=2).stats)
+        for method in ('LSODA', 'BDF'):
+            result = txtl.runsim(self.network, 2 * txtl.hours,
+                                 sampling='adaptive', method=method,
+                                 stats=True)
+            stats = result.stats
+            self.assertEqual(stats.method, method)
+            self.assertEqual(stats.nsteps, len(result.timepoints) - 1)
+            self.assertGreaterEqual(stats.nfev, stats.nsteps)
+            self.assertGreater(stats.njev, 0)
+            self.assertLessEqual(stats.nrejected, stats.nsteps)
+            self.assertAlmostEqual(
+                stats.times['total'], sum(stats.times[phase] for phase in
+                                          ('rhs', 'jacobian', 'output',
+                                           'solver')))
+
+        # A first step that is much too large has to be rejected
+        stats = txtl.runsim(self.network, 10, npts=2, method='BDF',
+                            first_step=5, stats=True).stats
+        self.assertGreater(stats.nrejected, 0)
+
+        batch = txtl.runsim_batch(self.network, 100, npts=2, stats=True,
+                                  initial={'RNAP': [1, 2]})
+        self.assertGreater(batch.stats.nsteps, 0)
+
+    def test_unknown_step_size(self):
+        # Integrator whose internals don't expose the proposed step size
+        solver = scipy.integrate.LSODA.__new__(scipy.integrate.LSODA)
+        self.assertIsNone(_proposed_step(solver))
+        solver.t, solver.t_bound = 1, 10
+        stats = SolverStats('LSODA')
+        stats._step(solver, 0, 2)
+        self.assertEqual(stats.nrejected, 1)
+        stats._step(solver, 0, None)
+        self.assertIsNone(stats.nrejected)
+        stats._step(solver, 0, 2)
+        self.assertIsNone(stats.nrejected)
+        self.assertIn("? rejected", str(stats))
+
+    def test_stiffness_analysis(self):
+        x = txtl.runsim(self.network, txtl.hours, npts=2).values[-1]
+        fastest, slowest, contributions = stiffness_analysis(self.network, x)
+        self.assertLess(fastest, slowest)
+
+        # The contributions add up to the fastest eigenvalue
+        values = np.linalg.eigvals(self.network.jacobian(0, x))
+        self.assertAlmostEqual(1 / np.max(np.abs(values.real)), fastest)
+        np.testing.assert_allclose(contributions.sum(), -1 / fastest,
+                                   rtol=1e-6)
+
+    def test_reaction_origins(self):
+        origins = reaction_origins(self.network, self.mixture)
+        assemblies = set()
+        for reaction, (mechanism, components) in \
+                zip(self.network.reactions, origins):
+            self.assertEqual(len(components), 1)
+            if reaction.startswith('txb_'):
+                self.assertEqual(mechanism, 'transcription')
+            if reaction.startswith('tlb_'):
+                assemblies.update(components)
+            if reaction.startswith('cds_'):
+                # Dimerization of the repressor
+                self.assertEqual(components, ['ptet--BCD2--tetR'])
+        self.assertEqual(assemblies, {'ptet--BCD2--tetR',
+                                      'ptet--BCD2--deGFP'})
+
+        # Without the mixture, only the mechanisms are known
+        self.assertTrue(all(components == [] for mechanism, components in
+                            reaction_origins(self.network)))
+
+    def test_diagnose(self):
+        diagnostics = txtl.diagnose(self.mixture, 2 * txtl.hours,
+                                    nsamples=3, top=3)
+        self.assertEqual(len(diagnostics.timepoints), 3)
+        self.assertEqual(diagnostics.timepoints[0], 0)
+        self.assertTrue(np.all(diagnostics.stiffness > 1))
+        self.assertGreater(diagnostics.stats.nsteps, 0)
+        self.assertEqual(set(diagnostics.times),
+                         {'compile', 'simulation', 'analysis', 'total'})
+
+        # RNA polymerase binding sets the fastest time scale
+        self.assertLessEqual(len(diagnostics.hot_reactions), 3)
+        hot = diagnostics.hot_reactions[0]
+        self.assertEqual(hot.mechanism, 'transcription')
+        self.assertEqual(len(hot.components), 1)
+        self.assertIn(hot.reaction, str(diagnostics))
+
+if __name__ == '__main__':
+    unittest.main()
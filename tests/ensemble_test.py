@@ -0,0 +1,99 @@
+# ensemble_test.py - test suite for streaming ensemble statistics
+# AP, 19 Oct 2026
+
+import copy
+import unittest
+import numpy as np
+import txtl
+from txtl.ensemble import Moments, Quantiles, Histogram, run_ensemble, \
+    lognormal
+from .conversion import conversion_mixture
+
+class TestAccumulators(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = rng.lognormal(0, 1, size=(5000, 3, 2))
+
+    def accumulate(self, accumulator, parts=7):
+        # Add the values in batches, split over two accumulators
+        chunks = np.array_split(self.values, parts)
+        first = copy.deepcopy(accumulator)
+        for chunk in chunks[:3]:
+            accumulator.add(chunk)
+        for trajectory in np.concatenate(chunks[3:]):
+            first.add(trajectory)
+        return accumulator.merge(first)
+
+    def test_moments(self):
+        moments = self.accumulate(Moments())
+        self.assertEqual(moments.count, len(self.values))
+        np.testing.assert_allclose(moments.mean, self.values.mean(axis=0))
+        np.testing.assert_allclose(moments.variance,
+                                   self.values.var(axis=0, ddof=1))
+        np.testing.assert_array_equal(moments.max, self.values.max(axis=0))
+
+    def test_quantiles(self):
+        quantiles = self.accumulate(Quantiles(accuracy=0.01))
+        exact = np.quantile(self.values, quantiles.quantiles, axis=0,
+                            method='lower')
+        np.testing.assert_allclose(quantiles.values, exact, rtol=0.01)
+        self.assertEqual(quantiles.quantile(0.5).shape, (3, 2))
+
+        # Zeros are counted separately
+        quantiles = Quantiles().add(np.zeros((10, 3, 2)))
+        np.testing.assert_array_equal(quantiles.quantile(0.5), 0)
+
+    def test_histogram(self):
+        histogram = self.accumulate(Histogram(np.linspace(0, 5, 11)))
+        counts, edges = np.histogram(self.values[:, 1, 0], histogram.edges)
+        np.testing.assert_array_equal(histogram.counts[1, 0], counts)
+        self.assertEqual(histogram.counts[1, 0].sum() + histogram.above[1, 0],
+                         len(self.values))
+
+    def test_merge_errors(self):
+        self.assertRaises(TypeError, Moments().merge, Quantiles())
+        self.assertRaises(ValueError, Moments().add(self.values).merge,
+                          Moments().add(self.values[:, :2]))
+        self.assertRaises(ValueError, Quantiles().add(self.values).merge,
+                          Quantiles(accuracy=0.01).add(self.values))
+
+class TestEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        self.network = txtl.compile_mixture(conversion_mixture())
+
+    def test_statistics(self):
+        # Compare with a batch simulation that stores all trajectories
+        rng = np.random.default_rng(1)
+        k_cat = rng.uniform(0.01, 0.1, 50)
+        enzyme = rng.uniform(5, 15, 50)
+        result = run_ensemble(
+            self.network, 600, 50, parameters={'k_cat': k_cat},
+            initial={'E': enzyme}, npts=5, species=['P', 'S'],
+            batch_size=8, processes=1)
+        batch = txtl.runsim_batch(
+            self.network, 600, npts=5, parameters={'k_cat': k_cat},
+            initial={'E': enzyme}, species=['P', 'S'])
+
+        self.assertEqual(result.count, 50)
+        self.assertEqual(result.species, ['P', 'S'])
+        np.testing.assert_allclose(result.timepoints, batch.timepoints)
+        np.testing.assert_allclose(result['moments'].mean,
+                                   batch.values.mean(axis=0), rtol=1e-4)
+        np.testing.assert_allclose(
+            result.get(result['moments'].std, 'P'),
+            batch.values[..., 0].std(axis=0, ddof=1), rtol=1e-3, atol=1e-6)
+
+    def test_reproducible(self):
+        results = [run_ensemble(
+            self.network, 600, 40, parameters={'k_cat': lognormal(0.05, 0.3)},
+            npts=3, species=['P'], batch_size=10, processes=processes,
+            seed=3, reducers={'moments': Moments()})
+                   for processes in (1, 2)]
+        np.testing.assert_allclose(results[0]['moments'].mean,
+                                   results[1]['moments'].mean)
+        self.assertGreater(results[0]['moments'].std[-1, 0], 0)
+
+if __name__ == '__main__':
+    unittest.main()
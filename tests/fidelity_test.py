@@ -0,0 +1,103 @@
+# fidelity_test.py - test suite for reduced (fast) extract models
+# AP, 19 Oct 2026
+
+import tempfile
+import unittest
+import numpy as np
+import txtl
+
+# Gene expression mixture (self-repressing or constitutive)
+def expression_mixture(fidelity, repressed=True, conc=1):
+    tube1 = txtl.extract('BL21_DE3', fidelity=fidelity)
+    tube2 = txtl.buffer('stdbuffer')
+    tube3 = txtl.newtube('geneexpr')
+    promoter = txtl.RepressedPromoter('ptet', 'tetR', dimer=True) \
+        if repressed else txtl.ConstitutivePromoter('ptet')
+    txtl.add_dna(tube3, txtl.assemble_dna(promoter, 'BCD2(20)', 'tetR(1200)'),
+                 conc, 'plasmid')
+    return txtl.combine_tubes([tube1, tube2, tube3])
+
+class TestFidelity(unittest.TestCase):
+
+    def setUp(self):
+        self.detailed = txtl.compile_mixture(expression_mixture('detailed'))
+        self.fast = txtl.compile_mixture(expression_mixture('fast'))
+
+    def test_model_size(self):
+        self.assertLess(self.fast.nspecies, self.detailed.nspecies)
+        self.assertLess(self.fast.nreactions, self.detailed.nreactions)
+        self.assertFalse(any(s.startswith('Complex')
+                             for s in self.fast.species))
+        self.assertIsNone(self.detailed.modifiers)
+
+        # Transcription is repressed by the protein
+        j = [r.startswith('txb_') for r in self.fast.reactions].index(True)
+        self.assertEqual(self.fast.species[self.fast.modifiers[j]],
+                         'Protein_tetR_dimer')
+        self.assertIn('TX_Lumped', self.fast.parameter_names())
+        self.assertIn('TL_Lumped', self.fast.parameter_names())
+
+        self.assertRaises(ValueError, txtl.extract, 'BL21_DE3',
+                          fidelity='coarse')
+
+    def test_trajectories(self):
+        # Lumped expression matches the detailed model
+        detailed, fast = [txtl.runsim(
+            expression_mixture(fidelity, repressed=False), 4 * txtl.hours,
+            npts=5).get('Protein_tetR_dimer')
+                          for fidelity in ('detailed', 'fast')]
+        np.testing.assert_allclose(fast, detailed, rtol=0.05)
+
+        # Hill repression assumes that repressor binding is at steady
+        # state, so the repressed model only approximates the detailed one
+        detailed, fast = [txtl.runsim(
+            expression_mixture(fidelity, conc=0.01), 4 * txtl.hours,
+            npts=5).get('Protein_tetR_dimer')
+                          for fidelity in ('detailed', 'fast')]
+        np.testing.assert_allclose(fast[1:], detailed[1:], rtol=0.25)
+
+    def test_jacobian(self):
+        x = np.random.default_rng(0).uniform(0.1, 2, self.fast.nspecies)
+        J = self.fast.jacobian(0, x)
+        eps = 1e-6
+        for i in range(self.fast.nspecies):
+            dx = np.zeros_like(x); dx[i] = eps
+            np.testing.assert_allclose(
+                J[:, i], (self.fast.rhs(0, x + dx) -
+                          self.fast.rhs(0, x - dx)) / (2 * eps),
+                rtol=1e-5, atol=1e-9)
+
+    def test_generated_code(self):
+        x = np.random.default_rng(1).uniform(0.1, 2, self.fast.nspecies)
+        generated = self.fast.copy().generate_code(
+            jit=False, cache_dir=tempfile.mkdtemp())
+        np.testing.assert_allclose(generated.rhs(0, x), self.fast.rhs(0, x))
+        np.testing.assert_allclose(generated.jacobian(0, x),
+                                   self.fast.jacobian(0, x))
+
+    def test_subnetwork(self):
+        # Removing the repressor requires removing the repressed reaction
+        i = self.fast.species_index['Protein_tetR_dimer']
+        species = np.arange(self.fast.nspecies) != i
+        self.assertRaises(ValueError, self.fast.subnetwork, None, species)
+        reduced = self.fast.subnetwork(self.fast.modifiers == self.fast.nspecies)
+        self.assertIsNone(reduced.modifiers)
+
+    def test_default_repression(self):
+        # Extracts without a repression mechanism use sequestration
+        tube1 = txtl.extract('BL21_DE3')
+        del tube1.default_mechanisms['repression']
+        tube2 = txtl.newtube('geneexpr')
+        txtl.add_dna(tube2, txtl.assemble_dna(
+            txtl.RepressedPromoter('ptet', 'tetR', dimer=True), 'BCD2(20)',
+            'tetR(1200)'), 1, 'plasmid')
+        mixture = txtl.combine_tubes([tube1, txtl.buffer('stdbuffer'), tube2])
+        self.assertNotIn('repression', mixture.default_mechanisms)
+        network = txtl.compile_mixture(mixture)
+        self.assertEqual(network.species, self.detailed.species)
+        self.assertEqual([r.rstrip('0123456789') for r in network.reactions],
+                         [r.rstrip('0123456789')
+                          for r in self.detailed.reactions])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# fit_test.py - test suite for compiled networks and parameter fitting
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from .conversion import conversion_mixture
+
+class TestCompiledNetwork(unittest.TestCase):
+
+    def test_compile(self):
+        network = txtl.compile_mixture(conversion_mixture())
+        self.assertEqual(network.nspecies, 4)
+        self.assertEqual(network.nreactions, 3)
+        self.assertEqual(network.get_parameters('k_cat'), 0.05)
+
+        # Compiling twice should not duplicate reactions
+        mixture = conversion_mixture()
+        txtl.compile_mixture(mixture)
+        self.assertEqual(txtl.compile_mixture(mixture).nreactions, 3)
+
+    def test_jacobian(self):
+        network = txtl.compile_mixture(conversion_mixture())
+        x = np.array([50., 5., 5., 20.])
+        J = network.jacobian(0, x)
+        eps = 1e-6
+        for i in range(network.nspecies):
+            dx = np.zeros(network.nspecies); dx[i] = eps
+            fd = (network.rhs(0, x + dx) - network.rhs(0, x - dx)) / (2*eps)
+            np.testing.assert_allclose(J[:, i], fd, rtol=1e-6, atol=1e-9)
+
+    def test_vectorized_rhs(self):
+        network = txtl.compile_mixture(conversion_mixture())
+        x = np.array([[50., 5., 5., 20.], [10., 1., 2., 3.]])
+        k = network.rate_matrix(['k_cat'], [[0.05], [0.5]])
+        dxdt = network.rhs(0, x, k)
+        network.set_parameters('k_cat', 0.5)
+        np.testing.assert_allclose(dxdt[1], network.rhs(0, x[1]))
+
+    def test_runsim(self):
+        simdata = txtl.runsim(conversion_mixture(), 1000, npts=11)
+        self.assertEqual(simdata.values.shape, (11, 4))
+
+        # Mass conservation: S + C + P is constant
+        total = simdata.get(['S', 'Complex_S_E', 'P']).sum(axis=1)
+        np.testing.assert_allclose(total, 100, rtol=1e-5)
+
+class TestParameterFit(unittest.TestCase):
+
+    def setUp(self):
+        # Generate data with known parameter values
+        truth = conversion_mixture(k_on=0.02, k_cat=0.01)
+        self.timepoints = np.linspace(0, 2000, 21)
+        self.data = txtl.runsim(truth, 2000, npts=21).get('P')
+
+    def test_fit(self):
+        result = txtl.fit_parameters(
+            conversion_mixture(), ['k_on', 'k_cat'],
+            [(1e-4, 1), (1e-4, 1)], self.timepoints, self.data, 'P',
+            processes=1)
+        np.testing.assert_allclose(result.values, [0.02, 0.01], rtol=1e-3)
+
+    def test_multistart(self):
+        network = txtl.compile_mixture(conversion_mixture())
+        result = txtl.fit_parameters(
+            network, ['k_on', 'k_cat'], [(1e-4, 1), (1e-4, 1)],
+            self.timepoints, self.data, 'P', nstarts=4, processes=2, seed=1)
+        self.assertEqual(len(result.starts), 4)
+        np.testing.assert_allclose(result.as_dict()['k_cat'], 0.01, rtol=1e-3)
+
+        # Fitting should not change the network
+        self.assertEqual(network.get_parameters('k_cat'), 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
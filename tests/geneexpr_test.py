@@ -34,7 +34,8 @@ class TestGeneExpression(unittest.TestCase):
         # Create an SBML file containing the model
         txtl.write_sbml(well1, 'geneexpr.xml')
 
-        #! TODO: test to make sure the model is valid
+        # Make sure the model is valid
+        self.assertTrue(txtl.validate(well1).ok)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+# incubation_test.py - test suite for cached extract pre-incubation
+# AP, 19 Oct 2026
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import txtl
+from txtl import incubation
+from .conversion import conversion_mixture
+
+class TestPreincubation(unittest.TestCase):
+
+    def setUp(self):
+        # The conversion mixture plays the role of an extract with dynamics
+        self.cache_dir = tempfile.mkdtemp()
+        incubation._cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_preincubate(self):
+        extract = conversion_mixture()
+        pre = txtl.preincubate(extract, 500, cache_dir=self.cache_dir)
+        expected = txtl.runsim(extract, 500, npts=2)
+        np.testing.assert_allclose(pre.state, expected.values[-1])
+
+        # Continuing from the pre-incubated state extends the simulation
+        result = txtl.runsim(extract, 500, npts=2, preincubation=pre)
+        full = txtl.runsim(extract, 1000, npts=3)
+        np.testing.assert_allclose(result.values[-1], full.values[-1],
+                                   rtol=1e-4, atol=1e-4)
+
+    def test_dilution(self):
+        pre = txtl.preincubate(conversion_mixture(), 500,
+                               cache_dir=self.cache_dir)
+        other = txtl.Mixture('other')
+        well = txtl.combine_mixtures([conversion_mixture(), other],
+                                     volumes=[3, 1])
+        initial = pre.initial(well)
+        np.testing.assert_allclose([initial[s] for s in pre.species],
+                                   0.75 * pre.state)
+
+        # Batch simulations start all members from the pre-incubated state
+        batch = txtl.runsim_batch(well, 100, npts=2, preincubation=pre,
+                                  parameters={'k_cat': [0.01, 0.1]})
+        np.testing.assert_allclose(batch.values[:, 0], [0.75 * pre.state] * 2)
+
+        # Mixtures with a different extract are rejected
+        network = txtl.compile_mixture(conversion_mixture())
+        network.x0[network.get_species_index('E')] *= 2
+        with self.assertRaises(ValueError):
+            pre.initial(network)
+
+    def test_cache(self):
+        pre = txtl.preincubate(conversion_mixture(), 500,
+                               cache_dir=self.cache_dir)
+        self.assertIs(txtl.preincubate(conversion_mixture(), 500,
+                                       cache_dir=self.cache_dir), pre)
+        filename = os.path.join(self.cache_dir, 'preincubation',
+                                pre.key + '.npz')
+        self.assertTrue(os.path.exists(filename))
+
+        # The disk cache is used by other processes (or sessions)
+        incubation._cache.clear()
+        loaded = txtl.preincubate(conversion_mixture(), 500,
+                                  cache_dir=self.cache_dir)
+        self.assertIsNot(loaded, pre)
+        np.testing.assert_array_equal(loaded.state, pre.state)
+
+        # Changing the extract parameters or the settings changes the key
+        keys = {pre.key, txtl.preincubate(
+            conversion_mixture(k_cat=0.1), 500, cache=False).key,
+                txtl.preincubate(conversion_mixture(), 600, cache=False).key}
+        self.assertEqual(len(keys), 3)
+
+if __name__ == '__main__':
+    unittest.main()
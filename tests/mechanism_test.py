@@ -0,0 +1,45 @@
+# mechanism_test.py - test suite for mechanism resolution
+# AP, 19 Oct 2026
+
+import unittest
+import txtl
+from txtl.mechanisms import transcription
+
+class TestMechanismResolution(unittest.TestCase):
+
+    def setUp(self):
+        self.mixture = txtl.create_extract('BL21_DE3')
+        self.gene = txtl.assemble_dna('ptet(50)', 'BCD2(20)', 'deGFP(1000)')
+
+    def test_sources(self):
+        mechanisms = txtl.get_mechanisms(self.mixture, self.gene)
+        self.assertEqual(mechanisms.sources['transcription'], 'mixture_default')
+        self.assertEqual(mechanisms.sources['maturation'], 'component_default')
+
+        custom = {'transcription': transcription.basic()}
+        mechanisms = txtl.get_mechanisms(self.mixture, self.gene, custom)
+        self.assertIs(mechanisms['transcription'], custom['transcription'])
+        self.assertEqual(mechanisms.sources['transcription'], 'custom')
+
+    def test_cache(self):
+        first = txtl.get_mechanisms(self.mixture, self.gene)
+        self.assertIs(txtl.get_mechanisms(self.mixture, self.gene), first)
+
+        # Changing one of the mechanism dictionaries invalidates the cache
+        override = transcription.basic()
+        self.mixture.custom_mechanisms['transcription'] = override
+        second = txtl.get_mechanisms(self.mixture, self.gene)
+        self.assertIsNot(second, first)
+        self.assertIs(second['transcription'], override)
+        self.assertEqual(second.sources['transcription'], 'mixture_custom')
+
+        # Replacing a dictionary with a plain dict also works
+        self.gene.custom_mechanisms = {'transcription': transcription.basic()}
+        third = txtl.get_mechanisms(self.mixture, self.gene)
+        self.assertEqual(third.sources['transcription'], 'component_custom')
+        self.gene.custom_mechanisms['transcription'] = override
+        self.assertIs(txtl.get_mechanisms(
+            self.mixture, self.gene)['transcription'], override)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# mixture_test.py - test suite for mixture arithmetic
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from txtl.parameter import load_config
+
+class TestMixtureArithmetic(unittest.TestCase):
+
+    def setUp(self):
+        self.extract = txtl.create_extract('BL21_DE3')
+        parameters = load_config('BL21_DE3.csv')
+        self.extract.components[0].parameters = parameters
+        self.extract.parameters = parameters
+        self.gene = txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', txtl.ProteinCDS('deGFP', 1000))
+        self.repressor = txtl.assemble_dna('ptet(50)', 'BCD2(20)', 'tetR(1200)')
+
+    def test_lazy_document(self):
+        mixture = txtl.create_mixture('tube')
+        self.assertIsNone(mixture._SBMLdoc)
+        combined = txtl.combine_mixtures([self.extract, mixture])
+        self.assertIsNone(combined._SBMLdoc)
+        self.assertIsNone(self.extract._SBMLdoc)
+
+        # The document is created when the model is needed
+        self.assertEqual(combined.model.getNumSpecies(),
+                         combined.document.getModel().getNumSpecies())
+        self.assertIsNotNone(combined._SBMLdoc)
+        self.assertIsNone(self.extract._SBMLdoc)
+
+    def test_combine(self):
+        dna = txtl.create_mixture('dna')
+        txtl.add_dna(dna, self.gene, 8)
+        combined = txtl.combine_mixtures([self.extract, dna], [1, 3])
+
+        # Components are computed when they are first accessed
+        self.assertEqual(combined.components,
+                         self.extract.components + [self.gene])
+        self.assertEqual(combined.concentrations,
+                         [self.extract.concentrations[0] / 4, 6])
+
+        # Arithmetic gives the same mixture
+        mixture = 0.25 * self.extract + 0.75 * dna
+        self.assertEqual(mixture.components, combined.components)
+        self.assertEqual(mixture.concentrations, combined.concentrations)
+        self.assertEqual(mixture.parameters.keys(), combined.parameters.keys())
+
+    def test_snapshot(self):
+        # Changes to a mixture after it was combined are not seen by the
+        # combined mixture, whether or not it was flattened before
+        dna = txtl.create_mixture('dna')
+        txtl.add_dna(dna, self.gene, 1)
+        first = txtl.combine_tubes([self.extract, dna])
+        second = txtl.combine_tubes([self.extract, dna])
+        self.assertEqual(len(first.components), 2)
+        txtl.add_dna(dna, self.repressor, 1)
+        dna += 1 * self.repressor
+        self.assertEqual(len(dna.components), 3)
+        self.assertEqual(len(first.components), 2)
+        self.assertEqual(len(second.components), 2)
+        self.assertEqual(len(second.concentrations), 2)
+
+        # Also for mixtures built up using in place addition
+        tube = txtl.create_mixture('tube')
+        tube += 1 * self.gene
+        combined = tube + 1 * self.repressor
+        tube += 1 * self.repressor
+        self.assertEqual(combined.components, [self.gene, self.repressor])
+
+    def test_add_components(self):
+        mixture = txtl.create_extract('BL21_DE3')
+        mixture.parameters = self.extract.parameters
+        mixture.components[0].parameters = self.extract.parameters
+        txtl.add_dna(mixture, self.repressor, 1)
+        txtl.add_dna(mixture, self.gene, 2)
+
+        expression = self.extract + 1 * self.repressor
+        expression += self.gene * 2
+        self.assertEqual(expression.parameters['RNAP_IC'].value,
+                         self.extract.parameters['RNAP_IC'].value)
+        self.assertEqual(expression.components[1:], mixture.components[1:])
+        self.assertEqual(expression.concentrations, mixture.concentrations)
+
+        first = txtl.compile_mixture(mixture)
+        second = txtl.compile_mixture(expression)
+        self.assertEqual(list(first.species), list(second.species))
+        np.testing.assert_allclose(first.x0, second.x0)
+        np.testing.assert_allclose(first.k, second.k)
+
+    def test_deep_graph(self):
+        mixture = txtl.create_mixture('tube')
+        for i in range(5000):
+            mixture = mixture + 0.5 * self.gene
+        self.assertEqual(len(mixture.components), 5000)
+        self.assertEqual(set(mixture.concentrations), {0.5})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# paramdb_test.py - test suite for the parameter database
+# AP, 19 Oct 2026
+
+import os
+import shutil
+import tempfile
+import unittest
+import txtl
+from txtl.paramdb import ParameterDatabase, default_path
+from txtl.parameter import load_config
+
+class TestParameterDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmpdir, 'cache')
+        self.overlay = os.path.join(self.tmpdir, 'overlay')
+        os.mkdir(self.overlay)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        txtl.set_parameter_path()
+
+    def write_overlay(self, filename, rows):
+        with open(os.path.join(self.overlay, filename), 'w') as file:
+            file.write("\n".join(rows) + "\n")
+
+    def test_lookup(self):
+        database = ParameterDatabase(cache_dir=self.cache_dir)
+        self.assertIsNotNone(database.filename)
+        ptet = database.get('prom_ptet.csv')
+        self.assertEqual(ptet['RNAPbound_F'].value, '20')
+        self.assertEqual(database.get('PROM_PTET').keys(), ptet.keys())
+        self.assertIsNone(database.get('prom_missing.csv'))
+
+        # Tables are copies, so they can be changed by the caller
+        ptet['RNAPbound_F'] = 5
+        self.assertEqual(database.get('prom_ptet')['RNAPbound_F'].value, '20')
+
+        # Extract parameters are found regardless of case
+        self.assertIsNotNone(load_config('bl21_de3.csv'))
+
+    def test_query(self):
+        database = ParameterDatabase(cache_dir=self.cache_dir)
+        rows = database.query(name='RNAPbound_F')
+        self.assertIn('prom_ptet', [component for component, param in rows])
+        rows = database.query('utr5_bcd2.csv')
+        self.assertEqual([param.name for component, param in rows],
+                         list(database.get('utr5_bcd2')))
+
+    def test_overlay(self):
+        self.write_overlay('prom_ptet.csv', ["RNAPbound_F, Expression, 35, "])
+        self.write_overlay('prom_pnew.csv', ["RNAPbound_F, Numeric, 1, new"])
+        txtl.set_parameter_path([self.overlay])
+        ptet = load_config('prom_ptet.csv')
+        self.assertEqual(ptet['RNAPbound_F'].value, '35')
+        self.assertEqual(ptet['RNAPbound_R'].value, '400')
+        self.assertEqual(load_config('prom_pnew.csv')['RNAPbound_F'].comment,
+                         'new')
+
+    def test_regenerate(self):
+        path = default_path() + [self.overlay]
+        self.write_overlay('prom_pnew.csv', ["RNAPbound_F, Numeric, 1, "])
+        database = ParameterDatabase(path, cache_dir=self.cache_dir)
+        self.assertEqual(database.get('prom_pnew')['RNAPbound_F'].value, 1)
+
+        # The stored database is used until a configuration file changes
+        self.assertEqual(ParameterDatabase(
+            path, cache_dir=self.cache_dir).filename, database.filename)
+        self.write_overlay('prom_pnew.csv', ["RNAPbound_F, Numeric, 2.5, "])
+        database = ParameterDatabase(path, cache_dir=self.cache_dir)
+        self.assertEqual(database.get('prom_pnew')['RNAPbound_F'].value, 2.5)
+
+    def test_explicit_path(self):
+        self.write_overlay('custom.csv', ["RNAPbound_F, Numeric, 3, "])
+        params = load_config(os.path.join(self.overlay, 'custom.csv'))
+        self.assertEqual(params['RNAPbound_F'].value, 3)
+        self.assertIsNone(load_config(os.path.join(self.overlay, 'none.csv')))
+
+if __name__ == '__main__':
+    unittest.main()
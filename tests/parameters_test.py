@@ -43,5 +43,91 @@ class TestParameters(unittest.TestCase):
         self.assertIsInstance(tetR.parameters['Dimerization_F'],
                               txtl.Parameter)
 
+    def test_parameter_table(self):
+        table = txtl.ParameterTable({
+            'RNAPbound_F' : 20,
+            'RNAPbound_R' : txtl.Parameter('my_param', 'Numeric', 400),
+            'TX_Rate' : txtl.Parameter('TX_Rate', 'Expression', '10/2')})
+        self.assertEqual(len(table), 3)
+        self.assertEqual(list(table), ['RNAPbound_F', 'RNAPbound_R', 'TX_Rate'])
+        self.assertEqual(table['RNAPbound_R'].name, 'my_param')
+        self.assertEqual(table['RNAPbound_F'].value, 20)
+        self.assertEqual(table['TX_Rate'].value, '10/2')
+
+        # Batch updates (by name and for the whole table)
+        table.set_values(['RNAPbound_F', 'RNAPbound_R'], [10, 200])
+        self.assertEqual(table['RNAPbound_R'].value, 200)
+        table.set_values(None, [1, 2, 3])
+        self.assertEqual(list(table.get_values()), [1, 2, 3])
+        self.assertEqual(table['TX_Rate'].type, 'Numeric')
+        with self.assertRaises(KeyError):
+            table.set_values(['unknown'], [1])
+
+        # Copies are independent of the original
+        copy = table.copy()
+        copy['RNAPbound_F'] = 5
+        del copy['RNAPbound_R']
+        self.assertEqual(table['RNAPbound_F'].value, 1)
+        self.assertEqual(list(copy.get_values()), [5, 3])
+
+    def test_component_parameters(self):
+        lacI = txtl.ProteinCDS('LacI', dimer=True,
+                               parameters={'Dimerization_F' : 1})
+        self.assertIsInstance(lacI.parameters, txtl.ParameterTable)
+        lacI.parameters.set_values('Dimerization_F', 2)
+        self.assertEqual(lacI.eval_parameter('Dimerization_F'), 2)
+
+    def test_global_parameters(self):
+        table = txtl.ParameterTable({'RNAPbound_F': 'RNAP_binding'})
+        self.assertEqual(table['RNAPbound_F'].type, 'Global')
+        self.assertEqual(table['RNAPbound_F'].value, 'RNAP_binding')
+
+        # Extract and promoter parameters referring to global parameters
+        extract = txtl.extract('BL21_DE3')
+        extract.parameters['Transcription_Rate'] = 'TX_Global'
+        extract.parameters['TX_Global'] = 0.001
+        extract.parameters['RNAP_binding'] = 15
+        dna = txtl.newtube('dna')
+        for cds in ('tetR(1200)', txtl.ProteinCDS('deGFP', length=1000),
+                    txtl.ProteinCDS('mCherry', length=1100)):
+            txtl.add_dna(dna, txtl.assemble_dna(
+                txtl.RepressedPromoter('ptet', 'tetR', dimer=True,
+                                       RNAPbound_F='RNAP_binding'),
+                'BCD2(20)', cds), 1, 'plasmid')
+        mixture = txtl.combine_tubes([extract, dna])
+
+        # Kinetic laws refer to a single model-level parameter
+        model = mixture.model
+        self.assertEqual(model.getParameter('TX_Global').getValue(), 0.001)
+        self.assertEqual(model.getParameter('RNAP_binding').getValue(), 15)
+        laws = [r.getKineticLaw() for r in model.getListOfReactions()]
+        self.assertFalse(any(law.getParameter('TX_Global') or
+                             law.getParameter('TX_Rate') for law in laws))
+
+        network = txtl.compile_mixture(mixture)
+        for name, value in (('TX_Global', 0.001), ('RNAP_binding', 15)):
+            self.assertEqual(network.rate_names.count(name), 3)
+            self.assertEqual(network.parameters[name], value)
+        network.set_parameters(['TX_Global'], [0.002])
+        self.assertEqual(set(network.k[network.parameter_indices(
+            'TX_Global')]), {0.002})
+
+        # References to undefined global parameters are reported
+        dna = txtl.newtube('dna')
+        txtl.add_dna(dna, txtl.assemble_dna(
+            txtl.RepressedPromoter('ptet', 'tetR', RNAPbound_F='undefined'),
+            'BCD2(20)', 'tetR(1200)'), 1, 'plasmid')
+        with self.assertRaises(ValueError):
+            txtl.combine_tubes([txtl.extract('BL21_DE3'), dna]).model
+
+    def test_circular_global_parameters(self):
+        extract = txtl.create_extract('BL21_DE3').components[0]
+        extract.parameters['A'] = 'B'
+        extract.parameters['B'] = 'A'
+        extract.parameters['C'] = 'C'
+        for name in ('A', 'B', 'C'):
+            with self.assertRaisesRegex(ValueError, "circular global"):
+                txtl.eval_parameter(extract, name)
+
 if __name__ == "__main__":
     unittest.main()
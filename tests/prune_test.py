@@ -0,0 +1,78 @@
+# prune_test.py - test suite for flux based network reduction
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from txtl.network import ReactionNetwork
+
+# Enzymatic conversion with a slow leak back to the substrate and an
+# inhibitor that is barely present
+def leaky_network():
+    species = ['S', 'E', 'C', 'P', 'I', 'EI']
+    reactions = [
+        # id, rate name, rate, reactants, stoichiometry
+        ('bind', 'k_on', 0.01, ['S', 'E'], {'S': -1, 'E': -1, 'C': 1}),
+        ('unbind', 'k_off', 0.1, ['C'], {'S': 1, 'E': 1, 'C': -1}),
+        ('cat', 'k_cat', 0.05, ['C'], {'C': -1, 'E': 1, 'P': 1}),
+        ('leak', 'k_leak', 1e-9, ['P'], {'P': -1, 'S': 1}),
+        ('inhibit', 'k_inh', 0.01, ['E', 'I'], {'E': -1, 'I': -1, 'EI': 1})]
+    index = {s: i for i, s in enumerate(species)}
+    S = np.zeros((len(species), len(reactions)))
+    for j, reaction in enumerate(reactions):
+        for name, coeff in reaction[4].items():
+            S[index[name], j] = coeff
+    return ReactionNetwork(
+        'leaky', species, [100, 10, 0, 0, 1e-8, 0],
+        [r[0] for r in reactions], [r[1] for r in reactions],
+        [r[2] for r in reactions],
+        [[index[s] for s in r[3]] for r in reactions], S)
+
+class TestPruning(unittest.TestCase):
+
+    def setUp(self):
+        self.network = leaky_network()
+
+    def test_prune(self):
+        result = txtl.prune_network(self.network, 2000, atol=1e-3)
+        self.assertEqual(result.removed_reactions, ['leak', 'inhibit'])
+        self.assertEqual(result.removed_species, ['EI'])
+        self.assertEqual(result.network.species, ['S', 'E', 'C', 'P', 'I'])
+        self.assertEqual(result.network.nreactions, 3)
+        self.assertLess(result.max_error, 1e-4)
+
+        # The reduced network can be used like the original one
+        reduced = result.network
+        reduced.set_parameters('k_cat', 0.1)
+        self.network.set_parameters('k_cat', 0.1)
+        np.testing.assert_allclose(
+            txtl.runsim(reduced, 1000, npts=5).get('P'),
+            txtl.runsim(self.network, 1000, npts=5).get('P'), rtol=1e-4)
+
+    def test_tolerances(self):
+        # Without an absolute floor the inhibitor reaction is significant
+        result = txtl.prune_network(self.network, 2000)
+        self.assertEqual(result.removed_reactions, ['leak'])
+
+        # Kept species are not removed
+        result = txtl.prune_network(self.network, 2000, atol=1e-3,
+                                    keep=['EI'])
+        self.assertEqual(result.removed_species, [])
+
+        # A large tolerance removes important reactions (with large error)
+        result = txtl.prune_network(self.network, 2000, tol=1e3)
+        self.assertGreater(result.max_error, 0.1)
+
+    def test_subnetwork(self):
+        network = self.network.copy().set_scaling()
+        reduced = network.subnetwork([0, 1, 2], [0, 1, 2, 3])
+        self.assertEqual(reduced.reactions, ['bind', 'unbind', 'cat'])
+        np.testing.assert_allclose(reduced.scaling.species,
+                                   network.scaling.species[:4])
+        np.testing.assert_allclose(reduced.rhs(0, network.x0[:4]),
+                                   network.rhs(0, network.x0)[:4])
+        with self.assertRaises(ValueError):
+            network.subnetwork([0, 4], [0, 1, 2, 3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# sbmlutil_test.py - test suite for SBML utility functions
+# AP, 19 Oct 2026
+
+import unittest
+import libsbml
+import numpy as np
+import txtl
+from txtl.sbmlutil import add_species, add_reaction
+from txtl.network import compile_sbml_model
+
+class TestAddReaction(unittest.TestCase):
+
+    def setUp(self):
+        self.mixture = txtl.create_mixture('test')
+        self.mixture._update_sbml_model()
+        self.monomer = add_species(self.mixture, "Protein", "M", 10)
+        self.dimer = add_species(self.mixture, "Protein", "M dimer", 0)
+        self.tetramer = add_species(self.mixture, "Protein", "M tetramer", 0)
+
+    def references(self, reaction):
+        return ([(r.getSpecies(), r.getStoichiometry())
+                 for r in reaction.getListOfReactants()],
+                [(r.getSpecies(), r.getStoichiometry())
+                 for r in reaction.getListOfProducts()])
+
+    def test_stoichiometry(self):
+        forward, reverse = add_reaction(
+            self.mixture, [(self.dimer, 2)], [self.tetramer], kf=0.5, kr=0.1)
+        repeated = add_reaction(
+            self.mixture, [self.monomer, self.monomer], [self.dimer], kf=2)
+
+        self.assertEqual(self.references(forward), (
+            [('Protein_M_dimer', 2)], [('Protein_M_tetramer', 1)]))
+        self.assertEqual(self.references(reverse), (
+            [('Protein_M_tetramer', 1)], [('Protein_M_dimer', 2)]))
+        self.assertEqual(self.references(repeated), (
+            [('Protein_M', 2)], [('Protein_M_dimer', 1)]))
+        self.assertEqual(
+            libsbml.formulaToL3String(forward.getKineticLaw().getMath()),
+            "k * Protein_M_dimer^2")
+
+        self.assertRaises(ValueError, add_reaction, self.mixture,
+                          [(self.monomer, 0)], [self.dimer], kf=1)
+
+    def test_compile(self):
+        add_reaction(self.mixture, [(self.monomer, 2)], [self.dimer], kf=2)
+        add_reaction(self.mixture, [(self.dimer, 2)], [self.tetramer], kf=0.5)
+        network = compile_sbml_model(self.mixture.model)
+        x = np.array([3., 4., 5.])
+        np.testing.assert_allclose(network.rhs(0, x), [
+            -2 * 2 * 9, 2 * 9 - 2 * 0.5 * 16, 0.5 * 16])
+        np.testing.assert_allclose(network.jacobian(0, x), [
+            [-2 * 2 * 2 * 3, 0, 0],
+            [2 * 2 * 3, -2 * 0.5 * 2 * 4, 0],
+            [0, 0.5 * 2 * 4, 0]])
+
+if __name__ == '__main__':
+    unittest.main()
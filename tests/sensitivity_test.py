@@ -0,0 +1,84 @@
+# sensitivity_test.py - test suite for global sensitivity analysis
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from txtl.sensitivity import morris_design, saltelli_design, scale_design, \
+    morris_indices, sobol_indices, evaluate_samples
+from .conversion import conversion_mixture
+
+# Ishigami function (analytic Sobol indices are known)
+def ishigami(X, a=7, b=0.1):
+    return np.sin(X[:, 0]) + a * np.sin(X[:, 1]) ** 2 + \
+        b * X[:, 2] ** 4 * np.sin(X[:, 0])
+
+class TestIndices(unittest.TestCase):
+
+    def test_sobol(self):
+        design = saltelli_design(3, 4096, seed=0)
+        self.assertEqual(design.shape, (4096 * 5, 3))
+        X = scale_design(design, [(-np.pi, np.pi)] * 3)
+        indices = sobol_indices(ishigami(X), 3, nbootstrap=20, seed=0)
+        np.testing.assert_allclose(indices['S1'][:, 0],
+                                   [0.3139, 0.4424, 0], atol=0.03)
+        np.testing.assert_allclose(indices['ST'][:, 0],
+                                   [0.5576, 0.4424, 0.2437], atol=0.03)
+        self.assertTrue(np.all(indices['ST_conf'] > 0))
+
+    def test_morris(self):
+        design = morris_design(3, 10, levels=4, seed=1)
+        self.assertEqual(design.shape, (40, 3))
+        self.assertTrue(np.all((design >= 0) & (design <= 1)))
+
+        # Elementary effects of a linear function are its coefficients
+        X = scale_design(design, [(0, 1), (0, 2), (1, 100)],
+                         [False, False, True])
+        values = X[:, 0] + 3 * X[:, 1] + 0 * X[:, 2]
+        indices = morris_indices(design, values, 3)
+        np.testing.assert_allclose(indices['mu_star'][:, 0], [1, 6, 0])
+        np.testing.assert_allclose(indices['sigma'][:, 0], 0, atol=1e-12)
+
+class TestMixtureSensitivity(unittest.TestCase):
+
+    def setUp(self):
+        self.network = txtl.compile_mixture(conversion_mixture())
+
+    def test_evaluate(self):
+        # Batched evaluation agrees with individual simulations
+        samples = [[0.01, 5], [0.05, 10], [0.1, 20]]
+        values = evaluate_samples(self.network, ['k_cat', 'E'], samples, 600,
+                                  'P', batch_size=2, processes=1)
+        for (k_cat, enzyme), value in zip(samples, values[:, 0]):
+            network = txtl.compile_mixture(conversion_mixture())
+            network.set_parameters('k_cat', k_cat)
+            result = txtl.runsim(network, 600, initial={'E': enzyme})
+            self.assertAlmostEqual(value, result.get('P')[-1], delta=1e-3 * value)
+
+        with self.assertRaises(KeyError):
+            evaluate_samples(self.network, ['unknown'], [[1]], 600, 'P')
+
+    def test_sobol(self):
+        bounds = {'k_cat': (1e-3, 1e-1), 'k_off': (1e-3, 1e-1), 'S': (5, 10)}
+        results = [txtl.sobol(
+            self.network, bounds, 300, ['P', 'Complex_S_E'], nsamples=32,
+            log_scale=['k_cat', 'k_off'], seed=2, processes=processes)
+                   for processes in (1, 2)]
+        np.testing.assert_allclose(results[0].values, results[1].values)
+
+        result = results[0]
+        self.assertEqual(result['ST'].shape, (3, 2))
+        self.assertEqual(result.outputs, ['P', 'Complex_S_E'])
+        # The catalytic rate dominates the product formation
+        self.assertEqual(np.argmax(result['ST'][:, 0]), 0)
+        self.assertIn('k_cat', str(result))
+
+    def test_morris(self):
+        result = txtl.morris(
+            self.network, {'k_cat': (0.01, 0.1), 'E': (1, 10)}, 300, 'P',
+            ntrajectories=5, seed=3, processes=1)
+        self.assertEqual(result.samples.shape, (15, 2))
+        self.assertTrue(np.all(result['mu'] > 0))
+
+if __name__ == '__main__':
+    unittest.main()
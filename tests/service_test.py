@@ -0,0 +1,104 @@
+# service_test.py - test suite for the simulation job service
+# AP, 19 Oct 2026
+
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+import numpy as np
+import txtl
+from txtl.service import SimulationService, request, \
+    _initialize_worker, _get_network
+from txtl.spec import build_mixture
+
+spec = {
+    'name': 'geneexpr', 'extract': 'BL21_DE3', 'buffer': 'stdbuffer',
+    'dna': [
+        {'parts': ['ptet(50)', 'BCD2(20)', 'tetR(1200)'], 'conc': 1,
+         'type': 'plasmid'},
+        {'parts': ['ptet(50)', 'BCD2(20)',
+                   {'type': 'ProteinCDS', 'name': 'deGFP', 'length': 1000}],
+         'conc': 2}]}
+
+class TestSimulationService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_service(self):
+        mixture = build_mixture(spec)
+        expected = txtl.runsim(mixture, 3600, npts=5)
+        socket = os.path.join(self.tmpdir, 'txtl.sock')
+
+        async def main():
+            async with SimulationService(2, cache_dir=self.tmpdir) as service:
+                results = await asyncio.gather(
+                    service.submit(spec, 3600, npts=5),
+                    service.submit(spec, 3600, npts=5,
+                                   species=['Protein_deGFP']),
+                    service.submit(mixture, 3600, npts=5))
+                cached = os.listdir(service.cache_dir)
+
+                server = await service.serve(socket)
+                async with server:
+                    remote = await request(spec, 3600, path=socket, npts=5,
+                                           species=['Protein_deGFP'])
+                    with self.assertRaises(RuntimeError):
+                        await request({'dna': 1}, 3600, path=socket)
+            return results, cached, remote
+
+        (full, subset, compiled), cached, remote = asyncio.run(main())
+
+        # The spec is compiled once and stored in the shared cache
+        self.assertEqual(len(cached), 1)
+        self.assertIsNone(full.model)
+        self.assertIsNotNone(compiled.model)
+
+        for result in (full, compiled):
+            self.assertEqual(result.species, expected.species)
+            np.testing.assert_allclose(result.values, expected.values,
+                                       rtol=1e-6, atol=1e-9)
+        for result in (subset, remote):
+            self.assertEqual(result.species, ['Protein_deGFP'])
+            np.testing.assert_allclose(result.values[:, 0],
+                                       expected.get('Protein_deGFP'),
+                                       rtol=1e-6, atol=1e-9)
+
+    def test_socket_in_use(self):
+        socket = os.path.join(self.tmpdir, 'txtl.sock')
+
+        async def main():
+            server = await SimulationService(1).serve(socket)
+            async with server:
+                with self.assertRaises(RuntimeError):
+                    await SimulationService(1).serve(socket)
+
+            # A socket left behind by a stopped service is replaced
+            if not os.path.exists(socket):
+                open(socket, 'w').close()
+            server = await SimulationService(1).serve(socket)
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(main())
+
+    def test_stale_cache(self):
+        # Pickle of a class that no longer exists
+        _initialize_worker(self.tmpdir, 1)
+        filename = os.path.join(self.tmpdir, 'stale.pkl')
+        with open(filename, 'wb') as file:
+            file.write(b"ctxtl.network\nRemovedNetwork\n)\x81.")
+        network = _get_network('stale', spec)
+        self.assertIsInstance(network, txtl.ReactionNetwork)
+
+        # The cache file is replaced by the new network
+        _initialize_worker(self.tmpdir, 1)
+        self.assertEqual(_get_network('stale', spec).species,
+                         network.species)
+
+if __name__ == '__main__':
+    unittest.main()
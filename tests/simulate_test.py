@@ -0,0 +1,149 @@
+# simulate_test.py - test suite for native simulation of mixtures
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from .conversion import conversion_mixture
+
+class TestBatchSimulation(unittest.TestCase):
+
+    def test_batch_of_mixtures(self):
+        mixtures = [conversion_mixture(k_cat=k) for k in (0.01, 0.05, 0.1)]
+        batch = txtl.runsim_batch(mixtures, 1000, npts=11)
+        self.assertEqual(batch.values.shape, (3, 11, 4))
+        for i, mixture in enumerate(mixtures):
+            single = txtl.runsim(mixture, 1000, npts=11)
+            np.testing.assert_allclose(batch.values[i], single.values,
+                                       rtol=1e-3, atol=1e-3)
+
+    def test_batch_parameters(self):
+        network = txtl.compile_mixture(conversion_mixture())
+        batch = txtl.runsim_batch(
+            network, 1000, npts=11, parameters={'k_cat': [0.05, 0.1]},
+            initial={'E': [10, 20]})
+        self.assertEqual(batch.get('P').shape, (2, 11))
+
+        # Compare the second well against a single simulation
+        network.set_parameters('k_cat', 0.1)
+        x0 = network.x0.copy()
+        x0[network.get_species_index('E')] = 20
+        single = txtl.simulate.integrate(network, batch.timepoints, x0=x0)
+        np.testing.assert_allclose(batch.values[1], single,
+                                   rtol=1e-3, atol=1e-3)
+
+    def test_structure_mismatch(self):
+        mixture = txtl.Mixture('empty')
+        with self.assertRaises(ValueError):
+            txtl.runsim_batch([conversion_mixture(), mixture], 10)
+
+class TestOutputSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.network = txtl.compile_mixture(conversion_mixture())
+
+    def test_species_and_observables(self):
+        full = txtl.runsim(self.network, 1000, npts=11)
+        result = txtl.runsim(
+            self.network, 1000, npts=11, species=['P'],
+            observables={'E_total': ['E', 'Complex_S_E'],
+                         'S_bound': {'Complex_S_E': 1}})
+        self.assertEqual(result.species, ['P', 'E_total', 'S_bound'])
+        self.assertEqual(result.values.shape, (11, 3))
+        np.testing.assert_allclose(result.get('P'), full.get('P'))
+        np.testing.assert_allclose(result.get('E_total'), 10)
+
+        # The checkpoint still contains the full state
+        np.testing.assert_allclose(result.checkpoint.state, full.values[-1])
+
+    def test_adaptive_and_dense(self):
+        full = txtl.runsim(self.network, 1000, npts=11)
+        result = txtl.runsim(self.network, 1000, species=['P'],
+                             sampling='adaptive', dense=True)
+        self.assertEqual(result.timepoints[0], 0)
+        self.assertEqual(result.timepoints[-1], 1000)
+        self.assertTrue(np.all(np.diff(result.timepoints) > 0))
+        np.testing.assert_allclose(
+            result.interpolate(full.timepoints)[:, 0], full.get('P'),
+            rtol=1e-4, atol=1e-4)
+
+    def test_batch_outputs(self):
+        batch = txtl.runsim_batch(
+            self.network, 1000, npts=11, parameters={'k_cat': [0.05, 0.1]},
+            observables={'E_total': ['E', 'Complex_S_E']}, dense=True)
+        self.assertEqual(batch.values.shape, (2, 11, 1))
+        np.testing.assert_allclose(batch.values, 10)
+        self.assertEqual(batch.interpolate([0, 500, 1000]).shape, (2, 3, 1))
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.network = txtl.compile_mixture(conversion_mixture())
+
+    def test_continuation(self):
+        full = txtl.runsim(self.network, 2000, npts=21)
+        first = txtl.runsim(self.network, 1000, npts=11)
+        second = txtl.runsim(self.network, 2000, npts=11,
+                             checkpoint=first.checkpoint)
+        self.assertEqual(second.timepoints[0], 1000)
+        np.testing.assert_allclose(second.values[-1], full.values[-1],
+                                   rtol=1e-4, atol=1e-4)
+
+    def test_branch(self):
+        first = txtl.runsim(self.network, 1000, npts=11)
+        branch = txtl.runsim(self.network, 2000, npts=11,
+                             checkpoint=first.checkpoint, initial={'S': 200})
+        self.assertAlmostEqual(branch.get('S')[0], 200)
+        self.assertGreater(branch.get('S')[0], first.get('S')[-1])
+
+    def test_save_load(self):
+        import os, tempfile
+        first = txtl.runsim(self.network, 1000, npts=11)
+        filename = os.path.join(tempfile.mkdtemp(), 'checkpoint.npz')
+        first.checkpoint.save(filename)
+        checkpoint = txtl.load_checkpoint(filename)
+        self.assertEqual(checkpoint.time, 1000)
+        np.testing.assert_array_equal(checkpoint.state,
+                                      first.checkpoint.state)
+
+        # Checkpoints can only be used with the model that generated them
+        other = txtl.compile_mixture(txtl.Mixture('empty'))
+        with self.assertRaises(ValueError):
+            txtl.runsim(other, 2000, checkpoint=checkpoint)
+
+class TestScaling(unittest.TestCase):
+
+    def setUp(self):
+        self.network = txtl.compile_mixture(conversion_mixture())
+
+    def test_scales(self):
+        scales, time = txtl.network.characteristic_scales(self.network)
+        # Products inherit the scale of the limiting reactant (E)
+        np.testing.assert_allclose(scales, [100, 10, 10, 10])
+        self.assertGreater(time, 0)
+
+        scaled = txtl.compile_mixture(conversion_mixture(), scale=True)
+        np.testing.assert_allclose(scaled.scaling.species, scales)
+        self.assertIsNone(scaled.set_scaling(False).scaling)
+        with self.assertRaises(ValueError):
+            scaled.set_scaling(species=[1, 1, 0, 1])
+
+    def test_scaled_simulation(self):
+        scaled = self.network.copy().set_scaling()
+        for function in (txtl.runsim, txtl.runsim_batch):
+            expected = function(self.network, 1000, npts=11)
+            result = function(scaled, 1000, npts=11, dense=True)
+            np.testing.assert_allclose(result.values, expected.values,
+                                       rtol=1e-4, atol=1e-4)
+            np.testing.assert_allclose(result.checkpoint.state,
+                                       expected.checkpoint.state,
+                                       rtol=1e-4, atol=1e-4)
+            np.testing.assert_allclose(result.interpolate(result.timepoints),
+                                       result.values, atol=1e-8)
+
+        # Adaptive sampling reports times in the original units
+        result = txtl.runsim(scaled, 1000, sampling='adaptive')
+        self.assertAlmostEqual(result.timepoints[-1], 1000)
+
+if __name__ == '__main__':
+    unittest.main()
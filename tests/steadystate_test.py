@@ -0,0 +1,66 @@
+# steadystate_test.py - test suite for direct steady state computation
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from .conversion import conversion_mixture
+
+class TestSteadyState(unittest.TestCase):
+
+    def test_steady_state(self):
+        mixture = conversion_mixture()
+        result = txtl.steady_state(mixture)
+        self.assertTrue(result.converged)
+
+        # All substrate is converted; totals are conserved
+        np.testing.assert_allclose(
+            result.get(['S', 'E', 'Complex_S_E', 'P']), [0, 10, 0, 100],
+            atol=1e-6)
+
+        # Compare against the end point of a long simulation
+        simdata = txtl.runsim(result.model, 1e6, npts=2)
+        np.testing.assert_allclose(simdata.values[-1], result.values,
+                                   atol=1e-4)
+
+    def test_batch(self):
+        network = txtl.compile_mixture(conversion_mixture())
+
+        # Turning off catalysis gives a binding equilibrium (P stays at 0)
+        k = network.rate_matrix(['k_cat'], [[0.05], [0.0]])
+        result = txtl.steady_state(network, k=k)
+        self.assertEqual(result.values.shape, (2, 4))
+        self.assertTrue(np.all(result.converged))
+        S, E, C, P = result.values[1]
+        self.assertAlmostEqual(P, 0)
+        self.assertAlmostEqual(S * E / C, 0.1 / 0.01, places=4)
+
+    def test_continuation(self):
+        # Force the pseudo-transient continuation fallback
+        result = txtl.steady_state(conversion_mixture(), maxiter=0)
+        self.assertTrue(result.converged)
+        np.testing.assert_allclose(result.get('P'), 100, rtol=1e-6)
+
+    def test_extract(self):
+        tube1 = txtl.extract('BL21_DE3')
+        tube2 = txtl.buffer('stdbuffer')
+        tube3 = txtl.newtube('geneexpr')
+        txtl.add_dna(tube3, txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', 'tetR(1200)'), 1, 'plasmid')
+        network = txtl.compile_mixture(
+            txtl.combine_tubes([tube1, tube2, tube3]))
+        L = txtl.steadystate.conservation_laws(network)
+
+        # The repressor keeps accumulating, so there is no steady state,
+        # but the solvers must not get there by violating the totals
+        for maxiter in (50, 0):
+            result = txtl.steady_state(network, maxiter=maxiter)
+            self.assertFalse(result.converged)
+            np.testing.assert_allclose(result.values @ L, network.x0 @ L,
+                                       atol=1e-5)
+            self.assertAlmostEqual(result.get('RecBCD'),
+                                   network.x0[network.species.index(
+                                       'RecBCD')], places=5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# sweep_test.py - test suite for adaptive parameter sweeps
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from txtl.sweep import adaptive_grid
+from txtl.sensitivity import evaluate_samples
+from .conversion import conversion_mixture
+
+# Steep dose response (Hill function with coefficient 4)
+def dose_response(X):
+    return X[:, :1] ** 4 / (X[:, :1] ** 4 + 1)
+
+class TestAdaptiveGrid(unittest.TestCase):
+
+    def test_dose_response(self):
+        result = adaptive_grid(dose_response, [(1e-2, 1e2)], npoints=5,
+                               depth=5, tol=0.01, log_scale=True)
+        self.assertEqual(result.resolution, 129)
+        self.assertLess(result.npoints, result.resolution / 3)
+        self.assertEqual(sum(result.levels), result.npoints)
+
+        # The interpolated map matches the function on the dense grid
+        expected = dose_response(result.axes[0][:, None])
+        np.testing.assert_allclose(result.grid(), expected, atol=0.01)
+
+        # The points are concentrated in the transition region
+        inside = (result.samples[:, 0] > 0.1) & (result.samples[:, 0] < 10)
+        self.assertGreater(np.sum(inside), result.npoints / 2)
+
+    def test_thresholds(self):
+        # Cells crossing the threshold are refined to the finest level
+        result = adaptive_grid(dose_response, [(1e-2, 1e2)], depth=5,
+                               tol=1, thresholds=0.5, log_scale=True)
+        lower = result.indices[result.values[:, 0] < 0.5, 0].max()
+        upper = result.indices[result.values[:, 0] >= 0.5, 0].min()
+        self.assertEqual(upper - lower, 1)
+        self.assertLessEqual(result.npoints, 5 + 5)
+
+    def test_two_factors(self):
+        def ratio(X):
+            return X[:, :1] ** 3 / (X[:, :1] ** 3 + X[:, 1:] ** 3)
+        result = adaptive_grid(ratio, [(0.1, 10), (0.1, 10)], depth=4,
+                               tol=0.02, log_scale=True, names=['a', 'b'])
+        grid = result.grid()
+        self.assertEqual(grid.shape, (65, 65, 1))
+        A, B = np.meshgrid(*result.axes, indexing='ij')
+        expected = ratio(np.column_stack([A.ravel(), B.ravel()]))
+        np.testing.assert_allclose(grid.reshape(-1, 1), expected, atol=0.01)
+        self.assertLess(result.npoints, 65 * 65 / 5)
+
+        # Refinement stops at the maximum number of points
+        limited = adaptive_grid(ratio, [(0.1, 10), (0.1, 10)], depth=4,
+                                tol=0.01, log_scale=True, max_points=100)
+        self.assertLessEqual(limited.npoints, 100)
+        self.assertFalse(np.any(np.isnan(limited.grid())))
+
+class TestMixtureSweep(unittest.TestCase):
+
+    def test_sweep(self):
+        network = txtl.compile_mixture(conversion_mixture())
+        result = txtl.adaptive_sweep(
+            network, {'k_cat': (1e-4, 1), 'E': (0.1, 20)}, 600, 'P',
+            depth=2, log_scale=True, thresholds={'P': [10]}, processes=1)
+        self.assertEqual(result.names, ['k_cat', 'E'])
+        self.assertEqual(result.outputs, ['P'])
+        self.assertEqual(result.grid().shape, (17, 17, 1))
+        self.assertGreater(result.levels[1], 0)
+
+        # The values are those of the (batched) simulations
+        rows = [0, result.npoints // 2, result.npoints - 1]
+        values = evaluate_samples(network, result.names,
+                                  result.samples[rows], 600, 'P',
+                                  processes=1)
+        np.testing.assert_allclose(result.values[rows], values, rtol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
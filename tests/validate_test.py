@@ -0,0 +1,87 @@
+# validate_test.py - test suite for model validation
+# AP, 19 Oct 2026
+
+import unittest
+import numpy as np
+import txtl
+from txtl.parameter import load_config
+from txtl.network import compile_sbml_model
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.mixture = txtl.create_extract('BL21_DE3')
+        parameters = load_config('BL21_DE3.csv')
+        self.mixture.components[0].parameters = parameters
+        self.mixture.parameters = parameters
+        self.gene = txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', txtl.ProteinCDS('deGFP', 1000))
+        txtl.add_dna(self.mixture, txtl.assemble_dna(
+            'ptet(50)', 'BCD2(20)', 'tetR(1200)'), 1, 'plasmid')
+        txtl.add_dna(self.mixture, self.gene, 1, 'plasmid')
+
+    def checks(self, report):
+        return set(issue.check for issue in report.issues)
+
+    def test_valid_mixture(self):
+        report = txtl.validate(self.mixture)
+        self.assertTrue(report.ok)
+        self.assertEqual(self.checks(report), {'unreferenced_species'})
+        self.assertEqual(report.network.nreactions,
+                         txtl.compile_mixture(self.mixture).nreactions)
+        report.raise_errors()
+
+    def test_missing_repressor(self):
+        promoter = txtl.RepressedPromoter('ptet', 'lacI')
+        txtl.add_dna(self.mixture, txtl.assemble_dna(
+            promoter, 'BCD2(20)', txtl.ProteinCDS('deGFP2', 1000)), 1)
+        report = txtl.validate(self.mixture)
+        self.assertFalse(report.ok)
+        self.assertIsNone(report.network)
+        self.assertEqual(len(report.find('build')), 1)
+        self.assertRaises(txtl.ValidationError, report.raise_errors)
+
+    def test_undefined_species(self):
+        self.mixture._update_sbml_model()
+        model = self.mixture.model
+        self.assertIsNotNone(model.removeSpecies('Ribo'))
+        self.assertRaises(KeyError, compile_sbml_model, model)
+
+        issues = []
+        network = compile_sbml_model(model, issues=issues)
+        report = txtl.validate(network)
+        self.assertIn('undefined_species', set(issue[0] for issue in issues))
+        self.assertTrue(np.any(np.isnan(network.k)))
+        self.assertIn('missing_rate', self.checks(report))
+
+    def test_values(self):
+        network = txtl.compile_mixture(self.mixture)
+        order = np.sum(network.reactants < network.nspecies, axis=1)
+        first, second = np.flatnonzero(order == 1)[:2]
+        network.k[first] = -1
+        network.k[second] *= 1e9
+        network.x0[0] = np.nan
+
+        report = txtl.validate(network)
+        self.assertEqual(
+            [issue.target for issue in report.find('negative_rate')],
+            [network.reactions[first]])
+        self.assertEqual([issue.target for issue in report.find('scaling')],
+                         [network.reactions[second]])
+        self.assertEqual(
+            [issue.target for issue in report.find('initial_concentration')],
+            [network.species[0]])
+
+    def test_duplicates(self):
+        nreactions = txtl.compile_mixture(self.mixture).nreactions
+        txtl.add_dna(self.mixture, self.gene, 1, 'plasmid')
+        report = txtl.validate(self.mixture)
+        self.assertTrue(report.ok)
+
+        # Each reaction of the gene appears twice
+        duplicates = report.find('duplicate_reaction')
+        self.assertEqual(len(duplicates),
+                         report.network.nreactions - nreactions)
+
+if __name__ == '__main__':
+    unittest.main()
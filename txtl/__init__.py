@@ -6,6 +6,8 @@ from .mixture import *
 from .mechanism import *
 from .component import *
 from .parameter import *
+from .paramdb import ParameterDatabase, get_parameter_database, \
+    set_parameter_path
 
 # Core components
 from .extract import *
@@ -14,6 +16,21 @@ from .dna import *
 # Additional functions
 from .sbmlutil import *
 
+# Compiled reaction networks, simulation and analysis
+from .network import ReactionNetwork, compile_mixture
+from .simulate import SimulationResult, SolverStats, runsim, runsim_batch
+from .simulate import Checkpoint, load_checkpoint
+from .fit import FitResult, fit_parameters
+from .steadystate import SteadyState, steady_state
+from .ensemble import EnsembleResult, run_ensemble
+from .incubation import Preincubation, preincubate
+from .prune import PruningResult, prune_network
+from .diagnostics import Diagnostics, diagnose
+from .sensitivity import SensitivityResult, morris, sobol
+from .sweep import SweepResult, adaptive_sweep
+from .validate import ValidationReport, ValidationError, validate
+from .spec import build_mixture
+
 # Some constants used through the library
 minutes = 60                    # number of seconds in a minute
 hours = 60 * 60                 # number of seconds in an hour
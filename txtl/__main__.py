@@ -0,0 +1,7 @@
+# __main__.py - run the txtl console command with `python -m txtl`
+# AP, 19 Oct 2026
+
+import sys
+from .cli import main
+
+sys.exit(main())
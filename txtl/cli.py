@@ -0,0 +1,274 @@
+# cli.py - command line interface for the txtl toolbox
+# AP, 19 Oct 2026
+#
+# This file contains the `txtl` console command, which runs batches of
+# simulations described by declarative experiment files, so that batch
+# jobs do not have to be written as scripts.  An experiment file is a
+# JSON (or, if PyYAML is installed, YAML) file of the form
+#
+#   {
+#     "name": "geneexpr",
+#     "mixture": {                              # mixture spec
+#       "extract": "BL21_DE3", "buffer": "stdbuffer",
+#       "dna": [{"parts": ["ptet(50)", "BCD2(20)", "tetR(1200)"],
+#                "conc": 1, "type": "plasmid"},
+#               {"parts": ["ptet(50)", "BCD2(20)",
+#                          {"type": "ProteinCDS", "name": "deGFP"}],
+#                "conc": 1}]
+#     },
+#     "duration": 28800,                        # seconds
+#     "npts": 100,
+#     "species": ["Protein_deGFP"],             # outputs (default: all)
+#     "options": {"method": "BDF"},             # other runsim() arguments
+#     "sweep": {                                # values to sweep over
+#       "dna.0.conc": [0.5, 1, 2],
+#       "dna.1.conc": [1, 2]
+#     },
+#     "output": "results",                      # output directory
+#     "format": "csv"                           # or "npz"
+#   }
+#
+# The mixture spec is described in txtl/spec.py.  Each key of "sweep" is
+# a path to an entry of the mixture spec (dictionary keys and list
+# indices separated by dots), and one simulation is run for each
+# combination of the swept values.  Results are written to one file per
+# run in the output directory (relative to the experiment file), along
+# with a manifest (manifest.json) listing the completed runs and their
+# swept values.  Runs that are already in the manifest are skipped, so
+# an interrupted campaign can be restarted without redoing completed
+# runs.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import os
+import sys
+import copy
+import json
+import time
+import asyncio
+import argparse
+import itertools
+
+import numpy as np
+
+from .spec import spec_key
+from .service import SimulationService, run_service
+
+# Keys allowed in an experiment file
+_experiment_keys = {'name', 'mixture', 'duration', 'npts', 'species',
+                    'observables', 'options', 'sweep', 'output', 'format'}
+
+# Read an experiment file
+def load_experiment(filename):
+    """Read an experiment description from a JSON or YAML file
+
+    The output directory is interpreted relative to the location of
+    the file.  Returns a dictionary.
+
+    """
+    with open(filename) as file:
+        if os.path.splitext(filename)[1].lower() in ('.yml', '.yaml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is required to read %s" % filename)
+            experiment = yaml.safe_load(file)
+        else:
+            experiment = json.load(file)
+    if not isinstance(experiment, dict):
+        raise ValueError("%s: experiment must be a dictionary" % filename)
+    experiment.setdefault(
+        'name', os.path.splitext(os.path.basename(filename))[0])
+    experiment['output'] = os.path.join(
+        os.path.dirname(os.path.abspath(filename)),
+        experiment.get('output', experiment['name']))
+    return experiment
+
+# List the simulations in an experiment
+def expand_runs(experiment):
+    """Return the simulations to be run for an experiment
+
+    Returns a list of (name, swept values, mixture spec, key) tuples,
+    one for each combination of the values in the sweep.  The key
+    identifies the simulation (mixture, duration and outputs) and is
+    used to recognize completed runs.
+
+    """
+    unknown = set(experiment) - _experiment_keys
+    if unknown:
+        raise ValueError("unknown experiment keys: %s" %
+                         ", ".join(sorted(unknown)))
+    if 'mixture' not in experiment or 'duration' not in experiment:
+        raise ValueError("experiment must give a mixture and a duration")
+
+    sweep = experiment.get('sweep', {})
+    paths = sorted(sweep)
+    runs = []
+    for index, values in enumerate(
+            itertools.product(*[sweep[path] for path in paths])):
+        spec = copy.deepcopy(experiment['mixture'])
+        spec.setdefault('name', experiment['name'])
+        for path, value in zip(paths, values):
+            _set_entry(spec, path, value)
+        key = spec_key([spec, experiment['duration'], _run_options(experiment)])
+        runs.append(("run_%04d" % index, dict(zip(paths, values)), spec, key))
+    return runs
+
+# Set an entry of a spec given by a path
+def _set_entry(spec, path, value):
+    keys = path.split('.')
+    item = spec
+    try:
+        for key in keys[:-1]:
+            item = item[int(key) if isinstance(item, list) else key]
+        item[int(keys[-1]) if isinstance(item, list) else keys[-1]] = value
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise ValueError("sweep: invalid path '%s'" % path)
+
+# Keyword arguments for runsim()
+def _run_options(experiment):
+    options = dict(experiment.get('options', {}))
+    for key in ('npts', 'species', 'observables'):
+        if key in experiment:
+            options[key] = experiment[key]
+    return options
+
+# Run an experiment
+def run_experiment(experiment, workers=None, force=False, progress=None):
+    """Simulate all runs of an experiment and write the results
+
+    The runs are simulated in parallel using a SimulationService with
+    the given number of `workers`.  Runs listed in the manifest of the
+    output directory are skipped unless `force` is True.  If given,
+    `progress` is called with a message after each run.  Returns a
+    dictionary mapping run names to the error message for each run that
+    failed (empty if all runs succeeded).
+
+    """
+    runs = expand_runs(experiment)
+    fmt = experiment.get('format', 'csv')
+    if fmt not in ('csv', 'npz'):
+        raise ValueError("unknown output format '%s'" % fmt)
+    directory = experiment['output']
+    os.makedirs(directory, exist_ok=True)
+
+    manifest_file = os.path.join(directory, 'manifest.json')
+    manifest = _read_manifest(manifest_file) if not force else {}
+    todo = [run for run in runs if not _completed(manifest, run, directory)]
+    report = progress or (lambda message: None)
+    report("%s: %d runs, %d to simulate" % (
+        experiment['name'], len(runs), len(todo)))
+    failed = {}
+
+    async def simulate(service, run):
+        start = time.time()
+        try:
+            result = await service.submit(
+                run[2], experiment['duration'], **_run_options(experiment))
+        except Exception as error:
+            return run, "%s: %s" % (type(error).__name__, error), None
+        return run, result, time.time() - start
+
+    async def main():
+        async with SimulationService(workers) as service:
+            for count, task in enumerate(asyncio.as_completed(
+                    [simulate(service, run) for run in todo]), 1):
+                (name, values, spec, key), result, elapsed = await task
+                if elapsed is None:
+                    failed[name] = result
+                    report("[%d/%d] %s failed: %s" % (
+                        count, len(todo), name, result))
+                    continue
+                filename = name + '.' + fmt
+                _write_result(os.path.join(directory, filename), result, fmt)
+                manifest[name] = {'key': key, 'file': filename,
+                                  'values': values}
+                _write_manifest(manifest_file, experiment['name'], manifest)
+                report("[%d/%d] %s done (%.1f s)" % (
+                    count, len(todo), name, elapsed))
+
+    if todo:
+        asyncio.run(main())
+    return failed
+
+# Check whether a run was completed by an earlier invocation
+def _completed(manifest, run, directory):
+    name, values, spec, key = run
+    entry = manifest.get(name)
+    return entry is not None and entry.get('key') == key and \
+        os.path.exists(os.path.join(directory, entry['file']))
+
+def _read_manifest(filename):
+    try:
+        with open(filename) as file:
+            return json.load(file).get('runs', {})
+    except (OSError, ValueError):
+        return {}
+
+# Write a file atomically (so that interrupted runs leave no partial files)
+def _replace(filename, write):
+    tmpname = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmpname, 'wb') as file:
+        write(file)
+    os.replace(tmpname, filename)
+
+def _write_manifest(filename, name, runs):
+    _replace(filename, lambda file: file.write(json.dumps(
+        {'experiment': name, 'runs': runs}, indent=2, sort_keys=True,
+        default=str).encode()))
+
+def _write_result(filename, result, fmt):
+    if fmt == 'npz':
+        _replace(filename, lambda file: np.savez(
+            file, timepoints=result.timepoints, values=result.values,
+            species=np.array(result.species)))
+    else:
+        _replace(filename, lambda file: np.savetxt(
+            file, np.column_stack([result.timepoints, result.values]),
+            delimiter=',', header=','.join(['time'] + result.species),
+            comments=''))
+
+# Console command
+def main(argv=None):
+    "Entry point for the txtl console command"
+    parser = argparse.ArgumentParser(
+        prog='txtl', description="TX-TL simulation toolbox")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser(
+        'run', help="simulate the runs described in an experiment file")
+    run.add_argument('experiment', help="experiment file (JSON or YAML)")
+    run.add_argument('-o', '--output', help="output directory")
+    run.add_argument('-j', '--workers', type=int,
+                     help="number of worker processes")
+    run.add_argument('-f', '--force', action='store_true',
+                     help="rerun completed runs")
+    run.add_argument('-q', '--quiet', action='store_true',
+                     help="do not report progress")
+
+    serve = commands.add_parser(
+        'serve', help="run a simulation service on a local socket")
+    serve.add_argument('--socket', help="path of the Unix socket")
+    serve.add_argument('--port', type=int, help="TCP port on localhost")
+    serve.add_argument('-j', '--workers', type=int,
+                       help="number of worker processes")
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        run_service(args.socket, None, args.port, args.workers)
+        return 0
+
+    try:
+        experiment = load_experiment(args.experiment)
+        if args.output is not None:
+            experiment['output'] = args.output
+        failed = run_experiment(
+            experiment, args.workers, args.force, None if args.quiet else
+            lambda message: print(message, file=sys.stderr, flush=True))
+    except (OSError, ValueError) as error:
+        parser.exit(2, "txtl: error: %s\n" % error)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
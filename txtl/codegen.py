@@ -0,0 +1,190 @@
+# codegen.py - code generation for compiled reaction networks
+# AP, 19 Oct 2026
+#
+# This file contains functions that generate specialized Python source
+# code for the right hand side and Jacobian of a ReactionNetwork.  The
+# structure of the network (reactant indices, stoichiometric
+# coefficients and the sparsity pattern of the Jacobian) is written
+# into the generated module as constant arrays, and the evaluation
+# functions are simple loops over these arrays using flat indexing.
+# The rate constants (and the Hill constants of repressed reactions)
+# are passed as arguments, so a generated module can be used for any
+# network with the same structure.
+#
+# The loops are written so that they can be compiled by Numba, which
+# is used (if installed) to just-in-time compile the functions; the
+# compiled code is cached by Numba next to the generated module.
+# Generated modules are cached on disk, keyed by the structure hash of
+# the network.
+#
+# Note: the loops are not written out as straight-line code (one
+# statement per reaction) since for large networks the resulting
+# functions are slower than the vectorized numpy code in Python and
+# take minutes to compile with Numba.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import os
+import importlib.util
+import numpy as np
+from warnings import warn
+
+from .pathutil import get_cache_dir
+
+# Version of the generated code (change to invalidate cached modules)
+codegen_version = 3
+
+# Template for the generated module
+_template = '''\
+# Generated by txtl.codegen for network {name}
+# Structure hash: {hash}
+import numpy as np
+
+NSPECIES = {nspecies}
+NREACTIONS = {nreactions}
+ORDER = {order}
+POSITIONS = {positions}
+NJAC = {njac}
+
+# Reactant indices (padded with NSPECIES)
+REACTANTS = np.array({reactants}, dtype=np.int64).reshape(NREACTIONS, ORDER)
+
+# Repressor indices (NSPECIES if the reaction is not repressed)
+MODIFIERS = np.array({modifiers}, dtype=np.int64)
+
+# Stoichiometry, stored by reaction
+STOICH_PTR = np.array({stoich_ptr}, dtype=np.int64)
+STOICH_SPECIES = np.array({stoich_species}, dtype=np.int64)
+STOICH_COEFF = np.array({stoich_coeff}, dtype=np.float64)
+
+# Contributions to the Jacobian, stored by (reaction, position), where
+# the positions are the reactants followed by the repressor (if any)
+JAC_PTR = np.array({jac_ptr}, dtype=np.int64)
+JAC_SLOT = np.array({jac_slot}, dtype=np.int64)
+JAC_COEFF = np.array({jac_coeff}, dtype=np.float64)
+
+def rhs(t, x, k, hill):
+    dx = np.zeros(NSPECIES)
+    for j in range(NREACTIONS):
+        rate = k[j]
+        for p in range(ORDER):
+            i = REACTANTS[j, p]
+            if i < NSPECIES:
+                rate *= x[i]
+        r = MODIFIERS[j]
+        if r < NSPECIES:
+            rate /= 1 + (x[r] / hill[j, 0]) ** hill[j, 1]
+        for q in range(STOICH_PTR[j], STOICH_PTR[j+1]):
+            dx[STOICH_SPECIES[q]] += STOICH_COEFF[q] * rate
+    return dx
+
+def jac(t, x, k, hill, out):
+    out[:] = 0
+    for j in range(NREACTIONS):
+        # Hill repression factor and its derivative
+        h, dh = 1.0, 0.0
+        r = MODIFIERS[j]
+        if r < NSPECIES:
+            u = x[r] / hill[j, 0]
+            h = 1 / (1 + u ** hill[j, 1])
+            dh = -hill[j, 1] * u ** (hill[j, 1] - 1) / hill[j, 0] * h * h
+
+        for p in range(POSITIONS):
+            if p < ORDER and REACTANTS[j, p] == NSPECIES or \
+               p == ORDER and r == NSPECIES:
+                continue
+
+            # Derivative of the rate with respect to position p
+            partial = k[j] * (h if p < ORDER else dh)
+            for q in range(ORDER):
+                i = REACTANTS[j, q]
+                if q != p and i < NSPECIES:
+                    partial *= x[i]
+
+            m = j * POSITIONS + p
+            for q in range(JAC_PTR[m], JAC_PTR[m+1]):
+                out[JAC_SLOT[q]] += JAC_COEFF[q] * partial
+    return out
+'''
+
+# Generate the source code for a network
+def generate_source(network):
+    """Generate Python source code for the right hand side of a network
+
+    The generated module defines two functions:
+
+      rhs(t, x, k, hill)        time derivative of the state
+      jac(t, x, k, hill, out)   nonzero entries of the Jacobian, in the
+                                order given by `network.jacobian_pattern()`
+
+    where `hill` contains the Hill constants (K, n) of each reaction
+    (ignored for reactions that are not repressed).
+
+    """
+    stoich = network.stoichiometry.tocsc()
+    stoich.sort_indices()
+    jac_map = network.jacobian_map().tocsr()
+    jac_map.sort_indices()
+    modifiers = network.modifiers if network.modifiers is not None else \
+        np.full(network.nreactions, network.nspecies)
+    return _template.format(
+        name=network.name, hash=network.structure_hash(),
+        nspecies=network.nspecies, nreactions=network.nreactions,
+        order=network.reactants.shape[1],
+        positions=network._positions().shape[1], njac=jac_map.shape[1],
+        reactants=_array_literal(network.reactants.ravel()),
+        modifiers=_array_literal(modifiers),
+        stoich_ptr=_array_literal(stoich.indptr),
+        stoich_species=_array_literal(stoich.indices),
+        stoich_coeff=_array_literal(stoich.data),
+        jac_ptr=_array_literal(jac_map.indptr),
+        jac_slot=_array_literal(jac_map.indices),
+        jac_coeff=_array_literal(jac_map.data))
+
+# Format an array as a (wrapped) list literal
+def _array_literal(array, width=8):
+    items = [repr(v.item()) for v in np.asarray(array)]
+    lines = [", ".join(items[i:i+width]) for i in range(0, len(items), width)]
+    return "[\n    " + ",\n    ".join(lines) + "]" if lines else "[]"
+
+# Load (or generate) the functions for a network
+def load_functions(network, jit=None, cache_dir=None):
+    """Load the generated right hand side functions for a network
+
+    Returns a tuple (rhs, jac) of generated functions for the network,
+    generating and caching the source code if it is not already in the
+    cache.  If `jit` is True (or None), the functions are compiled with
+    Numba.  If `jit` is True and Numba is not installed, an ImportError
+    is raised; if `jit` is None, a warning is issued and None is
+    returned instead (since the uncompiled loops are slower than the
+    vectorized numpy code).  If `jit` is False, the uncompiled
+    functions are returned.
+
+    """
+    if jit is not False:
+        try:
+            import numba
+        except ImportError:
+            if jit:
+                raise
+            warn("load_functions: Numba is not installed; using the "
+                 "vectorized numpy code instead of generated code")
+            return None
+
+    name = "txtl_network_%s_v%d" % (network.structure_hash(), codegen_version)
+    filename = os.path.join(get_cache_dir(cache_dir), name + ".py")
+    if not os.path.exists(filename):
+        # Write to a temporary file first so that readers never see a
+        # partially written module
+        tmpname = "%s.%d.tmp" % (filename, os.getpid())
+        with open(tmpname, 'w') as file:
+            file.write(generate_source(network))
+        os.replace(tmpname, filename)
+
+    spec = importlib.util.spec_from_file_location(name, filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if jit is False:
+        return module.rhs, module.jac
+    return numba.njit(cache=True)(module.rhs), numba.njit(cache=True)(module.jac)
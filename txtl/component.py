@@ -14,10 +14,12 @@ Components
 General documentation about components (TODO).
 """
 
+import numbers
 from warnings import warn
 from .sbmlutil import add_species, add_reaction
-from .mechanism import get_mechanisms
+from .mechanism import MechanismDict, get_mechanisms
 from .parameter import eval_parameter
+from .mixture import _combine
 
 # Component class for core components
 class Component:
@@ -46,6 +48,9 @@ class Component:
     write_config_file() write parametr value to configuration file
 
     """
+    # No instance dictionary unless a subclass needs one (see txtl.dna)
+    __slots__ = ()
+
     def __init__(self, name,
                  # expected_arg = default_val       # expected arguments
                  mechanisms={},                     # custom mechanisms
@@ -82,12 +87,12 @@ class Component:
         # should be placed in the mechanisms/ diretory and imported
         # before use.
         #
-        self.default_mechanisms = {
+        self.default_mechanisms = MechanismDict({
             # 'mechanism' : MechanismConstructor()
-        }
+        })
 
         # Add (or overwrite) any mechanisms passed as arguments
-        self.custom_mechanisms = mechanisms
+        self.custom_mechanisms = MechanismDict(mechanisms)
 
         # Create the config_file name (optional)
         if config_file == None:
@@ -105,6 +110,14 @@ class Component:
         # Alternative setup for setting parameter values
         #
 
+    # Create a mixture containing the component (mix += conc * component)
+    def __mul__(self, conc):
+        if not isinstance(conc, numbers.Real):
+            return NotImplemented
+        return _combine([(conc, self)], self.name)
+
+    __rmul__ = __mul__
+
     # Define update_parameters to do nothing (overriden by extracts)
     def update_parameters(self, mixture):
         "Update (or create) (global) parameters in the model"
@@ -11,6 +11,8 @@ from ..dna import ProteinCDS
 #! TODO: decide if this should be CDS_tetr
 class cds_tetr(ProteinCDS):
     "DNA for TetR protein"
+    __slots__ = ()
+
     def __init__(self, name='TetR', *args, **kwargs):
         ProteinCDS.__init__(self, name=name, *args, **kwargs, dimerize=True)
 
@@ -13,6 +13,8 @@ from ..dna import DegradationTag
 
 class ctag_lva(DegradationTag):
     "LVA degradation tag"
+    __slots__ = ()
+
     def __init__(self, name='lva', protease="ClpXP", *args, **kwargs):
         DegradationTag.__init__(
             self, name=name, protease=protease, *args, **kwargs, dimerize=True)
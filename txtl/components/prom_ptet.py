@@ -10,6 +10,8 @@ from ..dna import RepressedPromoter
 
 class prom_ptet(RepressedPromoter):
     "ptet promoter"
+    __slots__ = ()
+
     def __init__(
         self, name='ptet', length=50,
         mechanisms={}, config_file='prom_ptet.csv', parameters={},
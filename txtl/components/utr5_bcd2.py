@@ -13,6 +13,8 @@ from ..dna import ConstitutiveRBS
 
 class utr5_bcd2(ConstitutiveRBS):
     "BCD2 RBS"
+    __slots__ = ()
+
     def __init__(self, name='BCD2', *args, **kwargs):
         ConstitutiveRBS.__init__(
             self, name=name, *args, **kwargs, dimerize=True)
@@ -0,0 +1,261 @@
+# diagnostics.py - stiffness and performance diagnostics for simulations
+# AP, 19 Oct 2026
+#
+# This file contains functions for finding out why a simulation is slow.
+# A mixture is simulated with the integrator statistics enabled (step
+# counts, rejected steps, Jacobian evaluations and the wall time spent
+# in each phase, see txtl.simulate.SolverStats), and the Jacobian of the
+# network is analysed at a few points along the trajectory.  The
+# eigenvalues of the Jacobian give the fastest and slowest time scales
+# of the system (the ratio is a measure of its stiffness), and the
+# fastest eigenvalue is split into the contributions of the individual
+# reactions, which are mapped back to the mechanisms (from the prefix
+# of the reaction ids) and the DNA assemblies (from the species they
+# involve) that created them.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import re
+import time
+import numpy as np
+import scipy.linalg
+
+from .simulate import get_network, runsim
+from .dna import DNAassembly
+from .sbmlutil import _id_from_name
+
+# Mechanisms (or DNA elements) that create reactions, by id prefix
+reaction_mechanisms = {
+    'txb_': 'transcription',
+    'tlb_': 'translation',
+    'repr_': 'repression',
+    'degradation_rna_basic_': 'RNA degradation',
+    'dna_': 'DNA',
+    'prom_': 'promoter',
+    'utr5_': "5' UTR",
+    'cds_': 'coding sequence',
+    'ctag_': 'C-terminal tag',
+    'utr3_': "3' UTR",
+    'term_': 'terminator',
+}
+
+# Eigenvalues smaller than this (relative to the largest one) are zero
+_eigenvalue_cutoff = 1e-10
+
+# Reactions with a smaller share of the fastest eigenvalue are not listed
+_weight_cutoff = 1e-6
+
+class HotReaction:
+    """Contribution of a reaction to the stiffness of a network
+
+    Data attributes
+    ---------------
+    reaction    Reaction id (str)
+    mechanism   Mechanism (or DNA element) that created the reaction,
+                from the prefix of the reaction id (str)
+    components  Names of the DNA assemblies whose species take part in
+                the reaction (list of str, empty for extract reactions)
+    weight      Largest share of the fastest eigenvalue of the Jacobian
+                contributed by the reaction (over the sample points)
+    time        Sample time at which the largest share was found
+
+    """
+    def __init__(self, reaction, mechanism, components, weight, time):
+        self.reaction = reaction
+        self.mechanism = mechanism
+        self.components = components
+        self.weight = weight
+        self.time = time
+
+    def __str__(self):
+        return "%-40s %-16s %-30s %6.1f%% (t = %g s)" % (
+            self.reaction, self.mechanism,
+            ", ".join(self.components) or "-", 100 * self.weight, self.time)
+
+class Diagnostics:
+    """Diagnostics for the simulation of a reaction network
+
+    Data attributes
+    ---------------
+    network     Reaction network that was simulated (ReactionNetwork)
+    result      Simulation result, with all species (SimulationResult)
+    stats       Integrator statistics (SolverStats)
+    times       Wall time in seconds for each phase of the diagnosis
+                (dict): 'compile' for compiling the mixture, 'simulation'
+                (see stats.times for the breakdown), 'analysis' for the
+                eigenvalue analysis and 'total'
+    timepoints  Sample times at which the Jacobian was analysed (ndarray)
+    fastest     Fastest time scale (1 / largest |Re(eigenvalue)|) at each
+                sample time (ndarray)
+    slowest     Slowest (nonzero) time scale at each sample time (ndarray)
+    stiffness   Ratio of the slowest and fastest time scales (ndarray)
+    hot_reactions
+                Reactions contributing the most to the fastest time
+                scale, in decreasing order of weight (list of HotReaction)
+
+    """
+    def __init__(self, network, result, times, timepoints, fastest,
+                 slowest, hot_reactions):
+        self.network = network
+        self.result = result
+        self.stats = result.stats
+        self.times = times
+        self.timepoints = timepoints
+        self.fastest = fastest
+        self.slowest = slowest
+        self.hot_reactions = hot_reactions
+
+    @property
+    def stiffness(self):
+        return self.slowest / self.fastest
+
+    def __str__(self):
+        lines = ["%s: %d species, %d reactions" % (
+            self.network.name, self.network.nspecies,
+            self.network.nreactions), str(self.stats)]
+        lines.append("wall time: " + ", ".join(
+            "%s %.3g s" % item for item in self.times.items()))
+        lines.append("%12s %12s %12s %12s" % (
+            "time [s]", "fastest [s]", "slowest [s]", "stiffness"))
+        for row in zip(self.timepoints, self.fastest, self.slowest,
+                       self.stiffness):
+            lines.append("%12.4g %12.4g %12.4g %12.4g" % row)
+        lines.append("reactions setting the fastest time scale:")
+        lines += ["  " + str(hot) for hot in self.hot_reactions]
+        return "\n".join(lines)
+
+# Mechanism and DNA assemblies for each reaction of a network
+def reaction_origins(network, mixture=None):
+    """Find the mechanism and DNA assemblies behind each reaction
+
+    The mechanism is determined from the prefix of the reaction id (see
+    `reaction_mechanisms`).  If a `mixture` is given, the reactions are
+    also assigned to the DNA assemblies of the mixture, by matching the
+    species of each reaction with the ids of the DNA, RNA and protein
+    species of the assemblies (in that order, so that the complexes of
+    a repressor with the DNA of another assembly are assigned to the
+    repressed assembly).  The mixture must have been compiled (so that
+    the names of the species of its assemblies are known).  Returns a
+    list of (mechanism, list of assembly names) tuples, one per
+    reaction.
+
+    """
+    # Ids of the DNA, RNA and protein of each assembly
+    levels = [[], [], []]
+    if mixture is not None:
+        for assy in mixture.components:
+            if not isinstance(assy, DNAassembly):
+                continue
+            for level, name in zip(levels, (
+                    assy.name, getattr(assy, 'rnaname', None),
+                    getattr(assy, 'protname', None))):
+                if name is not None:
+                    level.append(("_%s_" % _id_from_name(name), assy.name))
+
+    stoich = abs(network.stoichiometry).tocsc()
+    origins = []
+    for j, id in enumerate(network.reactions):
+        prefix = re.sub(r"\d+$", "", id)
+        species = set(stoich.indices[stoich.indptr[j]:stoich.indptr[j+1]])
+        species.update(i for i in network.reactants[j]
+                       if i < network.nspecies)
+        if network.modifiers is not None and \
+           network.modifiers[j] < network.nspecies:
+            species.add(network.modifiers[j])
+        names = ["_%s_" % network.species[i] for i in sorted(species)]
+
+        components = []
+        for level in levels:
+            components = [assy for pattern, assy in level
+                          if any(pattern in name for name in names)]
+            if components:
+                break
+        origins.append((reaction_mechanisms.get(prefix, prefix),
+                        sorted(set(components))))
+    return origins
+
+# Time scales and reaction contributions at a state
+def stiffness_analysis(network, x, t=0):
+    """Analyse the eigenvalues of the Jacobian at a state
+
+    Returns the fastest and slowest time scales (the inverse of the
+    largest and smallest nonzero |Re(eigenvalue)|) and the contribution
+    of each reaction to the fastest eigenvalue (array, n_reactions).
+    The contributions are computed from the left and right eigenvectors
+    (w, v) of the eigenvalue and the factorization J = S dr/dx of the
+    Jacobian: reaction j contributes (w S_j) (dr_j/dx v) / (w v), and
+    the contributions sum to the eigenvalue.  The analysis uses dense
+    matrices, so it is meant for networks with up to a few thousand
+    species.
+
+    """
+    J = network.jacobian(t, x)
+    values, left, right = scipy.linalg.eig(J, left=True, right=True)
+    rates = np.abs(values.real)
+    nonzero = rates > _eigenvalue_cutoff * rates.max()
+    if not np.any(nonzero):
+        return np.inf, np.inf, np.zeros(network.nreactions)
+
+    m = np.argmax(rates)
+    w, v = left[:, m].conj(), right[:, m]
+    contributions = (network.stoichiometry.T @ w) * \
+        (network.rate_jacobian(x) @ v) / (w @ v)
+    return 1 / rates[m], 1 / rates[nonzero].min(), contributions.real
+
+# Run a simulation and report its performance and stiffness
+def diagnose(mixture, duration, npts=100, nsamples=5, top=10,
+             method='LSODA', **options):
+    """Diagnose the performance of a simulation
+
+    The mixture (or compiled network) is simulated for `duration`
+    seconds with the integrator statistics enabled (all species are
+    recorded at `npts` time points), and the Jacobian is analysed at
+    `nsamples` evenly spaced time points, including the initial time
+    (see stiffness_analysis()).  The `top` reactions with the largest
+    (nonnegligible) share of the fastest eigenvalue are reported, with
+    the mechanism and DNA assemblies that created them (see
+    reaction_origins()).  Additional keywords are passed to runsim().
+
+    Returns a Diagnostics object (print it for a summary).
+
+    """
+    start = time.perf_counter()
+    network = get_network(mixture)
+    compiled = time.perf_counter()
+    result = runsim(network, duration, npts=npts, method=method,
+                    stats=True, **options)
+    simulated = time.perf_counter()
+
+    # Analyse the Jacobian along the trajectory
+    samples = np.unique(np.linspace(0, len(result.timepoints) - 1,
+                                    nsamples).round().astype(int))
+    fastest, slowest, weights = [], [], []
+    for i in samples:
+        fast, slow, contributions = stiffness_analysis(
+            network, result.values[i], result.timepoints[i])
+        fastest.append(fast)
+        slowest.append(slow)
+        total = np.abs(contributions).sum()
+        weights.append(np.abs(contributions) / total if total > 0 else
+                       np.zeros_like(contributions))
+    weights = np.array(weights)
+
+    # Reactions with the largest share of the fastest eigenvalue
+    origins = reaction_origins(
+        network, None if mixture is network else mixture)
+    largest = weights.max(axis=0)
+    hot_reactions = []
+    for j in np.argsort(-largest, kind='stable')[:top]:
+        if largest[j] < _weight_cutoff:
+            break
+        mechanism, components = origins[j]
+        hot_reactions.append(HotReaction(
+            network.reactions[j], mechanism, components, float(largest[j]),
+            float(result.timepoints[samples[np.argmax(weights[:, j])]])))
+    finished = time.perf_counter()
+
+    times = {'compile': compiled - start, 'simulation': simulated - compiled,
+             'analysis': finished - simulated, 'total': finished - start}
+    return Diagnostics(network, result, times, result.timepoints[samples],
+                       np.array(fastest), np.array(slowest), hot_reactions)
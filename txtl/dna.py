@@ -12,11 +12,11 @@
 import re                      # use Python's regular expression library
 from math import log
 from .component import Component
-from .sbmlutil import add_species, add_reaction, find_species
-from .mechanism import Mechanism, get_mechanisms
+from .sbmlutil import add_reaction, add_global_parameter, _add_species_index
+from .mechanism import Mechanism, MechanismDict, get_mechanisms
 from .pathutil import load_model
 from .parameter import get_parameters, update_existing, update_missing
-from .mechanisms import maturation
+from .mechanisms import maturation, repression
 
 #
 # DNA assembly
@@ -36,6 +36,13 @@ from .mechanisms import maturation
 # available in the element initializer (since we don't yet know what
 # assembly we will be part of).
 #
+# Assemblies and elements use __slots__ (large libraries contain many
+# of them) and refer to the species that they create by their index
+# in the model of the mixture (see `sbmlutil.species_index()`) rather
+# than by SBML object, so that they don't keep references into the
+# SBML document of a mixture after it is discarded.  Subclasses should
+# list any new attributes in __slots__.
+#
 
 class DNAassembly(Component):
     """DNA assembly class
@@ -68,15 +75,21 @@ class DNAassembly(Component):
     rnalength   Length of the transcribed components (int)
     peplength   Lenth of the translated components (int)
 
-    rnaname     Name of the RNA species (str) [not implemented]
-    rnap        RNAP species (SMBLspecies) [not implemented]
-    riboname    Name of the ribosome species (str) [not implemented]
-    ribo        Ribosome species [not implemented]
+    rnaname     Name of the RNA species (str)
+    protname    Name of the protein species (str)
+    dna, rna, protein, rnap_bound, ribo_bound
+                Index of the DNA, RNA, protein and RNAP/ribosome
+                complex species in the model of the mixture (int, set
+                by update_species())
 
     default_mechanisms  default mechanisms for generating models
     custom_mechanisms   customized mechanisms for generating models
 
     parameters  Parameter values for the assembly (overrides elements)
+    template    Allow the assembly to be created from a template (bool,
+                default True); set to False if the species or reactions
+                depend on anything other than the names, parameters and
+                attributes (see txtl.template)
 
     Methods
     -------
@@ -84,6 +97,13 @@ class DNAassembly(Component):
     update_reactions()  create/update reactions associated with construct
 
     """
+    __slots__ = (
+        'name', 'promoter', 'utr5', 'cds', 'ctag', 'utr3',
+        'dnalength', 'rnalength', 'peplength',
+        'default_mechanisms', 'custom_mechanisms', 'config_file',
+        'parameters', 'template', 'rnaname', 'protname',
+        'dna', 'rna', 'protein', 'rnap_bound', 'ribo_bound')
+
     def __init__(
         self, name,
         promoter=None, utr5=None, cds=None, ctag=None, utr3=None,
@@ -97,6 +117,7 @@ class DNAassembly(Component):
         self.cds = cds
         self.ctag = ctag
         self.utr3 = utr3
+        self.template = True
 
         # Keep track of the length of DNA, RNA, and protein (peptide)
         self.dnalength = 0
@@ -105,10 +126,10 @@ class DNAassembly(Component):
 
         # Set up the default mechanisms for a DNA assembly
         # Note: transcription, translation, degradation are given by extract
-        self.default_mechanisms = {
+        self.default_mechanisms = MechanismDict({
             'maturation' : maturation.protein_basic()
-        }
-        self.custom_mechanisms = mechanisms
+        })
+        self.custom_mechanisms = MechanismDict(mechanisms)
 
         # Create the config_file name (optional)
         if config_file == None and isinstance(name, str):
@@ -119,10 +140,19 @@ class DNAassembly(Component):
         self.parameters = get_parameters(
             config_file, parameters, None, **keywords)
 
+    # Create the model-level parameters referenced by the assembly
+    def update_parameters(self, mixture):
+        for dna in [self, self.promoter, self.utr5, self.cds, self.ctag,
+                    self.utr3]:
+            if dna != None:
+                for param in dna.parameters.values():
+                    if param.type == 'Global':
+                        add_global_parameter(mixture, param.value)
+
     # Create/update all of the species associated with this DNA assembly
     def update_species(self, mixture, conc, debug=False):
         # Create the DNA species
-        self.dna = add_species(mixture, "DNA", self.name, conc)
+        self.dna = _add_species_index(mixture, "DNA", self.name, conc)
 
         # Let the individual DNA elements create the additional species
         for dna in [self.promoter, self.utr5, self.cds, self.ctag, self.utr3]:
@@ -187,6 +217,9 @@ class DNA(Component):
     parameters  Parameter dictionary for the DNA element
 
     """
+    __slots__ = ('name', 'length', 'mechanisms', 'prefix', 'config_file',
+                 'parameters', 'assy')
+
     def __init__(
         self, name, length=0,             # positional arguments
         mechanisms={},                    # custom mechanisms
@@ -196,7 +229,7 @@ class DNA(Component):
     ):
         self.name = name
         self.length = length
-        self.mechanisms = mechanisms
+        self.mechanisms = MechanismDict(mechanisms)
         self.prefix = prefix
 
         # Create the config_file name (optional)
@@ -231,6 +264,7 @@ class DNA(Component):
 # Promoter sequence
 class Promoter(DNA):
     "Promoter class - define a promoter sequence"
+    __slots__ = ('rnapname',)
 
     # Default parameters used to describe a promoter
     default_parameters = {
@@ -264,18 +298,20 @@ class Promoter(DNA):
         assy = self.assy        # Get the DNA assembly we are part of
 
         # Create the mRNA species
-        assy.rnaname = assy.utr5.name + "--" + assy.cds.name
-        if (assy.ctag != None): assy.rnaname += "--" + assy.ctag.name
-        assy.rna = add_species(mixture, "RNA", assy.rnaname, 0)
-
-        # Create RNA polymerase bound to DNA
-        assy.rnap_bound = add_species(mixture, "Complex",
-                                      self.rnapname + ":" + assy.name, 0)
+        self._add_rna(mixture)
 
-        # Create any other species needed by the transcriptional machinery
+        # Create the species needed by the transcriptional machinery
+        # (eg, RNA polymerase bound to DNA)
         mechanisms = get_mechanisms(mixture, assy, self.mechanisms)
         mechanisms['transcription'].update_species(mixture, assy, conc)
         
+    def _add_rna(self, mixture):
+        "Create the mRNA species transcribed from the promoter"
+        assy = self.assy
+        assy.rnaname = assy.utr5.name + "--" + assy.cds.name
+        if (assy.ctag != None): assy.rnaname += "--" + assy.ctag.name
+        assy.rna = _add_species_index(mixture, "RNA", assy.rnaname, 0)
+
     # Default action of a promoter is to implement transcription
     def update_reactions(self, mixture, debug=False):
         model = mixture.model   # Get the model where we will store results
@@ -288,11 +324,17 @@ class Promoter(DNA):
 # Constitute promoter
 class ConstitutivePromoter(Promoter):
     "ConstitutivePromoter - define a constitutive promoter"
+    __slots__ = ()
+
+# Repression mechanism for mixtures that don't define one (eg, mixtures
+# created with extracts that predate the 'repression' mechanism)
+_default_repression = repression.sequestration()
 
 # Repressed promoter
 class RepressedPromoter(Promoter):
     #! TODO: add docstring
-    
+    __slots__ = ('tfname', 'dimer', 'tf_bound')
+
     # Default parameters used to describe a repressed promoter
     default_parameters = {
         'RNAPbound_F'         : 20,      # Default for ptet
@@ -321,35 +363,23 @@ class RepressedPromoter(Promoter):
     def update_species(self, mixture, conc):
         assy = self.assy        # Get the DNA assembly we are part of
 
-        # Create species for unrepressed promoter
-        Promoter.update_species(self, mixture, conc)
-
-        # Create repressor bound to DNA
-        self.tf_bound = add_species(mixture, "Complex",
-                                    self.tfname + ":" + assy.name, 0)
+        # Create the mRNA species
+        self._add_rna(mixture)
 
-        # mechanisms = get_mechanisms(mixture, assy, self.mechanisms)
-        # mechanisms['process'].update_species(mixture, assy, conc)
+        # Create the species for the promoter and the repressor
+        self.tf_bound = None
+        self._repression(mixture).update_species(mixture, assy, conc)
 
     def update_reactions(self, mixture, debug=False):
-        model = mixture.model     # Get the model where we will store results
         assy = self.assy          # Get the DNA assembly we are part of
-        params = self.parameters  # Get the parameter dictionary
-
-        # Create the reactions for the unbound promoter
-        Promoter.update_reactions(self, mixture)
 
-        # Create the reaction for the transcription factor binding to DNA
-        tf_species = find_species(mixture, self.tfname)
-        if tf_species == None:
-            raise NameError("RepressedPromoter: %s not found" % self.tfname)
-        add_reaction(mixture, [tf_species, assy.dna], [self.tf_bound],
-                     kf = params['DNA_Sequestration_F'],
-                     kr = params['DNA_Sequestration_R'],
-                     prefix = "repr_")
+        # Create the reactions for transcription and repression
+        self._repression(mixture).update_reactions(mixture, assy)
 
-        # mechanisms = get_mechanisms(mixture, assy, self.mechanisms)
-        # mechanisms['process'].update_reactions(mixture, assy)
+    def _repression(self, mixture):
+        "Return the repression mechanism (default: sequestration)"
+        mechanisms = get_mechanisms(mixture, self.assy, self.mechanisms)
+        return mechanisms.get('repression', _default_repression)
 
 #
 # UTR5 subclasses
@@ -358,6 +388,7 @@ class RepressedPromoter(Promoter):
 
 class UTR5(DNA):
     "UTR5 class - define 5' untranslated region sequence"
+    __slots__ = ()
 
     # Default parameters used to describe a UTR5 (empty)
     default_parameters = {}
@@ -377,7 +408,8 @@ class UTR5(DNA):
 # Constitutive RBS
 class ConstitutiveRBS(UTR5):
     #! TODO: add docstring
-    
+    __slots__ = ('riboname',)
+
     # Default parameters used to describe a constitutive RBS (TODO)
     default_parameters = {
         'Ribosome_Binding_F' : 0.1,     # TODO: add source information
@@ -403,13 +435,11 @@ class ConstitutiveRBS(UTR5):
         # Create the protein
         assy.protname = assy.cds.name
         if (assy.ctag != None): assy.protname += "--" + assy.ctag.name
-        assy.protein = add_species(mixture, "Protein", assy.protname, 0)
+        assy.protein = _add_species_index(
+            mixture, "Protein", assy.protname, 0)
 
-        # Create Ribosome bound to RNA
-        assy.ribo_bound = add_species(mixture, "Complex",
-                                      self.riboname + ":" + assy.rnaname, 0)
-        
-        # Create any other species needed by the transcriptional machinery
+        # Create the species needed by the translational machinery
+        # (eg, Ribosome bound to RNA)
         mechanisms = get_mechanisms(mixture, assy, self.mechanisms)
         mechanisms['translation'].update_species(mixture, assy, conc)
 
@@ -428,6 +458,7 @@ class ConstitutiveRBS(UTR5):
 
 class CDS(DNA):
     "CDS class - define protein coding sequence"
+    __slots__ = ('dimerize', 'maturation_time', 'protein', 'dimer')
     
     # Default parameters used to describe a repressed promoter
     default_parameter_values = {
@@ -455,11 +486,11 @@ class CDS(DNA):
         assy = self.assy        # Get the DNA assembly we are part of
 
         # Create species for the protein
-        self.protein = add_species(mixture, "Protein", self.name, 0)
+        self.protein = _add_species_index(mixture, "Protein", self.name, 0)
         if self.dimerize:
             #! Move to mechanism function?
-            self.dimer = add_species(mixture, "Protein",
-                                     self.name + " dimer", 0)
+            self.dimer = _add_species_index(
+                mixture, "Protein", self.name + " dimer", 0)
 
         mechanisms = get_mechanisms(mixture, assy, self.mechanisms)
         mechanisms['maturation'].update_species(mixture, assy, conc)
@@ -471,7 +502,7 @@ class CDS(DNA):
 
         if self.dimerize:
             #! Move to mechanism function?
-            add_reaction(mixture, [self.protein, self.protein], [self.dimer],
+            add_reaction(mixture, [(self.protein, 2)], [self.dimer],
                          kf = parameters['Dimerization_F'],
                          kr = parameters['Dimerization_R'],
                          prefix="cds_")
@@ -487,6 +518,7 @@ class CDS(DNA):
 # Protein coding sequence (same as a CDS)
 class ProteinCDS(CDS):
     "Protein coding sequence"
+    __slots__ = ()
 
 #
 # Ctag subclasses
@@ -496,6 +528,8 @@ class ProteinCDS(CDS):
 class Ctag(DNA):
     #! TODO: add docstring
     "Ctag class - define C-terminus protein tag"
+    __slots__ = ()
+
     def __init__(self, name, length=0, mechanisms={}, config_file=None,
                  parameters={}, **keywords):
         # DNA initialization
@@ -506,6 +540,8 @@ class Ctag(DNA):
 # Degradation tag
 class DegradationTag(Ctag):
     #! TODO: add docstring
+    __slots__ = ('protease',)
+
     def __init__(self, name, protease="ClpXP", length=9, mechanisms={},
                  config_file=None, parameters={}, **keywords):
         Ctag.__init__(self, name, length=length, mechanisms=mechanisms,
@@ -520,6 +556,8 @@ class DegradationTag(Ctag):
 
 class UTR3(DNA):
     "UTR3 class - define 3' untranslated region sequence"
+    __slots__ = ()
+
     def __init__(self, name, length=0, mechanisms={}, config_file=None,
                  parameters={}, **keywords):
         # DNA initialization
@@ -530,6 +568,8 @@ class UTR3(DNA):
 # Terminator
 class Terminator(UTR3):
     #! TODO: add docstring
+    __slots__ = ()
+
     def __init__(self, name, length=50, mechanisms={}, config_file=None):
         UTR3.__init__(self, name, length, mechanisms, config_file,
                       prefix="term_")
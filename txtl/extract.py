@@ -8,10 +8,13 @@ from warnings import warn
 
 from .mixture import Mixture
 from .component import Component
-from .sbmlutil import add_species, add_reaction, add_parameter
+from .mechanism import MechanismDict
+from .sbmlutil import add_reaction, add_parameter, add_global_parameter, \
+    _add_species_index
 from .parameter import get_parameters, eval_parameter
 
 from .mechanisms import transcription, translation, maturation, degradation
+from .mechanisms import repression
 
 class Extract(Component):
     """TX-TL extract component
@@ -38,6 +41,7 @@ class StandardExtract(Extract):
     default_mechanisms = {
         'transcription'         : transcription.basic(),
         'translation'           : translation.basic(),
+        'repression'            : repression.sequestration(),
         'DNA_degradation'       : degradation.dna_basic(),
         'RNA_degradation'       : degradation.rna_basic(),
         'protein_degradation'   : degradation.protein_basic()
@@ -88,6 +92,11 @@ class StandardExtract(Extract):
             if value != None:
                 add_parameter(mixture, name, value)
 
+        # Create the global parameters referenced by extract parameters
+        for param in self.parameters.values():
+            if param.type == 'Global':
+                add_global_parameter(mixture, param.value)
+
     def update_species(self, mixture, conc, mechanisms={}):
         #
         # Add in the species that are present in the extract
@@ -100,26 +109,29 @@ class StandardExtract(Extract):
         #
         RNAP_IC = self.eval_parameter('RNAP_IC')
         if RNAP_IC != None:
-            mixture.rnap = add_species(mixture, None, 'RNAP', RNAP_IC * conc)
+            mixture.rnap = _add_species_index(
+                mixture, None, 'RNAP', RNAP_IC * conc)
         else:
             warn("Extract missing initial condition for species RNAP")
-            mixture.rnap = add_species(mixture, None, 'RNAP', 0)
+            mixture.rnap = _add_species_index(mixture, None, 'RNAP', 0)
         
         Ribo_IC = self.eval_parameter('Ribo_IC')
         if Ribo_IC != None:
-            mixture.ribo = add_species(mixture, None, 'Ribo', Ribo_IC * conc)
+            mixture.ribo = _add_species_index(
+                mixture, None, 'Ribo', Ribo_IC * conc)
         else:
             warn("Extract missing initial condition for species Ribo")
-            mixture.ribo = add_species(mixture, None, 'Ribo', 0)
+            mixture.ribo = _add_species_index(mixture, None, 'Ribo', 0)
 
         RecBCD_IC = self.eval_parameter('RecBCD_IC')
         if RecBCD_IC != None:
-                 mixture.recbcd = add_species(mixture, None, 'RecBCD',
-                                              RecBCD_IC * conc)
+            mixture.recbcd = _add_species_index(
+                mixture, None, 'RecBCD', RecBCD_IC * conc)
 
         RNase_IC = self.eval_parameter('RNase_IC')
         if RNase_IC != None:
-            mixture.rnase = add_species(mixture, None, 'RNase', RNase_IC * conc)
+            mixture.rnase = _add_species_index(
+                mixture, None, 'RNase', RNase_IC * conc)
 
     def update_reactions(self, mixture):
         #! TODO: add reactions that are instantiated by extract
@@ -128,8 +140,34 @@ class StandardExtract(Extract):
     def __str__(self):
         return "StandardExtract with %d mechanisms" % len(self.default_mechanisms)
 
+# Mechanisms used for each model fidelity (see create_extract())
+fidelity_mechanisms = {
+    'detailed': {},
+    'fast': {
+        'transcription'         : transcription.lumped(),
+        'translation'           : translation.lumped(),
+        'repression'            : repression.hill(),
+    },
+}
+
 # Create a mixture containing extract
-def create_extract(name, type=StandardExtract, mechanisms={}):
+def create_extract(name, type=StandardExtract, mechanisms={},
+                   fidelity='detailed'):
+    """Create a mixture containing an extract
+
+    The `fidelity` argument selects the level of detail of the model:
+    'detailed' uses the default mechanisms of the extract, with
+    explicit binding of RNA polymerase, ribosomes and repressors, while
+    'fast' uses lumped transcription and translation reactions and Hill
+    function repression (see txtl.mechanisms), which gives smaller
+    models that are faster to simulate, for use in sweeps and fits.
+    Mechanisms given in `mechanisms` take precedence over the preset.
+
+    """
+    if fidelity not in fidelity_mechanisms:
+        raise ValueError("create_extract: unknown fidelity '%s' (use %s)" % (
+            fidelity, ", ".join(sorted(fidelity_mechanisms))))
+
     # Create a mixture to hold the extract
     mixture = Mixture(name)
 
@@ -152,8 +190,9 @@ def create_extract(name, type=StandardExtract, mechanisms={}):
     mixture.concentrations = [10.0/(10.0/3.0)]
 
     # Store default mechanisms and custom mechanisms
-    mixture.default_mechanisms = extract.default_mechanisms
-    mixture.custom_mechanisms = mechanisms
+    mixture.default_mechanisms = MechanismDict(extract.default_mechanisms)
+    mixture.default_mechanisms.update(fidelity_mechanisms[fidelity])
+    mixture.custom_mechanisms = MechanismDict(mechanisms)
 
     # Store the parameters in the mixture so that components can access them
     mixture.parameters = extract.parameters
@@ -0,0 +1,166 @@
+# fit.py - parameter estimation against time course data
+# AP, 19 Oct 2026
+#
+# This file contains functions for estimating parameter values (rate
+# constants) of a mixture from measured time courses, such as plate
+# reader measurements of a fluorescent protein.  The mixture is
+# compiled once into a ReactionNetwork and each evaluation of the
+# objective function only updates the rate constants of the network
+# before integrating it.  Multi-start optimization is supported, with
+# the starts distributed over a pool of worker processes.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from .simulate import get_network, integrate
+from .parallel import parallel_map
+
+class FitResult:
+    """Result of a parameter fit
+
+    Data attributes
+    ---------------
+    names       Names of the parameters that were fit (list of str)
+    values      Best fit parameter values (ndarray)
+    cost        Value of the cost function (half the sum of squared residuals)
+    success     True if the optimizer for the best start converged
+    message     Message from the optimizer for the best start
+    starts      Results for all starts, ordered by cost (list of dict)
+
+    """
+    def __init__(self, names, starts):
+        self.names = list(names)
+        self.starts = sorted(starts, key=lambda s: s['cost'])
+        best = self.starts[0]
+        self.values = best['values']
+        self.cost = best['cost']
+        self.success = best['success']
+        self.message = best['message']
+
+    def as_dict(self):
+        "Return the best fit parameter values as a dictionary"
+        return dict(zip(self.names, self.values))
+
+    def __str__(self):
+        return "\n".join(["FitResult (cost = %g)" % self.cost] + [
+            "  %s = %g" % (name, value)
+            for name, value in zip(self.names, self.values)])
+
+# Objective function for a fit (needs to be picklable for parallel fits)
+class _Objective:
+    def __init__(self, network, names, timepoints, data, species,
+                 weights, t0, log_scale, options):
+        self.network = network.copy()
+        self.names = list(names)
+        self.indices = [network.parameter_indices(name) for name in names]
+        self.timepoints = timepoints
+        self.columns = network.get_species_index(species)
+        self.data = data
+        self.weights = weights
+        self.mask = np.isfinite(data)
+        self.t0 = t0
+        self.log_scale = log_scale
+        self.options = options
+
+        # Penalty value to use if the integration fails
+        self.penalty = 1e3 * (np.nanmax(np.abs(data)) + 1)
+
+    def values(self, theta):
+        return 10 ** np.asarray(theta) if self.log_scale else np.asarray(theta)
+
+    def residuals(self, theta):
+        k = self.network.k
+        for indices, value in zip(self.indices, self.values(theta)):
+            k[indices] = value
+        try:
+            sim = integrate(self.network, self.timepoints, k=k, t0=self.t0,
+                            **self.options)
+        except RuntimeError:
+            return np.full(np.count_nonzero(self.mask), self.penalty)
+        residuals = (sim[:, self.columns] - self.data) * self.weights
+        return residuals[self.mask]
+
+# Run the optimizer from a single starting point (called by parallel_map)
+def _fit_start(context, theta0):
+    objective, bounds, options = context
+    result = least_squares(objective.residuals, theta0, bounds=bounds,
+                           **options)
+    return {'values': objective.values(result.x), 'cost': result.cost,
+            'success': result.success, 'message': result.message,
+            'nfev': result.nfev}
+
+# Estimate parameters from time course data
+def fit_parameters(
+    mixture, names, bounds, timepoints, data, species,
+    weights=1, t0=0, nstarts=1, processes=None, seed=None,
+    log_scale=True, initial_values=None, sim_options={}, **options
+):
+    """Estimate parameter values from time course data
+
+    The parameters listed in `names` are adjusted to minimize the
+    squared difference between the simulated concentrations of
+    `species` and the measured `data` at the given `timepoints`.
+
+    Parameters
+    ----------
+    mixture         Mixture (or compiled ReactionNetwork) to fit
+    names           Names of the parameters to fit (list of str)
+    bounds          Lower and upper bound for each parameter (list of pairs)
+    timepoints      Measurement times, in seconds (array)
+    data            Measured values (array, len(timepoints) x len(species)),
+                    with NaN marking missing measurements
+    species         Species ids corresponding to the columns of data
+    weights         Weights for the residuals (scalar or array like data)
+    t0              Initial time of the simulation
+    nstarts         Number of starting points for the optimization
+    processes       Number of worker processes (None = number of CPUs)
+    seed            Seed for generating random starting points
+    log_scale       Optimize over the logarithm of the parameter values
+    initial_values  Starting values (default: current values in mixture)
+    sim_options     Keyword arguments passed to integrate()
+
+    Additional keywords are passed to `scipy.optimize.least_squares`.
+
+    The first start uses the initial values; the remaining starts are
+    drawn uniformly at random (in log space if `log_scale` is True)
+    within the bounds.  Returns a FitResult object.  The network
+    itself is not modified.
+
+    """
+    network = get_network(mixture)
+    if isinstance(species, str):
+        species = [species]
+    timepoints = np.asarray(timepoints, dtype=float)
+    data = np.asarray(data, dtype=float).reshape(len(timepoints), len(species))
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), data.shape)
+
+    # Set up the bounds and starting points for the optimization
+    lower, upper = np.array(bounds, dtype=float).T
+    if initial_values is None:
+        initial_values = network.get_parameters(names)
+    initial_values = np.clip(np.asarray(initial_values, dtype=float),
+                             lower, upper)
+    if log_scale:
+        if np.any(lower <= 0):
+            raise ValueError("fit_parameters: log_scale requires positive "
+                             "lower bounds")
+        lower, upper = np.log10(lower), np.log10(upper)
+        initial_values = np.log10(initial_values)
+
+    # Use a finite difference step that is large compared with the
+    # integration tolerances (the default step only sees solver noise)
+    options.setdefault('diff_step', 1e-3)
+
+    rng = np.random.default_rng(seed)
+    starts = [initial_values] + [
+        rng.uniform(lower, upper) for i in range(nstarts - 1)]
+
+    # Run the optimizations
+    objective = _Objective(network, names, timepoints, data, species,
+                           weights, t0, log_scale, sim_options)
+    results = parallel_map(_fit_start, starts, processes=processes,
+                           context=(objective, (lower, upper), options))
+    return FitResult(names, results)
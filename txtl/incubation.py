@@ -0,0 +1,164 @@
+# incubation.py - cached pre-incubation of extract mixtures
+# AP, 19 Oct 2026
+#
+# This file contains functions for simulating the pre-incubation of an
+# extract (and buffer) mixture, before DNA is added.  The extract part
+# of an experiment is the same for every DNA variant, so its state
+# after pre-incubation is computed once and cached (in memory and on
+# disk, in the txtl cache directory), keyed by the compiled extract
+# network (species, reactions, rate constants and initial
+# concentrations, which reflect the extract parameters) and the
+# incubation settings.  Simulations of mixtures that contain the
+# extract are then started from the cached state (see the
+# `preincubation` argument of runsim() and runsim_batch()).
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import os
+import hashlib
+import collections
+import numpy as np
+
+from .simulate import get_network, runsim
+from .pathutil import get_cache_dir
+
+class Preincubation:
+    """State of an extract mixture after pre-incubation
+
+    Data attributes
+    ---------------
+    name        Name of the extract mixture (str)
+    duration    Incubation time (seconds)
+    species     Species ids of the extract mixture (list of str)
+    x0          Concentrations at the start of the incubation (ndarray)
+    state       Concentrations at the end of the incubation (ndarray)
+    key         Cache key for the extract network and incubation settings
+
+    """
+    def __init__(self, name, duration, species, x0, state, key):
+        self.name = name
+        self.duration = float(duration)
+        self.species = list(species)
+        self.x0 = np.array(x0, dtype=float)
+        self.state = np.array(state, dtype=float)
+        self.key = key
+
+    def initial(self, mixture):
+        """Initial concentrations for a mixture containing the extract
+
+        When the extract is combined with other mixtures (eg, DNA), its
+        species are diluted.  The dilution is determined from the
+        initial concentrations of the extract species in `mixture` (a
+        mixture or ReactionNetwork) and applied to the pre-incubated
+        state.  Returns a dict mapping species ids to concentrations
+        (see the `initial` argument of runsim()).  A ValueError is
+        raised if the mixture does not contain the extract (with the
+        same initial concentrations, up to a common dilution).
+
+        """
+        network = get_network(mixture)
+        present = [i for i, s in enumerate(self.species)
+                   if s in network.species_index]
+        missing = [self.species[i] for i in range(len(self.species))
+                   if i not in present and self.state[i] != 0]
+        if missing:
+            raise ValueError("%s: species %s not found in %s" % (
+                self.name, ", ".join(missing), network.name))
+
+        # Dilution of the extract species in the mixture
+        indices = [network.species_index[self.species[i]] for i in present]
+        reference = self.x0[present] > 0
+        if not np.any(reference):
+            raise ValueError("%s: no extract species with nonzero initial "
+                             "concentration" % self.name)
+        ratios = network.x0[indices][reference] / self.x0[present][reference]
+        dilution = np.median(ratios)
+        if not np.allclose(ratios, dilution, rtol=1e-6):
+            raise ValueError("%s: initial concentrations in %s do not match "
+                             "the extract" % (self.name, network.name))
+        return {self.species[i]: float(dilution * self.state[i])
+                for i in present}
+
+    def save(self, filename):
+        "Save the pre-incubated state to a file (numpy .npz format)"
+        with open(filename, 'wb') as file:
+            np.savez(file, name=np.array(self.name), duration=self.duration,
+                     species=np.array(self.species), x0=self.x0,
+                     state=self.state, key=np.array(self.key))
+
+# Load a pre-incubated state from a file
+def load_preincubation(filename):
+    "Load a pre-incubated state that was saved with Preincubation.save()"
+    with np.load(filename) as data:
+        return Preincubation(str(data['name']), data['duration'],
+                             list(data['species']), data['x0'],
+                             data['state'], str(data['key']))
+
+# Pre-incubated states computed in this process, by key
+_cache = collections.OrderedDict()
+_cache_size = 32
+
+# Simulate (or look up) the pre-incubation of an extract
+def preincubate(mixture, duration, cache=True, cache_dir=None, **options):
+    """Simulate the pre-incubation of an extract mixture
+
+    The `mixture` (eg, the combination of an extract and a buffer, or
+    its compiled ReactionNetwork) is simulated for `duration` seconds,
+    and the final state is returned as a Preincubation, which can be
+    used to start simulations of mixtures that contain the extract (see
+    the `preincubation` argument of runsim()).  Additional keywords are
+    passed to runsim().
+
+    If `cache` is True, the result is looked up in (and stored to) an
+    in-memory cache and a cache directory (`cache_dir`, default: the
+    txtl cache directory, see txtl.pathutil.get_cache_dir()), so that
+    the extract is only simulated once for a given set of extract
+    parameters and incubation settings.
+
+    """
+    network = get_network(mixture)
+    key = preincubation_key(network, duration, options)
+    if cache and key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    result = None
+    if cache:
+        filename = os.path.join(get_cache_dir(cache_dir), 'preincubation',
+                                key + '.npz')
+        try:
+            result = load_preincubation(filename)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if result is None:
+        state = runsim(network, duration, npts=2, **options).checkpoint.state
+        result = Preincubation(network.name, duration, network.species,
+                               network.x0, state, key)
+        if cache:
+            tmpname = "%s.%d.tmp" % (filename, os.getpid())
+            try:
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                result.save(tmpname)
+                os.replace(tmpname, filename)
+            except OSError:
+                pass            # cache not writable; keep in memory
+
+    if cache:
+        _cache[key] = result
+        while len(_cache) > _cache_size:
+            _cache.popitem(last=False)
+    return result
+
+# Key identifying a pre-incubation
+def preincubation_key(network, duration, options={}):
+    "Return the cache key for the pre-incubation of a network"
+    digest = hashlib.sha1()
+    digest.update(network.structure_hash().encode())
+    for array in (network.x0, network.k):
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    digest.update(repr(sorted(network.parameters.items())).encode())
+    digest.update(repr((float(duration), sorted(
+        (name, repr(value)) for name, value in options.items()))).encode())
+    return digest.hexdigest()
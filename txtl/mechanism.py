@@ -23,6 +23,14 @@
 # a given component (by passing an alternative mechanism just to that
 # component).
 #
+# Resolving the mechanisms for a component requires merging the five
+# mechanism dictionaries, which is done several times per DNA element
+# when a mixture is compiled.  The resolved mechanisms are therefore
+# cached in the mixture, keyed by the dictionaries that were merged.
+# Mechanism dictionaries are stored as MechanismDict objects, which
+# keep a version number that is incremented when they are modified, so
+# that the cache can be invalidated without comparing the contents.
+#
 # Copyright (c) 2018, Build-A-Cell. All rights reserved.
 # See LICENSE file in the project root directory for details.
 
@@ -44,12 +52,105 @@ class Mechanism:
     def __str__(self):
         return self.name
 
+# Dictionary of mechanisms that keeps track of changes
+class MechanismDict(dict):
+    """Dictionary of mechanisms with a version number
+
+    A MechanismDict behaves like a regular dictionary, but increments
+    its `version` attribute whenever its contents are changed.  This is
+    used to invalidate cached mechanism resolutions (see
+    `get_mechanisms()`).
+
+    """
+    def __init__(self, *args, **keywords):
+        dict.__init__(self, *args, **keywords)
+        self.version = 0
+
+    def _modified(method):
+        def wrapper(self, *args, **keywords):
+            self.version += 1
+            return method(self, *args, **keywords)
+        wrapper.__name__ = method.__name__
+        wrapper.__doc__ = method.__doc__
+        return wrapper
+
+    __setitem__ = _modified(dict.__setitem__)
+    __delitem__ = _modified(dict.__delitem__)
+    __ior__ = _modified(dict.__ior__)
+    clear = _modified(dict.clear)
+    pop = _modified(dict.pop)
+    popitem = _modified(dict.popitem)
+    setdefault = _modified(dict.setdefault)
+    update = _modified(dict.update)
+    del _modified
+
+# Mechanisms resolved for a component
+class ResolvedMechanisms(dict):
+    """Mechanisms used by a component, after resolving overrides
+
+    A dictionary mapping mechanism names (eg 'transcription') to the
+    mechanism used for a component.  The `sources` attribute records
+    which level of the mechanism hierarchy supplied each mechanism:
+
+      'mixture_default'     default mechanisms of the extract
+      'component_default'   default mechanisms of the component
+      'mixture_custom'      mechanisms passed to create_extract()
+      'component_custom'    mechanisms passed to the component
+      'custom'              mechanisms passed to a subcomponent
+
+    The same object is returned for repeated calls to get_mechanisms()
+    and should not be modified.
+
+    """
+    levels = ('mixture_default', 'component_default', 'mixture_custom',
+              'component_custom', 'custom')
+
+    def __init__(self, sources):
+        dict.__init__(self)
+        self.sources = {}
+        for level, mechanisms in zip(self.levels, sources):
+            for name, mechanism in mechanisms.items():
+                self[name] = mechanism
+                self.sources[name] = level
+
+    def describe(self):
+        "Return a string listing each mechanism and where it came from"
+        return "\n".join("%s: %s [%s]" % (name, self[name], self.sources[name])
+                         for name in self)
+
+# Version of a mechanism dictionary (used to check for changes)
+def _version(mechanisms):
+    if isinstance(mechanisms, MechanismDict):
+        return mechanisms.version
+    # Regular dictionaries are compared by their contents
+    return tuple(mechanisms.items())
+
 # Utility function to retrieve mechanism list
 def get_mechanisms(mixture, component, custom={}):
-    mechanisms = {}                                 # initalize mechanism
-    mechanisms.update(mixture.default_mechanisms)   # extract defaults
-    mechanisms.update(component.default_mechanisms) # component defaults
-    mechanisms.update(mixture.custom_mechanisms)    # customized extract
-    mechanisms.update(component.custom_mechanisms)  # customized component 
-    mechanisms.update(custom)                       # additional customization
-    return mechanisms
+    """Return the mechanisms to use for a component in a mixture
+
+    The mechanisms are obtained by merging (in order of increasing
+    precedence) the default mechanisms of the mixture (extract) and
+    of the component, the custom mechanisms for the mixture and for
+    the component, and any additional mechanisms in `custom` (eg,
+    mechanisms passed to a DNA element).  The result is cached in the
+    mixture and is recomputed only if one of the dictionaries changes.
+
+    Returns a ResolvedMechanisms object.
+
+    """
+    sources = (mixture.default_mechanisms, component.default_mechanisms,
+               mixture.custom_mechanisms, component.custom_mechanisms,
+               custom)
+    key = tuple(map(id, sources))
+    versions = tuple(map(_version, sources))
+
+    cache = mixture.__dict__.setdefault('_mechanism_cache', {})
+    entry = cache.get(key)
+    if entry is not None and entry[1] == versions:
+        return entry[2]
+
+    # Keep a reference to the sources, so that their ids are not reused
+    resolved = ResolvedMechanisms(sources)
+    cache[key] = (sources, versions, resolved)
+    return resolved
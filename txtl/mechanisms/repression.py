@@ -0,0 +1,99 @@
+# repression.py - TX-TL transcriptional repression mechanisms
+# AP, 19 Oct 2026
+#
+# This file contains the mechanisms used by repressed promoters.  The
+# default (sequestration) mechanism represents repressor binding to
+# the DNA explicitly, while the Hill mechanism represents repression
+# by a Hill function in the transcription rate, which removes the
+# repressor:DNA complex and the (fast) binding reactions from the
+# model.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+from ..mechanism import Mechanism, get_mechanisms
+from ..sbmlutil import add_reaction, find_species, _add_species_index
+from ..parameter import Parameter, eval_parameter
+
+# Find the repressor species of a promoter
+def _repressor(mixture, assy):
+    tf_species = find_species(mixture, assy.promoter.tfname)
+    if tf_species == None:
+        raise NameError("RepressedPromoter: %s not found (needed by %s)"
+                        % (assy.promoter.tfname, assy.name))
+    return tf_species
+
+# Repressor binds to the DNA and blocks transcription
+class sequestration(Mechanism):
+    "Repression by sequestration of the DNA in a repressor:DNA complex"
+
+    def __init__(self):
+        self.name = 'Repression by Sequestration'
+
+    def update_species(self, mixture, assy, conc):
+        promoter = assy.promoter
+
+        # Create the species for the unrepressed promoter
+        mechanisms = get_mechanisms(mixture, assy, promoter.mechanisms)
+        mechanisms['transcription'].update_species(mixture, assy, conc)
+
+        # Create repressor bound to DNA
+        promoter.tf_bound = _add_species_index(
+            mixture, "Complex", promoter.tfname + ":" + assy.name, 0)
+
+    def update_reactions(self, mixture, assy, debug=False):
+        params = assy.promoter.parameters
+
+        # Create the reactions for the unbound promoter
+        mechanisms = get_mechanisms(mixture, assy, assy.promoter.mechanisms)
+        mechanisms['transcription'].update_reactions(mixture, assy)
+
+        # Create the reaction for the transcription factor binding to DNA
+        add_reaction(mixture, [_repressor(mixture, assy), assy.dna],
+                     [assy.promoter.tf_bound],
+                     kf = params['DNA_Sequestration_F'],
+                     kr = params['DNA_Sequestration_R'],
+                     prefix = "repr_")
+
+# Repressor reduces the rate of transcription (Hill function)
+class hill(Mechanism):
+    """Repression by a Hill function in the transcription rate
+
+    The transcription reaction that involves the free DNA (RNAP binding
+    for the basic transcription mechanism) is multiplied by
+
+      1 / (1 + (R/Repression_K)^Repression_n)
+
+    where R is the repressor concentration.  The dissociation constant
+    defaults to DNA_Sequestration_R / DNA_Sequestration_F, which gives
+    the same fraction of free DNA as the sequestration mechanism at
+    equilibrium (when the repressor is in excess of the DNA), and the
+    Hill coefficient defaults to 1.  Both can be set as promoter
+    parameters.
+
+    """
+    def __init__(self):
+        self.name = 'Hill Repression'
+
+    def update_species(self, mixture, assy, conc):
+        mechanisms = get_mechanisms(mixture, assy, assy.promoter.mechanisms)
+        mechanisms['transcription'].update_species(mixture, assy, conc)
+
+    def update_reactions(self, mixture, assy, debug=False):
+        promoter = assy.promoter
+
+        # Figure out the Hill constants
+        values = [eval_parameter(promoter, name, mixture=mixture) for name in
+                  ('Repression_K', 'Repression_n', 'DNA_Sequestration_R',
+                   'DNA_Sequestration_F')]
+        K, n = values[:2]
+        if K is None: K = values[2] / values[3]
+        if n is None: n = 1
+        repressor = (_repressor(mixture, assy),
+                     Parameter('Repression_K', 'Numeric', K),
+                     Parameter('Repression_n', 'Numeric', n))
+
+        # Create the (repressed) transcription reactions
+        mechanisms = get_mechanisms(mixture, assy, promoter.mechanisms)
+        mechanisms['transcription'].update_reactions(
+            mixture, assy, repressor=repressor)
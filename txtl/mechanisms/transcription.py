@@ -8,8 +8,8 @@
 # See LICENSE file in the project root directory for details.
 
 from ..mechanism import Mechanism
-from ..sbmlutil import add_species, add_reaction
-from ..parameter import Parameter, eval_parameter
+from ..sbmlutil import add_species, add_reaction, _add_species_index
+from ..parameter import Parameter, eval_parameter, rate_parameter
 
 # Convert DNA to RNA
 class basic(Mechanism):
@@ -18,27 +18,82 @@ class basic(Mechanism):
     def __init__(self):
         self.name = 'Basic Transcription'
 
-    def update_reactions(self, mixture, assy, debug=False):
+    def update_species(self, mixture, assy, conc):
+        # Create RNA polymerase bound to DNA
+        assy.rnap_bound = _add_species_index(
+            mixture, "Complex", assy.promoter.rnapname + ":" + assy.name, 0)
+
+    def update_reactions(self, mixture, assy, repressor=None, debug=False):
         parameters = assy.promoter.parameters   # get parameter values
         
         # Figure out the reaction rates
         kf = parameters['RNAPbound_F']
         kr = parameters['RNAPbound_R']
         
-        # Create reaction that binds RNAP to DNA
+        # Create reaction that binds RNAP to DNA (blocked by a repressor)
         add_reaction(mixture, [mixture.rnap, assy.dna], [assy.rnap_bound],
-                     kf, kr, prefix="txb_")
+                     kf, kr, prefix="txb_", repressor=repressor)
 
         # Figure out the transcription rate based on length of the protein
-        txrate = eval_parameter(
-            mixture, 'Transcription_Rate', {'RNA_Length' : assy.rnalength})
-        txparam = Parameter('TX_Rate', 'Numeric', txrate)
+        # (or use the global parameter that the extract refers to)
+        txparam = rate_parameter(
+            mixture, mixture, 'Transcription_Rate', 'TX_Rate',
+            {'RNA_Length' : assy.rnalength})
 
         if debug:
             print("Transcription rate for RNA %s of length %d = " %
-                  (assy.utr5.name, assy.rnalength), transcription_rate)
+                  (assy.utr5.name, assy.rnalength), txparam.value)
 
         # Create reaction that produces mRNA
         add_reaction(mixture, [assy.rnap_bound],
                      [mixture.rnap, assy.rna, assy.dna],
                      kf=txparam, prefix="txb_")
+
+# Convert DNA to RNA in a single step
+class lumped(Mechanism):
+    """Lumped transcription mechanism
+
+    RNA polymerase binding and transcription are combined into a single
+    reaction, DNA + RNAP --> DNA + RNAP + RNA, without an RNAP:DNA
+    complex.  The rate constant gives the quasi-steady state production
+    rate of the basic mechanism at the initial RNAP concentration,
+
+      TX_Lumped = TX_Rate * RNAPbound_F / (RNAPbound_R + TX_Rate) / (1 + a)
+
+    where a = RNAPbound_F * RNAP / (RNAPbound_R + TX_Rate) is the ratio
+    of bound to free DNA.  If the reaction is repressed, the Hill
+    constant is scaled by (1 + a)^(1/n), since only the free DNA can
+    be bound by the repressor.  This mechanism is used by fast extract
+    models (see create_extract()).
+
+    """
+    def __init__(self):
+        self.name = 'Lumped Transcription'
+
+    def update_reactions(self, mixture, assy, repressor=None, debug=False):
+        # Figure out the binding and transcription rates
+        kf = eval_parameter(assy.promoter, 'RNAPbound_F',
+                            mixture=mixture)
+        kr = eval_parameter(assy.promoter, 'RNAPbound_R',
+                            mixture=mixture)
+        txrate = eval_parameter(
+            mixture, 'Transcription_Rate', {'RNA_Length' : assy.rnalength})
+        bound = kf * _concentration(mixture, mixture.rnap) / (kr + txrate)
+        txparam = Parameter('TX_Lumped', 'Numeric',
+                            txrate * kf / (kr + txrate) / (1 + bound))
+
+        # Repression only applies to the free DNA
+        if repressor is not None:
+            species, K, n = repressor
+            K = Parameter('Repression_K', 'Numeric',
+                          K.value * (1 + bound) ** (1 / n.value))
+            repressor = (species, K, n)
+
+        # Create reaction that produces mRNA
+        add_reaction(mixture, [mixture.rnap, assy.dna],
+                     [mixture.rnap, assy.rna, assy.dna],
+                     kf=txparam, prefix="txb_", repressor=repressor)
+
+# Get the initial concentration of a species in a mixture
+def _concentration(mixture, species):
+    return mixture.model.getSpecies(species).getInitialConcentration()
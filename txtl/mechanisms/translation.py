@@ -8,14 +8,19 @@
 # See LICENSE file in the project root directory for details.
 
 from ..mechanism import Mechanism
-from ..sbmlutil import add_species, add_reaction
-from ..parameter import Parameter, eval_parameter
+from ..sbmlutil import add_species, add_reaction, _add_species_index
+from ..parameter import Parameter, eval_parameter, rate_parameter
 
 class basic(Mechanism):
     "Basic translation mechanism"
     def __init__(self):
         self.name = 'Basic Translation'
 
+    def update_species(self, mixture, assy, conc):
+        # Create Ribosome bound to RNA
+        assy.ribo_bound = _add_species_index(
+            mixture, "Complex", assy.utr5.riboname + ":" + assy.rnaname, 0)
+
     def update_reactions(self, mixture, assy, debug=False):
         parameters = assy.utr5.parameters       # get parameter values
 
@@ -27,15 +32,53 @@ class basic(Mechanism):
                      prefix="tlb_")
 
         # Figure out the translation rate based on length of the protein
-        tlrate = eval_parameter(
-            mixture, 'Translation_Rate', {'Protein_Length' : assy.cds.length})
-        tlparam = Parameter('TL_Rate', 'Numeric', tlrate)
+        # (or use the global parameter that the extract refers to)
+        tlparam = rate_parameter(
+            mixture, mixture, 'Translation_Rate', 'TL_Rate',
+            {'Protein_Length' : assy.cds.length})
                                           
         if debug:
             print("Translation rate for RBS %s of length %d = " %
-                  (assy.utr5.name, assy.peplength), tlrate)
+                  (assy.utr5.name, assy.cds.length), tlparam.value)
 
         # Create reaction that produces protein
         add_reaction(mixture, [assy.ribo_bound],
                      [mixture.ribo, assy.rna, assy.protein],
                      kf = tlparam, prefix="tlb_")
+
+class lumped(Mechanism):
+    """Lumped translation mechanism
+
+    Ribosome binding and translation are combined into a single
+    reaction, RNA + Ribo --> RNA + Ribo + Protein, without a Ribo:RNA
+    complex.  The rate constant gives the quasi-steady state production
+    rate of the basic mechanism at the initial ribosome concentration,
+
+      TL_Lumped = TL_Rate * Ribosome_Binding_F /
+                  (Ribosome_Binding_R + TL_Rate) / (1 + b)
+
+    where b = Ribosome_Binding_F * Ribo / (Ribosome_Binding_R + TL_Rate)
+    is the ratio of bound to free RNA.  This mechanism is used by fast
+    extract models (see create_extract()).
+
+    """
+    def __init__(self):
+        self.name = 'Lumped Translation'
+
+    def update_reactions(self, mixture, assy, debug=False):
+        # Figure out the binding and translation rates
+        kf = eval_parameter(assy.utr5, 'Ribosome_Binding_F',
+                            mixture=mixture)
+        kr = eval_parameter(assy.utr5, 'Ribosome_Binding_R',
+                            mixture=mixture)
+        tlrate = eval_parameter(
+            mixture, 'Translation_Rate', {'Protein_Length' : assy.cds.length})
+        ribo = mixture.model.getSpecies(mixture.ribo).getInitialConcentration()
+        bound = kf * ribo / (kr + tlrate)
+        tlparam = Parameter('TL_Lumped', 'Numeric',
+                            tlrate * kf / (kr + tlrate) / (1 + bound))
+
+        # Create reaction that produces protein
+        add_reaction(mixture, [mixture.ribo, assy.rna],
+                     [mixture.ribo, assy.rna, assy.protein],
+                     kf = tlparam, prefix="tlb_")
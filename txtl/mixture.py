@@ -8,16 +8,25 @@
 # Copyright (c) 2018, Build-A-Cell. All rights reserved.
 # See LICENSE file in the project root directory for details.
 
+import numbers
 import libsbml
 from .sbmlutil import create_sbml_model
+from .parameter import ParameterTable, load_config
+from .mechanism import MechanismDict
+from .template import TemplateCache
 
 class Mixture():
     """Container for components (extract, genes, etc)
 
     The Mixture class is used as a container for a set of components
     that define the species and reactions to implement a TX-TL system.
-    Mixtures can be added and scaled to create new mixtures (not yet
-    implemented).
+    Mixtures can be added and scaled to create new mixtures.
+
+    Mixtures are evaluated lazily.  Combining or scaling mixtures
+    creates a new mixture that refers to its inputs, and the list of
+    components (with their scaled concentrations) is only computed when
+    it is first accessed.  Similarly, the SBML document for a mixture is
+    only created when the model is exported, compiled or accessed.
 
     Data attributes
     ---------------
@@ -29,6 +38,7 @@ class Mixture():
     default_mechanisms  Default mechanisms for this mixture (dict)
     custom_mechanisms   User-specified mechanisms for this mixture (dict)
     parameters          Global parameters for the mixture (dict)
+    use_templates       Create DNA assemblies using templates (bool)
 
     The mechanisms and parameters dictionaries are established by the
     create_extract() and create_buffer() functions, using the
@@ -47,6 +57,10 @@ class Mixture():
     mix = combine_mixtures([mix1, mix2, ...], [conc1, conc2, ...]
     mix = conc1 * mix1 + conc2 * mix2 + conc3 * mix3
 
+    # Note: scaling multiplies all concentrations in a mixture, so the
+    # two forms above are the same if conc1 + conc2 + ... = 1 (the
+    # volumes in combine_mixtures() are normalized)
+
     # Add a component to a mixture
     mix = mix + conc * component
     mix += conc * component
@@ -56,48 +70,166 @@ class Mixture():
     mix.write_sbml(filename)
 
     """
+    # Create DNA assemblies with the same architecture from a template
+    use_templates = True
+
     def __init__(self, name=None, mechanisms={}, config_file=None):
         "Create a new mixture"
-        
-        # Create an SBML document container and model
-        document, model, compartment = create_sbml_model()
 
         # Initialize instance variables
         self.name = name                # Save the name of the mixture
-        self._SBMLdoc = document        # SBML document container
-        self.model = model              # SBML model object
-        self.compartment = compartment  # SBML compartment
-        self.components = []            # components contained in mixture
-        self.concentrations = []        # concentrations of each component
+        self._SBMLdoc = None            # SBML document (created when needed)
+        self._components = []           # components contained in mixture
+        self._concentrations = []       # concentrations of each component
+        self._terms = []                # mixtures/components not yet added
 
         # Override the default mechanisms with anything we were passed
         # Note: These are overrwriten by create_extract()
-        self.default_mechanisms = {
+        self.default_mechanisms = MechanismDict({
             # 'mechanism' : MechanismConstructor()
-        }
-        self.custom_mechanisms = mechanisms
+        })
+        self.custom_mechanisms = MechanismDict(mechanisms)
 
         # Read the configuration parameters
-        self.parameters = {}
+        self.parameters = ParameterTable()
         if (config_file != None):
             self.parameters.update(load_config(config_file))
 
-    def _update_sbml_model(self):
-        """Updating the internal SBML representation"""
+    #
+    # Lazy evaluation
+    #
+    # The components of a mixture that was created by combining other
+    # mixtures are stored as a list of (scale, snapshot of a mixture or
+    # component) terms, which is flattened when the components are
+    # first needed.  The snapshots record the components of the
+    # mixtures at the time they were combined.
+    # The SBML document is created the first time the model is used.
+    #
+    @property
+    def components(self):
+        "Components in the mixture (list of Components)"
+        self._flatten()
+        return self._components
+
+    @components.setter
+    def components(self, components):
+        self._flatten()
+        self._components = components
+
+    @property
+    def concentrations(self):
+        "Concentration of each component (list of floats)"
+        self._flatten()
+        return self._concentrations
+
+    @concentrations.setter
+    def concentrations(self, concentrations):
+        self._flatten()
+        self._concentrations = concentrations
+
+    @property
+    def document(self):
+        "SBMLDocument containing the model"
+        if self._SBMLdoc is None:
+            self._update_sbml_model()
+        return self._SBMLdoc
+
+    @property
+    def model(self):
+        "SBML Model containing species, reactions"
+        if self._SBMLdoc is None:
+            self._update_sbml_model()
+        return self._model
+
+    @property
+    def compartment(self):
+        "SBML Compartment for the species in the model"
+        if self._SBMLdoc is None:
+            self._update_sbml_model()
+        return self._compartment
+
+    def _flatten(self):
+        # Add the components of any pending terms to the mixture.  The
+        # graph is traversed iteratively since mixtures built up in a
+        # loop (mix = mix + conc * component) can be deeply nested.
+        stack = list(reversed(self._terms))
+        self._terms = []
+        while stack:
+            scale, item = stack.pop()
+            if isinstance(item, _Snapshot):
+                self._components += item.components
+                self._concentrations += \
+                    [scale * conc for conc in item.concentrations]
+                stack += [(scale * subscale, subitem) for subscale, subitem
+                          in reversed(item.terms)]
+            else:
+                self._components.append(item)
+                self._concentrations.append(scale)
+
+    # Combine mixtures and components
+    def __add__(self, other):
+        if not isinstance(other, Mixture):
+            return NotImplemented
+        return _combine([(1, self), (1, other)], self.name)
+
+    def __iadd__(self, other):
+        "Add a mixture (eg, conc * component) to this mixture, in place"
+        if not isinstance(other, Mixture):
+            return NotImplemented
+        if len(other.parameters):
+            # Don't change a parameter table shared with a component
+            self.parameters = self.parameters.copy()
+        _merge_settings(self, other)
+        self._terms.append((1, _Snapshot(other)))
+        return self
+
+    # Scale the concentrations of all components in a mixture
+    def __mul__(self, scale):
+        if not isinstance(scale, numbers.Real):
+            return NotImplemented
+        return _combine([(scale, self)], self.name)
+
+    __rmul__ = __mul__
+
+    def _update_sbml_model(self, defer_templates=False):
+        """Updating the internal SBML representation
+
+        DNA assemblies with the same architecture are created from a
+        template (see txtl.template).  If `defer_templates` is True,
+        the reactions generated from templates are not added to the
+        model, but are stored in `self._templates.deferred` (used by
+        `compile_mixture()`).
+
+        """
+        # Start from an empty model so that repeated updates (eg, calling
+        # write_sbml() twice) don't create duplicate reactions
+        self._SBMLdoc, self._model, self._compartment = create_sbml_model()
+        self._templates = templates = TemplateCache(self, defer_templates) \
+            if self.use_templates else None
+
         # Update all species in the mixture to make sure everything exists
         assert (len(self.concentrations) == len(self.components))
-        for component, concentration in zip(self.components, self.concentrations):
+        for position, (component, concentration) in \
+                enumerate(zip(self.components, self.concentrations)):
             # Create all (global) parameters for this component
             # ! TODO: need to document this better; see extract.py
             component.update_parameters(self)
 
             # Create all of the species for this component
-            component.update_species(self, concentration)
-
-
+            if templates is None or \
+               not templates.add_species(position, component, concentration):
+                component.update_species(self, concentration)
 
         # Now go through and add all of the reactions that are required
-        for component in self.components:
+        for position, (component, concentration) in \
+                enumerate(zip(self.components, self.concentrations)):
+            if templates is not None and position in templates.instances:
+                if templates.add_reactions(position, component, concentration):
+                    continue
+
+                # Template didn't work for the reactions; set up the
+                # species (and assembly attributes) the regular way
+                component.update_species(self, concentration)
             component.update_reactions(self)
 
     def print_report(self):
@@ -146,40 +278,59 @@ def add_dna(mixture, dna, conc, type=None):
 
 # Combine the components of two more more mixtures
 def combine_mixtures(mixtures, volumes=None, name=None):
+    """Combine mixtures, scaling concentrations by the relative volumes
+
+    The components of the combined mixture are computed when they are
+    first needed (see Mixture).  If no volumes are given, equal volumes
+    of each mixture are used.
+
+    """
     # Create a name if we were sent done
-    
-    # Create a mixture for the results
     if name is None:
-        name = 'Mix_of'
-
-    outmixture = Mixture(name)
+        name = 'Mix_of' + ''.join('_' + str(mixture) for mixture in mixtures)
 
     # Keep track of the total amount of mixture we are creating (for scaling)
     # If no volumes are given, assume equal volumes of 1 unit each
     total_volume = sum(volumes) if volumes is not None else len(mixtures)
 
-    # Add the components (and concentrations) of inputs to the output
-    for i, mixture in enumerate(mixtures):
-        # Combine the mechanisms
-        #! TODO: issue a warning if there are conflicting mechanisms
-        outmixture.default_mechanisms.update(mixture.default_mechanisms)
-        outmixture.custom_mechanisms.update(mixture.custom_mechanisms)
-        outmixture.name += '_' + str(mixture) # getting the name of a mixture
-        # Components of new mixture are concatenation of mixture components
-        outmixture.components += mixture.components
-
-        # Concentrations are scaled by the volume
-        scale = volumes[i]/total_volume if volumes is not None else 1/total_volume
-        for concentration in mixture.concentrations:
-            outmixture.concentrations += [concentration * scale]
-
-        # Combine parameter dictionaries from each mixture
-        #! TODO: issue a warning if there are conflicting parameters
-        outmixture.parameters.update(mixtures[i].parameters)
-
-    assert len(outmixture.concentrations) == len(outmixture.components)
+    # Concentrations are scaled by the volume
+    return _combine([
+        (volumes[i]/total_volume if volumes is not None else 1/total_volume,
+         mixture) for i, mixture in enumerate(mixtures)], name)
+
+# Create a mixture from a list of (scale, mixture or component) terms
+def _combine(terms, name):
+    outmixture = Mixture(name)
+    for scale, item in terms:
+        if isinstance(item, Mixture):
+            _merge_settings(outmixture, item)
+    outmixture._terms = [
+        (scale, _Snapshot(item) if isinstance(item, Mixture) else item)
+        for scale, item in terms]
     return outmixture
 
+# Contents of a mixture at the time it was combined with other mixtures
+class _Snapshot:
+    # Only the lists are copied (not the components), so taking a
+    # snapshot of a mixture that has not been flattened is cheap, and
+    # changes made to the mixture later (eg, by add_dna()) don't
+    # affect the mixtures it was combined into
+    __slots__ = ('components', 'concentrations', 'terms')
+
+    def __init__(self, mixture):
+        self.components = list(mixture._components)
+        self.concentrations = list(mixture._concentrations)
+        self.terms = list(mixture._terms)
+
+# Add the mechanisms and parameters of a mixture to another mixture
+def _merge_settings(outmixture, mixture):
+    #! TODO: issue a warning if there are conflicting mechanisms
+    outmixture.default_mechanisms.update(mixture.default_mechanisms)
+    outmixture.custom_mechanisms.update(mixture.custom_mechanisms)
+
+    #! TODO: issue a warning if there are conflicting parameters
+    outmixture.parameters.update(mixture.parameters)
+
 # Write out the SBML description of the contexts of a mixture
 def write_sbml(mixture, file):
     return mixture.write_sbml(file)
@@ -0,0 +1,865 @@
+# network.py - compiled reaction networks
+# AP, 19 Oct 2026
+#
+# This file contains the ReactionNetwork class, which holds a compact,
+# array based representation of the species and reactions generated by
+# a mixture.  The SBML model remains the canonical description of a
+# mixture; the reaction network is "compiled" from it once and can
+# then be evaluated (and modified) many times without going back
+# through libsbml.  This is what is used by the native simulation,
+# fitting and analysis functions in the toolbox.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import hashlib
+import libsbml
+import numpy as np
+import scipy.sparse
+
+class ReactionNetwork:
+    """Compiled mass-action reaction network (with optional Hill repression)
+
+    The ReactionNetwork class stores the species and reactions of a
+    mixture as numpy arrays, so that the right hand side and Jacobian
+    of the corresponding ODE can be evaluated in a vectorized way.
+    Reaction networks are normally created using `compile_mixture()`.
+
+    Data attributes
+    ---------------
+    name            Name of the mixture the network was compiled from (str)
+    species         Species ids, in state vector order (list of str)
+    x0              Initial concentrations (ndarray, n_species)
+    reactions       Reaction ids (list of str)
+    rate_names      Name of the rate constant for each reaction (list of str)
+    k               Rate constants (ndarray, n_reactions)
+    reactants       Reactant species indices (ndarray, n_reactions x order)
+    stoichiometry   Net stoichiometry matrix (sparse, n_species x n_reactions)
+    parameters      Values of model-level (global) parameters (dict)
+    scaling         Characteristic scales used for simulation (Scaling), or
+                    None to simulate in concentration units
+    modifiers       Repressor species index for each reaction (ndarray,
+                    n_reactions, with n_species for reactions that are not
+                    repressed), or None if no reaction is repressed
+    hill            Hill constants (K, n) for each reaction (ndarray,
+                    n_reactions x 2), or None
+
+    Reactant species are stored with repeated entries for non-unit
+    stoichiometry and padded with the index `n_species`, which refers
+    to a constant entry of 1 that is appended to the state when rates
+    are evaluated.
+
+    Rate constants can be changed in place by name using
+    `set_parameters()`; all reactions whose kinetic law uses a given
+    parameter name are updated at once.
+
+    Reactions can be repressed by a species R, in which case the
+    mass-action rate is multiplied by the Hill function
+    1 / (1 + (R/K)^n).  This is used by reduced (fast) mechanisms that
+    replace explicit repressor binding (see txtl.mechanisms.repression).
+    The Hill constants are stored separately from the rate constants.
+
+    The right hand side and Jacobian can be evaluated either using
+    generic (vectorized) numpy code, or using code that is generated
+    specifically for the network (see `generate_code()`), which is much
+    faster for evaluating a single state.
+
+    Species concentrations and rate constants in a mixture can span
+    many orders of magnitude, which makes the ODE badly scaled.  If a
+    `scaling` is set (see `set_scaling()`), the simulation functions
+    integrate the network in nondimensional variables (concentrations
+    divided by characteristic concentrations and time divided by a
+    characteristic time) and convert the results back to concentration
+    units.
+
+    """
+    def __init__(self, name, species, x0, reactions, rate_names, k,
+                 reactant_lists, stoichiometry, parameters={},
+                 modifiers=None, hill=None):
+        self.name = name
+        self.species = list(species)
+        self.x0 = np.array(x0, dtype=float)
+        self.reactions = list(reactions)
+        self.rate_names = list(rate_names)
+        self.k = np.array(k, dtype=float)
+        self.stoichiometry = scipy.sparse.csr_matrix(stoichiometry)
+        self.parameters = dict(parameters)
+        self.scaling = None
+
+        # Store the reactants as a padded index array
+        self.reactants = _pad(reactant_lists, len(self.species))
+
+        # Hill repression (reactions without a repressor use K = inf)
+        self.modifiers = self.hill = None
+        if modifiers is not None and \
+           np.any(np.asarray(modifiers) != len(self.species)):
+            self.modifiers = np.array(modifiers, dtype=np.intp)
+            self.hill = np.array(hill, dtype=float).reshape(-1, 2)
+
+        self._update_indices()
+
+        # Jacobian structure (computed when first needed)
+        self._pattern = None
+        self._jac_map = None
+
+        # Generated code (see generate_code)
+        self._codegen = None
+        self._functions = None
+        self._hill_values = None
+
+    def _update_indices(self):
+        "Rebuild the species and parameter lookup tables"
+        self.species_index = {s: i for i, s in enumerate(self.species)}
+        index = {}
+        for j, name in enumerate(self.rate_names):
+            index.setdefault(name, []).append(j)
+        self._rate_index = {name: np.array(rxns, dtype=np.intp)
+                            for name, rxns in index.items()}
+
+    @property
+    def nspecies(self):
+        return len(self.species)
+
+    @property
+    def nreactions(self):
+        return len(self.reactions)
+
+    def get_species_index(self, species):
+        "Return the state index (or list of indices) for species id(s)"
+        if isinstance(species, str):
+            return self.species_index[species]
+        return [self.species_index[s] for s in species]
+
+    #
+    # Parameter access
+    #
+    # Parameters are referred to by the name used in the kinetic law
+    # of the reactions (eg, 'RNAPbound_F' or 'TL_Rate'), which may be
+    # either a local parameter of the reaction or a global parameter
+    # of the model.  Setting a parameter sets the rate constant for
+    # every reaction that uses it.
+    #
+
+    def parameter_names(self):
+        "List of the parameter names that can be set in this network"
+        names = list(self._rate_index.keys())
+        names += [p for p in self.parameters if p not in self._rate_index]
+        return names
+
+    def parameter_indices(self, name):
+        "Return the indices of the reactions that use a given parameter"
+        if name in self._rate_index:
+            return self._rate_index[name]
+        if name in self.parameters:
+            return np.zeros(0, dtype=np.intp)
+        raise KeyError("unknown parameter %s" % name)
+
+    def set_parameters(self, names, values):
+        "Set the value of one or more parameters (in place)"
+        if isinstance(names, str):
+            names, values = [names], [values]
+        for name, value in zip(names, values):
+            self.k[self.parameter_indices(name)] = value
+            if name in self.parameters:
+                self.parameters[name] = float(value)
+
+    def get_parameters(self, names):
+        "Get the value of one or more parameters"
+        if isinstance(names, str):
+            return self._get_parameter(names)
+        return np.array([self._get_parameter(name) for name in names])
+
+    def _get_parameter(self, name):
+        indices = self.parameter_indices(name)
+        if len(indices) > 0:
+            return float(self.k[indices[0]])
+        return self.parameters[name]
+
+    def rate_matrix(self, names, values):
+        """Build a matrix of rate constants for a set of parameter values
+
+        Returns an array of shape (N, n_reactions) in which row i
+        contains the rate constants of the network with the parameters
+        `names` set to the values in row i of `values`.  Useful for
+        evaluating many parameter sets in a single vectorized call.
+
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        k = np.tile(self.k, (values.shape[0], 1))
+        for i, name in enumerate(names):
+            k[:, self.parameter_indices(name)] = values[:, i:i+1]
+        return k
+
+    #
+    # Right hand side evaluation
+    #
+    # All of the evaluation functions are vectorized over leading
+    # dimensions: the state `x` can have shape (..., n_species) and the
+    # rate constants `k` can have shape (..., n_reactions).
+    #
+
+    def rates(self, x, k=None):
+        "Compute reaction rates (fluxes) for a state (or states)"
+        k = self.k if k is None else k
+        x = np.asarray(x, dtype=float)
+        xe = np.concatenate([x, np.ones(x.shape[:-1] + (1,))], axis=-1)
+        rates = k * np.prod(xe[..., self.reactants], axis=-1)
+        if self.modifiers is not None:
+            rates = rates * self._repression(xe)[0]
+        return rates
+
+    def _repression(self, xe):
+        "Hill repression factors (and their derivatives) for extended states"
+        K, n = self.hill[:, 0], self.hill[:, 1]
+        u = xe[..., self.modifiers] / K
+        h = 1 / (1 + u ** n)
+        return h, -n * u ** (n - 1) / K * h ** 2
+
+    def _positions(self):
+        "Species that each rate depends on (reactants, then repressor)"
+        if self.modifiers is None:
+            return self.reactants
+        return np.concatenate([self.reactants, self.modifiers[:, None]],
+                              axis=1)
+
+    def rhs(self, t, x, k=None):
+        "Compute the time derivative of the state (ODE right hand side)"
+        if self._functions is not None and np.ndim(x) == 1 and \
+           (k is None or np.ndim(k) == 1):
+            return self._functions[0](
+                t, np.asarray(x, dtype=float), self.k if k is None else k,
+                self._hill_values)
+        r = self.rates(x, k)
+        if r.ndim == 1:
+            return self.stoichiometry @ r
+        return np.asarray(self.stoichiometry @ r.reshape(-1, r.shape[-1]).T)\
+            .T.reshape(r.shape[:-1] + (self.nspecies,))
+
+    def rate_jacobian(self, x, k=None):
+        "Compute the derivative of the reaction rates with respect to x"
+        partials = self._rate_partials(x, k)
+        drdx = np.zeros(partials.shape[:-1] + (self.nspecies + 1,))
+        rows = np.arange(self.nreactions)
+        positions = self._positions()
+        for p in range(positions.shape[1]):
+            # Each reaction appears once per column, so no index repeats
+            drdx[..., rows, positions[:, p]] += partials[..., p]
+        return drdx[..., :-1]
+
+    def _rate_partials(self, x, k=None):
+        "Derivative of each rate with respect to each reactant (and repressor)"
+        k = self.k if k is None else k
+        x = np.asarray(x, dtype=float)
+        xe = np.concatenate([x, np.ones(x.shape[:-1] + (1,))], axis=-1)
+        factors = xe[..., self.reactants]
+        partials = np.empty(factors.shape)
+        for p in range(self.reactants.shape[1]):
+            others = np.prod(np.delete(factors, p, axis=-1), axis=-1)
+            partials[..., p] = k * others
+        if self.modifiers is not None:
+            h, dh = self._repression(xe)
+            base = k * np.prod(factors, axis=-1)
+            partials = np.concatenate(
+                [partials * h[..., None], (base * dh)[..., None]], axis=-1)
+        return partials
+
+    #
+    # Jacobian evaluation
+    #
+    # The Jacobian is sparse, with a fixed pattern of nonzero entries.
+    # The values of the nonzero entries are computed from the partial
+    # derivatives of the rates with respect to each reactant using a
+    # precomputed (sparse) linear map.
+    #
+
+    def jacobian_pattern(self):
+        "Return the (rows, cols) of the nonzero entries of the Jacobian"
+        if self._pattern is None:
+            self._build_jacobian_map()
+        return self._pattern
+
+    def jacobian_map(self):
+        """Return the map from rate partials to Jacobian entries
+
+        Returns a sparse matrix M of size (n_reactions * order, nnz)
+        such that the nonzero entries of the Jacobian (in the order
+        given by `jacobian_pattern()`) are the product of the
+        flattened partial derivatives of the reaction rates with
+        respect to each reactant position and M.  If the network has
+        repressed reactions, the repressor is included as an extra
+        position (order + 1 positions per reaction).
+
+        """
+        if self._jac_map is None:
+            self._build_jacobian_map()
+        return self._jac_map
+
+    def _build_jacobian_map(self):
+        stoich = self.stoichiometry.tocsc()
+        positions = self._positions()
+        order = positions.shape[1]
+        terms = []
+        for j in range(self.nreactions):
+            start, end = stoich.indptr[j], stoich.indptr[j+1]
+            for p, i in enumerate(positions[j]):
+                if i == self.nspecies:
+                    continue
+                terms += [(j * order + p, s, i, c) for s, c in zip(
+                    stoich.indices[start:end], stoich.data[start:end])]
+
+        # Number the nonzero entries in row major order
+        entries = sorted(set((s, i) for m, s, i, c in terms))
+        slots = {entry: n for n, entry in enumerate(entries)}
+        self._pattern = (np.array([e[0] for e in entries], dtype=np.intp),
+                         np.array([e[1] for e in entries], dtype=np.intp))
+        self._jac_map = scipy.sparse.csr_matrix(
+            ([t[3] for t in terms],
+             ([t[0] for t in terms], [slots[t[1:3]] for t in terms])),
+            shape=(self.nreactions * order, len(entries)))
+
+    def jacobian_values(self, t, x, k=None):
+        "Compute the nonzero entries of the Jacobian (see jacobian_pattern)"
+        if self._functions is not None and np.ndim(x) == 1 and \
+           (k is None or np.ndim(k) == 1):
+            return self._functions[1](
+                t, np.asarray(x, dtype=float), self.k if k is None else k,
+                self._hill_values, np.zeros(len(self.jacobian_pattern()[0])))
+
+        partials = self._rate_partials(x, k)
+        batch = partials.shape[:-2]
+        values = self.jacobian_map().T @ \
+            partials.reshape(-1, partials.shape[-2] * partials.shape[-1]).T
+        return np.asarray(values).T.reshape(batch + (values.shape[0],))
+
+    def jacobian(self, t, x, k=None):
+        "Compute the Jacobian of the right hand side (dense)"
+        values = self.jacobian_values(t, x, k)
+        J = np.zeros(values.shape[:-1] + (self.nspecies, self.nspecies))
+        rows, cols = self.jacobian_pattern()
+        J[..., rows, cols] = values
+        return J
+
+    def sparse_jacobian(self, t, x, k=None):
+        "Compute the Jacobian of the right hand side (sparse)"
+        return scipy.sparse.csr_matrix(
+            (self.jacobian_values(t, x, k), self.jacobian_pattern()),
+            shape=(self.nspecies, self.nspecies))
+
+    #
+    # Generated code
+    #
+    # The code that is generated for a network is stored in a module
+    # that is cached on disk.  The loaded functions are not pickled
+    # along with the network, but are reloaded from the cache (or
+    # regenerated) when the network is unpickled.
+    #
+
+    def generate_code(self, jit=None, cache_dir=None):
+        """Use generated code to evaluate the right hand side and Jacobian
+
+        Generates (or loads from the cache) code specialized to the
+        structure of this network, and uses it for evaluating `rhs()`
+        and `jacobian()` for single states.  If `jit` is True, the code
+        is compiled with Numba.  If `jit` is None (default), Numba is
+        used if it is installed and otherwise the vectorized numpy
+        code is kept (with a warning).  If `jit` is False, the generated
+        code is used without compilation (mainly useful for testing).
+        Vectorized (batch) evaluations always use the numpy code.
+
+        """
+        from .codegen import load_functions
+        self._functions = load_functions(self, jit, cache_dir)
+        self._codegen = (jit, cache_dir)
+        self._hill_values = self.hill if self.hill is not None else \
+            np.ones((self.nreactions, 2))
+        return self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_functions'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('scaling', None)
+        self.__dict__.setdefault('modifiers', None)
+        self.__dict__.setdefault('hill', None)
+        self.__dict__.setdefault('_hill_values', None)
+        if self._codegen is not None:
+            self.generate_code(*self._codegen)
+
+    #
+    # Scaling
+    #
+    # Nondimensionalization of the state and time for simulation.  The
+    # network itself is not changed: the simulation functions rescale
+    # the right hand side, Jacobian and tolerances (see txtl.simulate).
+    #
+
+    def set_scaling(self, enable=True, species=None, time=None, atol=1e-6):
+        """Set the characteristic scales used for simulating the network
+
+        The characteristic concentrations of the `species` (array,
+        n_species) and the characteristic `time` default to the values
+        computed by `characteristic_scales()`.  The absolute tolerance
+        `atol` is relative to the characteristic concentrations, so
+        that each species is integrated with an accuracy appropriate
+        for its magnitude.  If `enable` is False, the scaling is
+        removed.  Returns the network.
+
+        """
+        if not enable:
+            self.scaling = None
+            return self
+        default_species, default_time = characteristic_scales(self)
+        species = default_species if species is None else \
+            np.array(species, dtype=float)
+        if species.shape != (self.nspecies,) or np.any(species <= 0):
+            raise ValueError("set_scaling: species scales must be positive "
+                             "(one for each species)")
+        self.scaling = Scaling(species, default_time if time is None
+                               else float(time), atol)
+        return self
+
+    #
+    # Utility functions
+    #
+
+    def structure_hash(self):
+        """Hash of the network structure (species and stoichiometry)
+
+        The structure hash identifies networks that have the same
+        species and reactions, independent of the values of the rate
+        constants and initial conditions.
+
+        """
+        stoich = self.stoichiometry.tocoo()
+        digest = hashlib.sha1()
+        digest.update("\n".join(self.species).encode())
+        digest.update("\n".join(self.rate_names).encode())
+        digest.update(np.ascontiguousarray(self.reactants).tobytes())
+        for array in (stoich.row, stoich.col, stoich.data):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        if self.modifiers is not None:
+            digest.update(np.ascontiguousarray(self.modifiers).tobytes())
+        return digest.hexdigest()
+
+    def copy(self):
+        "Create a copy of the network (with separate parameter values)"
+        network = ReactionNetwork.__new__(ReactionNetwork)
+        network.__dict__.update(self.__dict__)
+        network.x0 = self.x0.copy()
+        network.k = self.k.copy()
+        network.parameters = dict(self.parameters)
+        return network
+
+    def subnetwork(self, reactions=None, species=None, name=None):
+        """Create a network containing a subset of the reactions and species
+
+        The `reactions` and `species` to keep are given as boolean masks
+        or lists of indices (default: all).  The kept reactions can only
+        involve kept species.  The rate constants, initial
+        concentrations and scaling of the kept reactions and species
+        are copied from this network.
+
+        """
+        reactions = np.arange(self.nreactions)[
+            slice(None) if reactions is None else reactions]
+        species = np.arange(self.nspecies)[
+            slice(None) if species is None else species]
+
+        # Map the old species indices to the new ones (-1 = removed)
+        position = np.full(self.nspecies + 1, -1, dtype=np.intp)
+        position[species] = np.arange(len(species))
+        position[-1] = len(species)
+        reactants = position[self.reactants[reactions]]
+        modifiers = position[self.modifiers[reactions]] \
+            if self.modifiers is not None else None
+        removed = np.setdiff1d(np.arange(self.nspecies), species)
+        if np.any(reactants < 0) or self.stoichiometry[removed][
+                :, reactions].nnz > 0 or \
+                (modifiers is not None and np.any(modifiers < 0)):
+            raise ValueError("subnetwork: reactions use species that are "
+                             "not kept")
+
+        network = ReactionNetwork(
+            self.name if name is None else name,
+            [self.species[i] for i in species], self.x0[species],
+            [self.reactions[j] for j in reactions],
+            [self.rate_names[j] for j in reactions], self.k[reactions],
+            reactants, self.stoichiometry[species][:, reactions],
+            self.parameters, modifiers,
+            self.hill[reactions] if self.hill is not None else None)
+        if self.scaling is not None:
+            network.scaling = Scaling(self.scaling.species[species],
+                                      self.scaling.time, self.scaling.atol)
+        if self._codegen is not None:
+            network.generate_code(*self._codegen)
+        return network
+
+    def __str__(self):
+        return "ReactionNetwork %s: %d species, %d reactions" % \
+            (self.name, self.nspecies, self.nreactions)
+
+class Scaling:
+    """Characteristic scales for simulating a reaction network
+
+    Data attributes
+    ---------------
+    species     Characteristic concentration of each species (ndarray)
+    time        Characteristic time (float)
+    atol        Absolute tolerance for the scaled concentrations (float)
+
+    """
+    def __init__(self, species, time, atol=1e-6):
+        self.species = species
+        self.time = time
+        self.atol = atol
+
+# Compute characteristic concentrations and time for a network
+def characteristic_scales(network):
+    """Estimate characteristic concentrations and time for a network
+
+    Species with a nonzero initial concentration use that value as
+    their characteristic concentration.  The scale of species that are
+    initially absent is propagated through the reactions that produce
+    them: a product is assigned the smallest scale of the reactants of
+    the reaction (eg, a complex is limited by the less abundant of its
+    components), which is a lower bound for the concentrations reached
+    by species produced catalytically (such as RNA and proteins).
+    Species that cannot be reached are given the smallest nonzero
+    initial concentration.
+
+    The characteristic time is the inverse of the median pseudo first
+    order rate of the reactions (the rate constant times the scales of
+    all reactants but one).  Returns the species scales (ndarray) and
+    the time scale.
+
+    """
+    n = network.nspecies
+    scales = np.maximum(network.x0, 0)
+    stoich = network.stoichiometry.tocsr()
+    products = scipy.sparse.csr_matrix(
+        (np.ones(stoich.nnz), stoich.indices, stoich.indptr),
+        shape=stoich.shape).multiply(stoich > 0).tocsr()
+
+    # Propagate the scales through the reactions until nothing changes
+    for iteration in range(n):
+        padded = np.append(scales, np.inf)
+        limit = padded[network.reactants].min(axis=1)
+        limit[~np.isfinite(limit)] = 0
+        new = np.maximum(scales, products.multiply(limit[None, :]).max(
+            axis=1).toarray().ravel())
+        if np.array_equal(new, scales):
+            break
+        scales = new
+
+    positive = scales[scales > 0]
+    scales[scales <= 0] = positive.min() if len(positive) else 1
+
+    # Pseudo first order rates
+    padded = np.append(scales, 1)
+    factors = padded[network.reactants]
+    rates = network.k * np.prod(factors, axis=1) / factors.max(axis=1)
+    rates = rates[np.isfinite(rates) & (rates > 0)]
+    time = 1 / np.median(rates) if len(rates) else 1
+    return scales, float(time)
+
+#
+# Functions for compiling mixtures into reaction networks
+#
+
+# Compile a mixture into a reaction network
+def compile_mixture(mixture, codegen=False, jit=None, scale=False):
+    """Compile a mixture into a ReactionNetwork
+
+    The species and reactions for the mixture are generated (as for
+    `write_sbml()`) and then converted into a ReactionNetwork that can
+    be used for simulation and analysis.  The mixture can be
+    recompiled if its contents are changed.
+
+    DNA assemblies created from templates (see txtl.template) are added
+    to the network directly, without creating their reactions in the
+    SBML model of the mixture (the model is rebuilt with all reactions
+    the next time that it is used, eg by `write_sbml()`).
+
+    If `codegen` is True, specialized code is generated for evaluating
+    the right hand side and Jacobian of the network (see
+    `ReactionNetwork.generate_code()`).  If `scale` is True, the network
+    is simulated in nondimensional variables, using the characteristic
+    scales computed from the network (see `ReactionNetwork.set_scaling()`).
+
+    """
+    mixture._update_sbml_model(defer_templates=True)
+    templates = mixture._templates
+    network = compile_sbml_model(
+        mixture.model, name=mixture.name,
+        deferred=templates.deferred if templates is not None else ())
+    if templates is not None and templates.deferred:
+        # Don't leave the incomplete model in the mixture
+        mixture._SBMLdoc = None
+    if codegen:
+        network.generate_code(jit=jit)
+    if scale:
+        network.set_scaling()
+    return network
+
+# Compile an SBML model into a reaction network
+def compile_sbml_model(model, name=None, deferred=(), issues=None):
+    """Create a ReactionNetwork from an SBML model with mass-action kinetics
+
+    The `deferred` argument is a list of (template, instance) pairs for
+    DNA assemblies whose reactions were not added to the model; their
+    reactions are appended to the reactions in the model.
+
+    If `issues` is a list, problems with individual reactions (species
+    that are not defined, kinetic laws that are not mass-action and rate
+    constants that are not defined) are appended to it as (check,
+    reaction id, message) tuples instead of raising an exception.  The
+    reaction is kept, with the undefined species left out and a rate
+    constant of NaN, so that the rest of the network can be checked
+    (see txtl.validate).
+
+    """
+    species = [s.getId() for s in model.getListOfSpecies()]
+    index = {s: i for i, s in enumerate(species)}
+    x0 = [_initial_concentration(s) for s in model.getListOfSpecies()]
+
+    # Global parameters in the model
+    parameters = {p.getId(): p.getValue() for p in model.getListOfParameters()}
+
+    reactions, rate_names, k, reactant_lists = [], [], [], []
+    rows, cols, stoich = [], [], []
+    modifiers, hill = [], []
+    for j, reaction in enumerate(model.getListOfReactions()):
+        reactions.append(reaction.getId())
+        modifiers.append(len(species))
+        hill.append((np.inf, 1.0))
+
+        # Keep track of the net stoichiometry for each species
+        net = {}
+        reactant_list = []
+        for ref in reaction.getListOfReactants():
+            i = _species_position(index, ref, reaction, issues)
+            if i is None: continue
+            coeff = _stoichiometry(ref)
+            net[i] = net.get(i, 0) - coeff
+            reactant_list += [i] * int(coeff)
+        for ref in reaction.getListOfProducts():
+            i = _species_position(index, ref, reaction, issues)
+            if i is None: continue
+            net[i] = net.get(i, 0) + _stoichiometry(ref)
+        for i, coeff in net.items():
+            if coeff != 0:
+                rows.append(i); cols.append(j); stoich.append(coeff)
+        reactant_lists.append(reactant_list)
+
+        # Find the rate constant (and repression) for the reaction
+        if issues is None:
+            rate_name, repression = _kinetic_law(reaction, index)
+            rate_names.append(rate_name)
+            k.append(_parameter_value(reaction, rate_name, parameters))
+            if repression is not None:
+                modifiers[-1], hill[-1] = _hill_constants(
+                    reaction, repression, index, parameters)
+            continue
+        try:
+            rate_name, repression = _kinetic_law(reaction, index)
+        except (ValueError, NotImplementedError) as error:
+            issues.append(('kinetic_law', reaction.getId(), str(error)))
+            rate_names.append("")
+            k.append(np.nan)
+            continue
+        rate_names.append(rate_name)
+        try:
+            value = _parameter_value(reaction, rate_name, parameters)
+            if repression is not None:
+                modifiers[-1], hill[-1] = _hill_constants(
+                    reaction, repression, index, parameters)
+        except ValueError as error:
+            issues.append(('undefined_parameter', reaction.getId(), str(error)))
+            value = np.nan
+        k.append(value)
+
+    # Add the reactions from templates (grouped by template)
+    groups = {}
+    for template, instance in deferred:
+        groups.setdefault(id(template), (template, []))[1].append(instance)
+    if groups:
+        reactant_lists = _pad(reactant_lists, len(species))
+        rows, cols, stoich = [np.array(rows, dtype=np.intp),
+                              np.array(cols, dtype=np.intp),
+                              np.array(stoich, dtype=float)]
+        for template, instances in groups.values():
+            ids, names, rates, reactants, trows, tcols, tcoeffs = \
+                template.compile_reactions(instances, index, parameters)
+            offset = len(reactions)
+            reactions += ids
+            rate_names += names
+            k = np.concatenate([k, rates])
+            reactant_lists = _pad(reactant_lists, len(species),
+                                  reactants.shape[1])
+            reactant_lists = np.concatenate([reactant_lists, _pad(
+                reactants, len(species), reactant_lists.shape[1])])
+            rows = np.concatenate([rows, trows])
+            cols = np.concatenate([cols, tcols + offset])
+            stoich = np.concatenate([stoich, tcoeffs])
+            modifiers += [len(species)] * len(ids)
+            hill += [(np.inf, 1.0)] * len(ids)
+
+    S = scipy.sparse.coo_matrix(
+        (stoich, (rows, cols)), shape=(len(species), len(reactions)))
+    return ReactionNetwork(
+        name if name is not None else model.getId(), species, x0,
+        reactions, rate_names, k, reactant_lists, S, parameters,
+        modifiers, hill)
+
+# Convert reactant lists to a padded array (with at least `order` columns)
+def _pad(reactant_lists, fill, order=1):
+    if isinstance(reactant_lists, np.ndarray):
+        if reactant_lists.shape[1] >= order:
+            return reactant_lists
+        return np.concatenate([reactant_lists, np.full(
+            (len(reactant_lists), order - reactant_lists.shape[1]), fill,
+            dtype=np.intp)], axis=1)
+    order = max([len(r) for r in reactant_lists] + [order])
+    array = np.full((len(reactant_lists), order), fill, dtype=np.intp)
+    for j, indices in enumerate(reactant_lists):
+        array[j, :len(indices)] = indices
+    return array
+
+# Get the position of the species in a species reference
+def _species_position(index, ref, reaction, issues):
+    if issues is None or ref.getSpecies() in index:
+        return index[ref.getSpecies()]
+    issues.append(('undefined_species', reaction.getId(),
+                   "reaction %s: species %s not defined" %
+                   (reaction.getId(), ref.getSpecies())))
+    return None
+
+# Get the initial concentration of a species (zero if not given)
+def _initial_concentration(species):
+    if species.isSetInitialConcentration():
+        return species.getInitialConcentration()
+    if species.isSetInitialAmount():
+        return species.getInitialAmount()
+    return 0
+
+# Get the stoichiometry of a species reference (unset means 1)
+def _stoichiometry(ref):
+    return ref.getStoichiometry() if ref.isSetStoichiometry() else 1
+
+# Find the rate constant and Hill repression term of a kinetic law
+def _kinetic_law(reaction, species_index):
+    """Return the rate constant name and repression of a reaction
+
+    The kinetic law must be either mass-action (see
+    `_mass_action_parameter()`) or a mass-action law divided by a Hill
+    repression term, `k * S1 * S2 ... / (1 + pow(R / K, n))`, where R is
+    a species and K and n are parameters or numbers (see the
+    `repressor` argument of txtl.sbmlutil.add_reaction()).  Returns the
+    name of the rate constant and either None or the (R, K, n) tuple,
+    with K and n given as names or numbers.
+
+    """
+    law = reaction.getKineticLaw()
+    if law is None or law.getMath() is None:
+        raise ValueError("reaction %s has no kinetic law" % reaction.getId())
+
+    math, repression = law.getMath(), None
+    if math.getType() == libsbml.AST_DIVIDE and math.getNumChildren() == 2:
+        denominator = math.getChild(1)
+        if denominator.getType() != libsbml.AST_PLUS or \
+           denominator.getNumChildren() != 2 or \
+           not denominator.getChild(0).isNumber() or \
+           denominator.getChild(0).getValue() != 1:
+            raise NotImplementedError(
+                "reaction %s: kinetic law %s is not mass-action" %
+                (reaction.getId(), libsbml.formulaToL3String(math)))
+        power = denominator.getChild(1)
+        ratio = power.getChild(0) if power.getNumChildren() == 2 else None
+        if power.getType() not in (libsbml.AST_POWER,
+                                   libsbml.AST_FUNCTION_POWER) or \
+           ratio is None or ratio.getType() != libsbml.AST_DIVIDE or \
+           not ratio.getChild(0).isName() or \
+           ratio.getChild(0).getName() not in species_index:
+            raise NotImplementedError(
+                "reaction %s: kinetic law %s is not a repressed mass-action "
+                "law" % (reaction.getId(), libsbml.formulaToL3String(math)))
+        repression = (ratio.getChild(0).getName(),) + tuple(
+            node.getName() if node.isName() else node.getValue()
+            for node in (ratio.getChild(1), power.getChild(1)))
+        math = math.getChild(0)
+    return _mass_action_parameter(reaction, species_index, math), repression
+
+# Get the species index and Hill constants (K, n) of a repressed reaction
+def _hill_constants(reaction, repression, species_index, parameters):
+    species, K, n = repression
+    return species_index[species], tuple(
+        value if not isinstance(value, str) else
+        _parameter_value(reaction, value, parameters) for value in (K, n))
+
+# Find the rate constant name for a mass-action kinetic law
+def _mass_action_parameter(reaction, species_index, math=None):
+    """Return the name of the rate constant of a mass-action reaction
+
+    The kinetic law must be of the form `k * S1 * S2 ...` (possibly
+    with integer powers of species), where the species match the
+    reactants of the reaction.  If `math` is given, it is used instead
+    of the kinetic law of the reaction (see `_kinetic_law()`).
+
+    """
+    law = reaction.getKineticLaw()
+    if law is None or law.getMath() is None:
+        raise ValueError("reaction %s has no kinetic law" % reaction.getId())
+    math = law.getMath() if math is None else math
+
+    # Collect the factors in the kinetic law
+    names, powers = [], {}
+    def collect(ast):
+        if ast.getType() == libsbml.AST_TIMES:
+            for i in range(ast.getNumChildren()):
+                collect(ast.getChild(i))
+        elif ast.getType() in (libsbml.AST_POWER, libsbml.AST_FUNCTION_POWER) \
+             and ast.getChild(0).isName() and ast.getChild(1).isNumber():
+            name = ast.getChild(0).getName()
+            powers[name] = powers.get(name, 0) + ast.getChild(1).getValue()
+        elif ast.isName():
+            name = ast.getName()
+            if name in species_index:
+                powers[name] = powers.get(name, 0) + 1
+            else:
+                names.append(name)
+        else:
+            raise NotImplementedError(
+                "reaction %s: only mass-action kinetic laws are supported" %
+                reaction.getId())
+    collect(math)
+
+    # Make sure the species in the rate law match the reactants
+    reactants = {}
+    for ref in reaction.getListOfReactants():
+        reactants[ref.getSpecies()] = \
+            reactants.get(ref.getSpecies(), 0) + _stoichiometry(ref)
+    if len(names) != 1 or powers != reactants:
+        raise NotImplementedError(
+            "reaction %s: kinetic law %s is not mass-action" %
+            (reaction.getId(), libsbml.formulaToL3String(math)))
+    if any(power != int(power) for power in powers.values()):
+        raise NotImplementedError(
+            "reaction %s: reactions must have integer order" %
+            reaction.getId())
+    return names[0]
+
+# Get the value of a parameter used in a kinetic law
+def _parameter_value(reaction, name, parameters):
+    law = reaction.getKineticLaw()
+    local = law.getParameter(name)
+    if local is None:
+        local = law.getLocalParameter(name)
+    if local is not None:
+        return local.getValue()
+    if name in parameters:
+        return parameters[name]
+    raise ValueError("reaction %s: parameter %s not defined" %
+                     (reaction.getId(), name))
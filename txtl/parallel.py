@@ -0,0 +1,53 @@
+# parallel.py - process pool utilities
+# AP, 19 Oct 2026
+#
+# This file contains utility functions for evaluating a function over
+# a set of tasks using a pool of worker processes.  The typical use is
+# to evaluate many parameter sets against a single compiled reaction
+# network: the network (the "context") is sent to each worker once,
+# when the worker is started, and the individual tasks only carry the
+# parameter values.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Context for the current worker process (set by _init_worker)
+_worker_context = None
+
+def _init_worker(context):
+    global _worker_context
+    _worker_context = context
+
+def _call_worker(function, task):
+    return function(_worker_context, task)
+
+# Evaluate a function over a list of tasks, in parallel
+def parallel_map(function, tasks, context=None, processes=None):
+    """Evaluate `function(context, task)` for each task in a list
+
+    The tasks are distributed over a pool of worker processes.  The
+    context object is pickled and sent to each worker once (when the
+    pool is started), so it can be large (eg, a ReactionNetwork).
+    Both the function and the context must be picklable; the function
+    should be defined at the top level of a module.
+
+    If `processes` is 1 (or there is only one task), the function is
+    evaluated in the current process.  If `processes` is None, the
+    number of CPUs is used.  Results are returned in task order.
+
+    """
+    tasks = list(tasks)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(tasks))
+
+    if processes <= 1:
+        return [function(context, task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(context,)) as executor:
+        return list(executor.map(_call_worker, [function] * len(tasks), tasks,
+                                 chunksize=max(1, len(tasks) // (4*processes))))
@@ -0,0 +1,288 @@
+# paramdb.py - database of parameter values for the component library
+# AP, 19 Oct 2026
+#
+# This file contains the ParameterDatabase class, which holds the
+# parameter values from all of the configuration (CSV) files in the
+# component library, indexed by component and parameter name.  The
+# configuration files are found along a search path consisting of the
+# library directories followed by any user overlay directories (given
+# by the TXTL_PARAMETER_PATH environment variable or set using
+# set_parameter_path()).  Parameters in overlay directories replace
+# parameters with the same name in earlier directories.
+#
+# The contents of the configuration files are stored in an SQLite file
+# in the txtl cache directory, which is regenerated whenever one of the
+# configuration files changes.  The database is loaded into memory the
+# first time it is used, after which looking up the parameters for a
+# component is a dictionary lookup.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import os
+import re
+import csv
+import hashlib
+from .parameter import Parameter, ParameterTable
+from .pathutil import get_cache_dir
+
+try:
+    import sqlite3
+except ImportError:             # Python built without SQLite
+    sqlite3 = None
+
+# Version of the database layout (change to invalidate cached files)
+database_version = 1
+
+# Directories in the component library that contain configuration files
+_library_path = [
+    os.path.join(os.path.dirname(__file__), 'components'),
+    os.path.join(os.path.dirname(__file__), 'config'),
+]
+
+class ParameterDatabase:
+    """Parameter values for the components in the component library
+
+    Data attributes
+    ---------------
+    path        Directories searched for configuration files (list)
+    filename    SQLite file holding the database (None if not stored)
+    tables      Parameters for each component, indexed by the lower case
+                name of the configuration file without extension (dict
+                of ParameterTables)
+    sources     Configuration files used for each component (dict)
+
+    Methods
+    -------
+    get()       return the parameters for a configuration file
+    query()     find parameter values by component and/or parameter name
+    rebuild()   regenerate the database from the configuration files
+
+    """
+    def __init__(self, path=None, cache_dir=None):
+        self.path = list(path) if path is not None else default_path()
+        self.filename = None
+        if sqlite3 is not None:
+            key = hashlib.sha1(os.pathsep.join(
+                os.path.abspath(p) for p in self.path).encode()).hexdigest()
+            try:
+                self.filename = os.path.join(
+                    get_cache_dir(cache_dir),
+                    "parameters_%s_v%d.sqlite" % (key[:16], database_version))
+            except OSError:
+                pass            # no cache directory; keep tables in memory
+        self._load()
+
+    def get(self, filename):
+        """Return the parameters for a configuration file
+
+        The name of the configuration file is matched without regard to
+        case, with or without the .csv extension.  Returns a copy of the
+        parameter table, or None if the file is not in the database.
+
+        """
+        table = self.tables.get(component_key(filename))
+        return table.copy() if table is not None else None
+
+    def query(self, component=None, name=None):
+        """Find parameter values in the database
+
+        Returns a list of (component, Parameter) pairs for all
+        parameters that match the given component (configuration file)
+        and/or parameter name.
+
+        """
+        if self.filename is None:
+            return [(key, table[param])
+                    for key, table in sorted(self.tables.items())
+                    if component is None or key == component_key(component)
+                    for param in table if name is None or param == name]
+
+        conditions, values = [], []
+        if component is not None:
+            conditions.append("component = ?")
+            values.append(component_key(component))
+        if name is not None:
+            conditions.append("name = ?")
+            values.append(name)
+        with _connect(self.filename) as connection:
+            rows = connection.execute(
+                "SELECT component, name, type, value, comment "
+                "FROM parameters" +
+                (" WHERE " + " AND ".join(conditions) if conditions else "") +
+                " ORDER BY component, position", values).fetchall()
+        return [(row[0], Parameter(*row[1:])) for row in rows]
+
+    def rebuild(self):
+        "Regenerate the database from the configuration files"
+        self._load(force=True)
+
+    # Load the database, regenerating it if the files have changed
+    def _load(self, force=False):
+        files = _find_files(self.path)
+        if self.filename is None:
+            rows = _read_files(files)
+        else:
+            rows = None if force else _read_database(self.filename, files)
+            if rows is None:
+                rows = _read_files(files)
+                if not _write_database(self.filename, files, rows):
+                    self.filename = None
+
+        self.tables, self.sources = {}, {}
+        for component, name, type, value, comment, source in rows:
+            table = self.tables.setdefault(component, ParameterTable())
+            table[name] = Parameter(name, type, value, comment)
+            self.sources.setdefault(component, [])
+            if source not in self.sources[component]:
+                self.sources[component].append(source)
+
+# Default search path for configuration files
+def default_path():
+    """Return the default search path for configuration files
+
+    The path consists of the component library directories followed by
+    the directories listed in the TXTL_PARAMETER_PATH environment
+    variable (separated by os.pathsep).
+
+    """
+    user_path = os.environ.get('TXTL_PARAMETER_PATH', '')
+    return _library_path + [p for p in user_path.split(os.pathsep) if p]
+
+# Database used by load_config()
+_database = None
+
+def get_parameter_database():
+    "Return the parameter database for the current search path"
+    global _database
+    if _database is None:
+        _database = ParameterDatabase()
+    return _database
+
+def set_parameter_path(path=None):
+    """Set the search path used for configuration files
+
+    The directories in `path` are searched after the component library
+    directories, with parameters in later directories overriding those
+    in earlier ones.  If `path` is None, the default search path is
+    restored.
+
+    """
+    global _database
+    _database = ParameterDatabase(
+        _library_path + list(path) if path is not None else None)
+
+# Key used to index the parameters for a configuration file
+def component_key(filename):
+    "Return the database key for a configuration (or component) name"
+    name = os.path.basename(filename)
+    if name.lower().endswith('.csv'):
+        name = name[:-4]
+    return name.lower()
+
+# List the configuration files along a path, with their modification times
+def _find_files(path):
+    files = []
+    for directory in path:
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.lower().endswith('.csv') and entry.is_file():
+                stat = entry.stat()
+                files.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    return files
+
+# Read the parameters from a list of configuration files
+def _read_files(files):
+    rows = {}
+    for filename, mtime, size in files:
+        component = component_key(filename)
+        for param in read_csv(filename):
+            # Later files override parameters from earlier ones
+            rows[component, param.name] = (
+                component, param.name, param.type, param.value,
+                param.comment, filename)
+    return list(rows.values())
+
+# Read a configuration file
+def read_csv(filename):
+    "Read the parameters in a configuration file (list of Parameters)"
+    params = []
+    with open(filename, newline='') as csvfile:
+        for row in csv.reader(csvfile):
+            # Get rid of extraneous spaces
+            row = [entry.strip() for entry in row]
+
+            # Skip blank lines (and malformed lines)
+            if len(row) < 3 or row[0] == "": continue
+
+            #                      name    type    value   comment
+            param = Parameter(row[0], row[1], row[2],
+                              row[3] if len(row) >= 4 else "")
+
+            # Name simplification for backward compatibility with MATLAB code
+            param.name = re.sub("_Forward$", "_F", param.name)
+            param.name = re.sub("_Reverse$", "_R", param.name)
+            param.name = re.sub("_ic$", "_IC", param.name)
+            param.name = re.sub("_Concentration$", "_IC", param.name)
+            params.append(param)
+    return params
+
+#
+# SQLite storage
+#
+# The database contains two tables: `parameters`, with one row per
+# component parameter (in the order they appear in the configuration
+# files), and `sources`, listing the configuration files (and their
+# modification times and sizes) that were used to create the database.
+#
+_schema = """
+CREATE TABLE parameters (
+    component TEXT, name TEXT, type TEXT, value TEXT, comment TEXT,
+    source TEXT, position INTEGER, PRIMARY KEY (component, name));
+CREATE INDEX parameter_names ON parameters (name);
+CREATE TABLE sources (path TEXT, mtime INTEGER, size INTEGER);
+"""
+
+def _connect(filename):
+    return sqlite3.connect(filename)
+
+# Read the database, returning None if it is missing or out of date
+def _read_database(filename, files):
+    if not os.path.exists(filename):
+        return None
+    try:
+        with _connect(filename) as connection:
+            sources = connection.execute(
+                "SELECT path, mtime, size FROM sources ORDER BY rowid")
+            if [tuple(row) for row in sources] != files:
+                return None
+            return connection.execute(
+                "SELECT component, name, type, value, comment, source "
+                "FROM parameters ORDER BY position").fetchall()
+    except sqlite3.Error:
+        return None
+
+# Write the database (to a temporary file, so readers never see a
+# partially written database); returns False if it couldn't be written
+def _write_database(filename, files, rows):
+    tmpname = "%s.%d.tmp" % (filename, os.getpid())
+    try:
+        connection = _connect(tmpname)
+        with connection:
+            connection.executescript(_schema)
+            connection.executemany(
+                "INSERT INTO parameters VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row + (position,) for position, row in enumerate(rows)])
+            connection.executemany(
+                "INSERT INTO sources VALUES (?, ?, ?)", files)
+        connection.close()
+        os.replace(tmpname, filename)
+        return True
+    except (OSError, sqlite3.Error):
+        # The database is only a cache; keep going without it
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        return False
@@ -20,9 +20,11 @@ The following general guidelines hold for usage of parameters in the
 1. Parameter values for all pre-defined components (including extracts
    and buffers) should be contained in a config file, formatted as a
    CSV file with filename that matches the component name.  The
-   configuration file will be searched for in the current directory,
-   then in the directory of the component, and finally in the default
-   TX-TL component library [not yet implemented].
+   configuration files in the TX-TL component library, and in any user
+   overlay directories listed in the TXTL_PARAMETER_PATH environment
+   variable, are collected into a parameter database (see
+   txtl.paramdb), in which filenames are matched without regard to
+   case.
 
 2. Component parameter values are local to the reactions set up by the
    component, allowing reuse of the same name (eg, promoter binding
@@ -34,8 +36,8 @@ The following general guidelines hold for usage of parameters in the
 
 3. Default configuration files can be overridden at the time that a
    component is defined by using the `config_file` argument.  If a
-   pathname is not provided, the file will be searched for in the same
-   order as default configuration files.  Examples:
+   pathname is not provided, the file will be looked up in the
+   parameter database, like default configuration files.  Examples:
 
      promoter = Promoter('pconst')
      promoter = Promoter('pconst', 'pconst.csv')
@@ -62,27 +64,50 @@ The following general guidelines hold for usage of parameters in the
      * A string (representing a global parameter name)
 
 6. Parameter objects can be of type 'Numeric', 'Expression', or
-   'Global' [not implemented].  Numeric parameters are passed directly
-   to libsbml.  Expression parameters are evaluated using the current
-   dictionary, augmented by the following variables: 
+   'Global'.  Numeric parameters are passed directly to libsbml.
+   Expression parameters are evaluated using the current dictionary,
+   augmented by the following variables: 
 
      * RNA_LENGTH - number of basepairs in the RNA sequence 
      * AA_LENGTH = number of amino acides in the protein sequence
 
+   Global parameters refer to a model-level parameter by name (the
+   value of the parameter).  Reactions that use a global parameter
+   reference the model-level parameter in their kinetic law instead
+   of storing a local copy of the value, so that a single value
+   controls all of them (eg, in a parameter sweep).  The value of the
+   model-level parameter is taken from the parameters of the mixture
+   (ie, the extract; see `global_value()`).  Examples:
+
+     myptet = Promoter('ptet', RNAPbound_F='RNAP_binding')
+     extract = create_extract('BL21_DE3')
+     extract.parameters['RNAP_binding'] = 20
+     extract.parameters['Transcription_Rate'] = 'TX_Rate'
+     extract.parameters['TX_Rate'] = 0.001
+
 7. Parameters for all possible mechanisms that are defined for a
    component should be defined using the config file or parameter
    argument when the component is created.
 
+8. The parameters of a component are stored in a ParameterTable,
+   which behaves like a dictionary of Parameter objects but stores
+   the numeric values in a single array.  The values of many
+   parameters can be changed at once using `set_values()`, eg
+
+     table.set_values(['RNAPbound_F', 'RNAPbound_R'], [10, 200])
+
 """
 
-import csv
 import os
-import sys
-import re
+import numbers
+from collections.abc import MutableMapping
 from warnings import warn
+import numpy as np
 
 class Parameter:
     "Parameter value (reaction rates)"
+    __slots__ = ('name', 'type', 'value', 'comment')
+
     def __init__(self, name, type, value, comment="", debug=False):
         self.name = name.strip()
         self.type = type.strip()
@@ -94,65 +119,205 @@ class Parameter:
             self.value = float(value)           # store as float
         elif type.strip() == 'Expression':
             self.value = value;                 # store as string
+        elif type.strip() == 'Global':
+            self.value = value.strip()          # name of global parameter
         else:
             raise TypeError("can't parse value of parameter %s" % name)
         
     def get_value(self):
         return float(self.value)
 
-def load_config(filename, extension=".csv", debug=False):
-    # Find the configuration file
-    #! TODO: update this to search along a path (in pathutil)
-    module_path = os.path.dirname(sys.modules[__name__].__file__)    
-
-    # Look for the config file in a list of paths
-    csvfile = None
-    for path in (module_path + "/components/", module_path + "/config/"):
-        try:
-            #! TODO: add extension if not present
-            filepath = path + filename
-            csvfile = open(filepath)
-            break
-        except:
-            continue
-
-    # If we didn't find the file, return None
-    if csvfile == None: return None
-
-    # Open up the CSV file for reaching
-    csvreader = csv.reader(csvfile)
-    params = {}
-    for row in csvreader:
-        # Get rid of extraneous spaces
-        for i in range(len(row)): row[i] = row[i].strip()
-        
-        # Skip blank lines (and malformed lines)
-        if len(row) < 3 or row[0] == "": continue
-        
-        # Create a new parameter object to keep track of this row
-        #! TODO: this should be done in a better (and more pythonic) way
-        if len(row) >= 4:
-            #                 name    type    value   comment
-            param = Parameter(row[0], row[1], row[2], row[3])
+class ParameterTable(MutableMapping):
+    """Table of parameter values
+
+    A ParameterTable maps parameter names to parameters, like a
+    dictionary of Parameter objects, but stores the values of numeric
+    parameters in a single float64 array (with an index mapping names
+    to positions in the array).  Indexing the table returns a new
+    Parameter object describing the entry; changes to that object do
+    not affect the table (assign it back to the table instead).
+
+    The values of a set of parameters (or of all parameters) can be
+    read and replaced in a single operation using `get_values()` and
+    `set_values()`, which avoids creating Parameter objects.  Expression
+    and global parameters are stored as strings (the expression or the
+    name of the global parameter) and have the value NaN in the array;
+    setting the value of such a parameter turns it into a numeric
+    parameter.
+
+    """
+    __slots__ = ('_index', '_keys', '_names', '_types', '_comments',
+                 '_values', '_expressions')
+
+    def __init__(self, parameters={}):
+        self._index = {}                # position of each key
+        self._keys = []                 # table keys (parameter names)
+        self._names = []                # names stored in the parameters
+        self._types = []                # parameter types
+        self._comments = []             # parameter comments
+        self._values = np.empty(max(len(parameters), 8))
+        self._expressions = {}          # position -> expression string
+        self.update(parameters)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __getitem__(self, key):
+        i = self._index[key]
+        value = self._expressions[i] if i in self._expressions \
+            else self._values[i]
+        return Parameter(self._names[i], self._types[i], value,
+                         self._comments[i])
+
+    def __setitem__(self, key, value):
+        param = _to_parameter(key, value)
+        i = self._index.get(key)
+        if i is None:
+            # Add a new entry (growing the value array if needed)
+            i = len(self._keys)
+            if i == len(self._values):
+                self._values = np.resize(self._values, 2 * i)
+            self._index[key] = i
+            self._keys.append(key)
+            self._names.append(param.name)
+            self._types.append(param.type)
+            self._comments.append(param.comment)
+        else:
+            self._names[i] = param.name
+            self._types[i] = param.type
+            self._comments[i] = param.comment
+
+        if param.type in ('Expression', 'Global'):
+            self._values[i] = np.nan
+            self._expressions[i] = param.value
+        else:
+            self._values[i] = param.value
+            self._expressions.pop(i, None)
+
+    def __delitem__(self, key):
+        i = self._index.pop(key)
+        for attr in ('_keys', '_names', '_types', '_comments'):
+            del getattr(self, attr)[i]
+        self._values[i:-1] = self._values[i+1:]
+        self._expressions = {
+            (j if j < i else j - 1): expr
+            for j, expr in self._expressions.items() if j != i}
+        for key in self._keys[i:]:
+            self._index[key] -= 1
+
+    def update(self, other=(), **keywords):
+        "Update the table from a dictionary or another table"
+        if isinstance(other, ParameterTable):
+            for i, key in enumerate(other._keys):
+                self[key] = other._entry(i)
         else:
-            param = Parameter(row[0], row[1], row[2], "")
+            MutableMapping.update(self, other)
+        for key, value in keywords.items():
+            self[key] = value
+
+    def _entry(self, i):
+        # Parameter for position i (used for copying between tables)
+        return Parameter(
+            self._names[i], self._types[i],
+            self._expressions[i] if i in self._expressions else
+            self._values[i], self._comments[i])
+
+    def copy(self):
+        "Return a copy of the table"
+        table = ParameterTable.__new__(ParameterTable)
+        table._index = self._index.copy()
+        table._keys = self._keys.copy()
+        table._names = self._names.copy()
+        table._types = self._types.copy()
+        table._comments = self._comments.copy()
+        table._values = self._values.copy()
+        table._expressions = self._expressions.copy()
+        return table
+
+    def structure(self):
+        """Return the layout of the table (everything except numeric values)
+
+        Returns a tuple (keys, names, types, expressions) of tuples.  Two
+        tables with the same structure differ only in the values of
+        their numeric parameters.
+
+        """
+        n = len(self._keys)
+        return (tuple(self._keys), tuple(self._names), tuple(self._types),
+                tuple(self._expressions.get(i) for i in range(n)))
+
+    def indices(self, names=None):
+        "Return the positions of parameters in the value array"
+        if names is None:
+            return np.arange(len(self._keys))
+        if isinstance(names, str):
+            return self._index[names]
+        return np.array([self._index[name] for name in names], dtype=int)
+
+    def get_values(self, names=None):
+        """Return the values of a list of parameters (default = all)
+
+        Expression and global parameters have the value NaN.
+
+        """
+        return self._values[:len(self._keys)][self.indices(names)]
+
+    def set_values(self, names, values):
+        """Set the values of a list of parameters
+
+        If `names` is None, `values` must contain a value for every
+        parameter in the table (in the order of iteration).  All of the
+        names are checked before any values are changed.
+
+        """
+        indices = self.indices(names)
+        values = np.broadcast_to(np.asarray(values, dtype=float),
+                                 np.shape(indices))
+        self._values[indices] = values
+        for i in np.atleast_1d(indices):
+            if i in self._expressions:
+                del self._expressions[i]
+                self._types[i] = 'Numeric'
+
+    def __repr__(self):
+        return "ParameterTable(%s)" % ", ".join(
+            "%s=%s" % (key, self._expressions.get(i, self._values[i]))
+            for i, key in enumerate(self._keys))
 
-        # Name simplification for backward compatibility with MATLAB code
-        param.name = re.sub("_Forward$", "_F", param.name)
-        param.name = re.sub("_Reverse$", "_R", param.name)
-        param.name = re.sub("_ic$", "_IC", param.name)
-        param.name = re.sub("_Concentration$", "_IC", param.name)
+def load_config(filename, extension=".csv", debug=False):
+    """Load the parameters from a configuration file
 
-        # Set up as dictionary for easy access
-        params[param.name] = param
+    Configuration files in the component library (and in any user
+    overlay directories) are looked up in the parameter database (see
+    txtl.paramdb), ignoring case.  If `filename` includes a directory,
+    the file is read directly.  Returns a ParameterTable, or None if the
+    file can't be found.
 
-    csvfile.close()             # Close the file now that we are done
-    return params               # Return the parameters we read
+    """
+    from .paramdb import get_parameter_database, read_csv
+    if os.path.dirname(filename) != "":
+        if not os.path.isfile(filename):
+            return None
+        params = ParameterTable()
+        for param in read_csv(filename):
+            params[param.name] = param
+        return params
+
+    params = get_parameter_database().get(filename)
+    if debug and params is None:
+        print("load_config: %s not found in parameter database" % filename)
+    return params
 
 # Process parameter input
 def get_parameters(config_file, custom, default={}, **keywords):
     # Start with the default parameters values (if given)
-    parameters = default.copy() if default != None else {}
+    parameters = ParameterTable(default if default != None else {})
 
     # Now load parameters from the configuration file (if available)
     if config_file != None:
@@ -189,7 +354,7 @@ def update_missing(existing_dict, default_dict):
 
     """
     for key, value in default_dict.items():
-        if key not in existing_dict.keys():
+        if key not in existing_dict:
             existing_dict[key] = _to_parameter(key, value)
 
 # Update any existing parameter values in a parameter dictionary
@@ -204,12 +369,24 @@ def update_existing(existing_dict, custom_dict):
 
     """
     for key, value in custom_dict.items():
-        if key in existing_dict.keys():
+        if key in existing_dict:
             existing_dict[key] = _to_parameter(key, value)
 
-def eval_parameter(component, name, assignments={}):
+def eval_parameter(component, name, assignments={}, mixture=None,
+                   resolving=()):
+    """Evaluate a parameter of a component (or mixture)
+
+    Expression parameters are evaluated with the variables given in
+    `assignments`.  Global parameters are looked up in `mixture` (see
+    `global_value()`); if `mixture` is not given, the component must be
+    the mixture.  Returns None if the component doesn't have the
+    parameter.  The `resolving` argument lists the global parameters
+    whose references are being followed (used to detect circular
+    references).
+
+    """
     parameters = component.parameters
-    if name not in parameters.keys() or parameters[name] == None:
+    if name not in parameters or parameters[name] == None:
         # Couldn't find the parmaeter
         return None
     param = parameters[name]
@@ -218,16 +395,74 @@ def eval_parameter(component, name, assignments={}):
     #! TODO: decide if we need this; can just use the evaluation below?
     if isinstance(param.value, (float, int)): return float(param.value)
 
+    # Look up the value of a global parameter
+    if param.type == 'Global':
+        if mixture is None:
+            return global_value(component, param.value, assignments,
+                                resolving + (name,))
+        return global_value(mixture, param.value, assignments, resolving)
+
     # Evaluate the expression 
     return float(eval(param.value, assignments))
 
+# Get the value of a global (model-level) parameter
+def global_value(mixture, name, assignments={}, resolving=()):
+    """Return the value of a global parameter
+
+    The value is taken from the parameters of the mixture (ie, the
+    extract, which may in turn refer to other global parameters) or, if
+    the mixture doesn't define it, from a parameter that has already
+    been created in the SBML model of the mixture.  A ValueError is
+    raised if the parameter is not defined, or if it is part of a
+    cycle of references (`resolving` lists the global parameters whose
+    references are being followed).
+
+    """
+    if name in resolving:
+        raise ValueError("circular global parameter reference: %s" %
+                         " -> ".join(resolving + (name,)))
+    parameters = getattr(mixture, 'parameters', None)
+    if parameters and name in parameters and parameters[name] is not None:
+        param = parameters[name]
+        if param.type != 'Global' or param.value != name:
+            return eval_parameter(mixture, name, assignments,
+                                  resolving=resolving)
+
+    model = getattr(mixture, '_model', None)
+    parameter = model.getParameter(name) if model is not None else None
+    if parameter is not None:
+        return parameter.getValue()
+    raise ValueError("global parameter %s is not defined" % name)
+
+# Get the parameter to use for a rate constant in a reaction
+def rate_parameter(mixture, component, name, local_name, assignments={}):
+    """Return the Parameter used for a rate constant in a kinetic law
+
+    If the parameter `name` of `component` (which may be the mixture)
+    refers to a global parameter, a Global parameter referring to it
+    is returned, so that the reaction uses the model-level parameter.
+    Otherwise the parameter is evaluated (using `assignments`) and
+    returned as a Numeric parameter called `local_name`, which is
+    stored in the kinetic law.  Returns None if the component doesn't
+    have the parameter.
+
+    """
+    parameters = component.parameters
+    if name not in parameters or parameters[name] is None:
+        return None
+    param = parameters[name]
+    if param.type == 'Global':
+        return param
+    return Parameter(local_name, 'Numeric', eval_parameter(
+        component, name, assignments, mixture))
+
 # Convert a value input to a parameter object
 def _to_parameter(key, value):
     if isinstance(value, Parameter):
         return value
-    elif isinstance(value, (float, int)):
+    elif isinstance(value, numbers.Real):
         return Parameter(key, 'Numeric', value)
     elif isinstance(value, str):
         return Parameter(key, 'Global', value)
     else:
-        TypeError('Unknown parameter type')
+        raise TypeError('Unknown parameter type')
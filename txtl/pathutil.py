@@ -7,6 +7,7 @@
 # Copyright (c) 2018, Build-A-Cell. All rights reserved.
 # See LICENSE file in the project root directory for details.
 
+import os
 from importlib import import_module
 
 # Load a model from a file
@@ -23,3 +24,17 @@ def load_model(prefix, name, length):
         print(error)
         print("couldn't find component %s_%s" % (prefix, name))
     return model
+
+# Directory used to cache generated code, compiled networks and other data
+def get_cache_dir(cache_dir=None):
+    """Return the txtl cache directory (creating it if needed)
+
+    The directory is `cache_dir` if given, and otherwise the value of
+    the TXTL_CACHE_DIR environment variable or ~/.cache/txtl.
+
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get('TXTL_CACHE_DIR', os.path.join(
+            os.path.expanduser('~'), '.cache', 'txtl'))
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
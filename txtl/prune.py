@@ -0,0 +1,151 @@
+# prune.py - flux based reduction of reaction networks
+# AP, 19 Oct 2026
+#
+# This file contains functions for removing reactions that carry a
+# negligible flux over the time window of an experiment (eg, reverse
+# binding steps with very small rates, or sequestration of repressors
+# that are barely expressed), along with the species that are only
+# involved in those reactions.  The reduction is based on a reference
+# simulation of the full network: the flux of each reaction is
+# integrated over time and compared with the peak concentration of each
+# species that the reaction produces or consumes, which bounds (to
+# first order) the change in the concentration of the species if the
+# reaction is removed.  Comparing with the peak concentrations rather
+# than with the total turnover of the species keeps reactions that are
+# small compared with fast binding and unbinding cycles but are the
+# only source of a species (eg, transcription).  The reduced network
+# is then simulated with the same settings, to report the error that
+# the reduction introduces.  Reduced networks are meant to be used for
+# sweeps and fits around the reference conditions.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import numpy as np
+
+from .simulate import get_network, runsim
+
+class PruningResult:
+    """Result of pruning a reaction network
+
+    Data attributes
+    ---------------
+    network             Reduced reaction network (ReactionNetwork)
+    original            Network that was pruned (ReactionNetwork)
+    removed_reactions   Ids of the reactions that were removed (list)
+    removed_species     Ids of the species that were removed (list)
+    flux                Integrated flux of each reaction of the original
+                        network in the reference simulation (ndarray)
+    importance          Integrated flux of each reaction relative to the
+                        peak concentrations of the species it involves
+                        (ndarray, see flux_importance())
+    error               Maximum error in the trajectory of each species
+                        of the reduced network, relative to the peak
+                        concentration of the species in the reference
+                        simulation (or to the absolute tolerance, if
+                        larger) (dict)
+    max_error           Largest relative error (float)
+
+    """
+    def __init__(self, network, original, removed_reactions,
+                 removed_species, flux, importance, error):
+        self.network = network
+        self.original = original
+        self.removed_reactions = removed_reactions
+        self.removed_species = removed_species
+        self.flux = flux
+        self.importance = importance
+        self.error = error
+
+    @property
+    def max_error(self):
+        return max(self.error.values(), default=0.0)
+
+    def __str__(self):
+        return "%s: %d -> %d species, %d -> %d reactions, " \
+            "max relative error %.3g" % (
+                self.original.name, self.original.nspecies,
+                self.network.nspecies, self.original.nreactions,
+                self.network.nreactions, self.max_error)
+
+# Integrated reaction fluxes
+def integrated_flux(network, result):
+    """Integrate the flux of each reaction over a simulation
+
+    The `result` must contain all species of the network (see
+    runsim()).  Returns an array with the time integral of the rate of
+    each reaction.
+
+    """
+    rates = network.rates(result.values)
+    return np.trapezoid(np.abs(rates), result.timepoints, axis=0)
+
+# Importance of each reaction relative to the species concentrations
+def flux_importance(network, flux, scale):
+    """Compute the importance of each reaction from its integrated flux
+
+    The importance of a reaction is the largest change in the
+    concentration of any species due to the integrated `flux` of the
+    reaction, relative to the characteristic concentration of the
+    species (`scale`, array, n_species).  Species with zero scale are
+    ignored.
+
+    """
+    with np.errstate(divide='ignore'):
+        inverse = np.where(scale > 0, 1 / scale, 0)
+    change = abs(network.stoichiometry).multiply(inverse[:, None]).tocsc()
+    return np.asarray(change.max(axis=0).todense()).ravel() * flux
+
+# Remove reactions with negligible flux
+def prune_network(mixture, duration, tol=1e-3, atol=0, keep=(), npts=200,
+                  initial={}, **options):
+    """Remove reactions with negligible flux from a reaction network
+
+    The mixture (or compiled network) is simulated from its initial
+    state (modified by `initial`, as in runsim()) for `duration`
+    seconds, and reactions whose integrated flux is less than a
+    fraction `tol` of the peak concentration of every species they
+    involve are removed.  Peak concentrations below `atol` are
+    replaced by `atol`, so that the reactions of species that are
+    barely present (eg, repressors that are hardly expressed) can be
+    removed.  Species that are no longer involved in any reaction and
+    have zero initial concentration are removed as well, unless they
+    are listed in `keep`.  The reduced network is simulated with the
+    same settings to estimate the error introduced by the reduction.
+    Additional keywords are passed to runsim().
+
+    Returns a PruningResult.
+
+    """
+    network = get_network(mixture)
+    reference = runsim(network, duration, npts=npts, initial=initial,
+                       **options)
+    flux = integrated_flux(network, reference)
+    peak = np.maximum(np.max(np.abs(reference.values), axis=0), atol)
+    importance = flux_importance(network, flux, peak)
+    reactions = importance >= tol
+
+    # Keep the species used by the remaining reactions
+    stoich = network.stoichiometry.tocsc()[:, reactions]
+    used = np.zeros(network.nspecies + 1, dtype=bool)
+    used[network.reactants[reactions].ravel()] = True
+    species = used[:-1] | (abs(stoich).sum(axis=1).A1 > 0) | \
+        (network.x0 != 0)
+    species[network.get_species_index(list(keep))] = True
+
+    reduced = network.subnetwork(reactions, species)
+    result = runsim(reduced, duration, npts=npts, initial={
+        name: value for name, value in initial.items()
+        if name in reduced.species_index}, **options)
+
+    # Error relative to the peak concentration of each species (or atol)
+    expected, peak = reference.values[:, species], peak[species]
+    difference = np.max(np.abs(result.values - expected), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        error = np.where(peak > 0, difference / peak, difference)
+
+    return PruningResult(
+        reduced, network,
+        [network.reactions[j] for j in np.flatnonzero(~reactions)],
+        [network.species[i] for i in np.flatnonzero(~species)],
+        flux, importance, dict(zip(reduced.species, error.tolist())))
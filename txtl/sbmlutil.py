@@ -5,8 +5,9 @@
 # See LICENSE file in the project root directory for details.
 
 import libsbml
+import numbers
 import re
-from .parameter import Parameter
+from .parameter import Parameter, global_value
 from warnings import warn
 
 # Reaction ID number (global)
@@ -55,7 +56,8 @@ def add_species(mixture, type, name, ic=None, debug=False):
     species_id = _id_from_name(species_name)
     
     # Check to see if this species is already present
-    species = find_species(model, species_id)
+    table = _species_table(mixture)
+    species = table.get(species_id)
     if species is None:
         if debug: print("Adding species %s" % species_name)
         species = model.createSpecies()
@@ -65,6 +67,7 @@ def add_species(mixture, type, name, ic=None, debug=False):
         species.setConstant(False)
         species.setBoundaryCondition(False)
         species.setHasOnlySubstanceUnits(False)
+        table[species_id] = species
 
     else:
         if debug: print("add_species: %s already exists", species.getId())
@@ -74,19 +77,77 @@ def add_species(mixture, type, name, ic=None, debug=False):
     #! TODO: add initial concentrations if species is already present
     if ic != None:
         if debug: print("    %s IC = %s" % (species_name, ic))
+        log = mixture.__dict__.get('_species_log')
+        if log is not None and species_id not in log:
+            # Record the previous value (used by txtl.template)
+            log[species_id] = species.getInitialConcentration() \
+                if species.isSetInitialConcentration() else None
         species.setInitialConcentration(float(ic))
 
     return species
 
 # Look for a species in the current mixture
 def find_species(mixture, species_name):
-    model = mixture.model   # Get the model where we will store results
-    
     # Construct the species ID (no-op if already a species ID)
     species_id = _id_from_name(species_name)
 
     #! TODO: Add error checking
-    return model.getSpecies(species_id)
+    return _species_table(mixture).get(species_id)
+
+# Table of species in the model of a mixture (indexed by id)
+#
+# Looking up a species by id in libsbml requires a linear search
+# through the species in the model, which makes building large models
+# quadratic in the number of species.  The table is stored in the
+# mixture and is rebuilt if the model is replaced or if species were
+# added to (or removed from) the model without using add_species().
+#
+def _species_table(mixture):
+    model = mixture.model
+    table = mixture.__dict__.get('_species_table')
+    if table is None or table[0] is not model or \
+       len(table[1]) != model.getNumSpecies():
+        table = (model, {s.getId(): s for s in model.getListOfSpecies()})
+        mixture._species_table = table
+    return table[1]
+
+# Index of a species in the model of a mixture
+def species_index(mixture, species):
+    """Return the position of a species in the model of a mixture
+
+    The species can be given as an SBML species, a species id or a
+    species name.  The position is also the index of the species in
+    the ReactionNetwork compiled from the model, and can be used in
+    place of the species in add_reaction().  DNA assemblies refer to
+    their species by index, so that they don't keep references to
+    objects in the SBML document of the mixture.
+
+    """
+    if not isinstance(species, str):
+        species = species.getId()
+    return _species_positions(mixture)[_id_from_name(species)]
+
+# Create a species and return its index in the model
+def _add_species_index(mixture, type, name, ic=None):
+    return species_index(mixture, add_species(mixture, type, name, ic))
+
+# Table of species positions in the model of a mixture (indexed by id)
+#
+# Species are usually only appended to the model, so the table is
+# extended when new species are found at the end of the model and
+# rebuilt if species were removed.
+#
+def _species_positions(mixture):
+    model = mixture.model
+    table = mixture.__dict__.get('_species_positions')
+    nspecies = model.getNumSpecies()
+    if table is None or table[0] is not model or len(table[1]) > nspecies:
+        table = (model, {})
+        mixture._species_positions = table
+    positions = table[1]
+    for i in range(len(positions), nspecies):
+        positions[model.getSpecies(i).getId()] = i
+    return positions
 
 # Helper function to add a parameter to the model
 def add_parameter(mixture, name, value=0, debug=False):
@@ -108,15 +169,28 @@ def add_parameter(mixture, name, value=0, debug=False):
 
     return parameter
 
+# Create the model-level parameter for a global parameter reference
+def add_global_parameter(mixture, name):
+    """Create a model-level parameter referenced by a kinetic law
+
+    If the model doesn't have a parameter called `name`, it is created
+    with the value given by the parameters of the mixture (see
+    txtl.parameter.global_value()).  Returns the SBML parameter.
+
+    """
+    parameter = find_parameter(mixture, name)
+    if parameter is None:
+        parameter = add_parameter(mixture, name, global_value(mixture, name))
+    return parameter
+
 # Look for a parameter in the current model
 def find_parameter(mixture, id):
     model = mixture.model               # Get model where parameters are stored
     return model.getParameter(id)       #! TODO: add error checking
 
 # Helper function to add a reaction to a model
-#! Add stochiometry argument to allow non-unitary stochiometries
 def add_reaction(mixture, reactants, products, kf, kr=None, id=None,
-                 parameters={}, prefix="r", debug=False):
+                 parameters={}, prefix="r", repressor=None, debug=False):
     """Add a reaction to a model
 
     The `add_reaction` function is used to add a reaction to a model.
@@ -127,15 +201,23 @@ def add_reaction(mixture, reactants, products, kf, kr=None, id=None,
     Parameters
     ----------
     model       SBML model
-    reactants   List of SBML species that are reactants in the reaction
+    reactants   List of SBML species (or species indices, see
+                species_index()) that are reactants in the reaction;
+                entries can also be (species, coefficient) pairs
     projects    List of SBML species that are products of the reaction
+                (entries as for reactants)
     kf          Forward rate constant (parameter, string, number, or list)
     kf          Reverse rate constant (None if non-reversible)
     id          Optional parameter to specify reaction id (otherwise numbered)
+    repressor   Optional (species, K, n) tuple: the forward rate is
+                multiplied by the Hill function 1 / (1 + (species/K)^n),
+                with K and n given as for kf
 
-    Note: the current implementation requires that non-unitary
-    stochiometries be represented by repeated entries in the reactants
-    and/or products list.
+    Non-unit stoichiometries can be given either as (species,
+    coefficient) pairs (eg, [(protein, 2)]) or by repeating a species
+    in the list; in both cases a single species reference with the
+    combined stoichiometric coefficient is created, and the species
+    appears in the kinetic law raised to that power.
 
     """
     model = mixture.model  # Get the model where we will store results
@@ -171,50 +253,50 @@ def add_reaction(mixture, reactants, products, kf, kr=None, id=None,
     # number or a Parameter, then we create a local parameter within
     # this reaction.
     #
-    if isinstance(kf, (float, int)):
-        kfname = "k"
-    elif isinstance(kf, Parameter):
-        kfname = kf.name
-    elif isinstance(kf, str):
-        kfname = kf
-    else:
-        raise TypeError("add reaction: unknown parameter type", kf)
+    kfname = _rate_name(kf, "k")
+    if isinstance(kf, Parameter) and kf.type == 'Global':
+        add_global_parameter(mixture, kf.value)
 
     # Create the reactants
     ratestring = kfname
-    for species in reactants:
+    for species, coeff in _combine_species(model, reactants):
         reactant = reaction.createReactant()
         reactant.setSpecies(species.getId())    #! TODO: add error checking
         reactant.setConstant(True)
+        reactant.setStoichiometry(coeff)
         ratestring += " * " + species.getId()
+        if coeff != 1: ratestring += "^%g" % coeff
+
+    # Add repression of the reaction by a modifier species
+    if repressor is not None:
+        species, K, n = repressor
+        if isinstance(species, numbers.Integral):
+            species = model.getSpecies(int(species))
+        modifier = reaction.createModifier()
+        modifier.setSpecies(species.getId())
+        hill = [(value, _rate_name(value, default)) for value, default in
+                ((K, "Repression_K"), (n, "Repression_n"))]
+        for value, name in hill:
+            if isinstance(value, Parameter) and value.type == 'Global':
+                add_global_parameter(mixture, name)
+        ratestring = "%s / (1 + pow(%s / %s, %s))" % (
+            ratestring, species.getId(), hill[0][1], hill[1][1])
 
     # Create the products
-    for species in products:
+    for species, coeff in _combine_species(model, products):
         product = reaction.createProduct()
         product.setSpecies(species.getId())     #! TODO: add error checking
         product.setConstant(True)
+        product.setStoichiometry(coeff)
 
     # Create a kinetic law for the reaction
     if debug: print("    Creating kinetic law (%s): %s" %
                     (reaction.getId(), ratestring))
     ratelaw = reaction.createKineticLaw();
-    if isinstance(kf, Parameter):
-        param = ratelaw.createParameter();
-        param.setId(kf.name)
-        
-        # Set the parameter value
-        if kf.type == 'Numeric':
-            param.setValue(kf.value)
-        elif kf.type == 'Expression':
-            #! TODO: handle more general expressions
-            param.setValue(float(eval(kf.value)))
-        else:
-            warn("add_reaction: parameter type %s not supported" % kf.type)
-            
-    elif isinstance(kf, (float, int)):
-        param = ratelaw.createParameter();
-        param.setId(kfname)
-        param.setValue(float(kf))
+    _add_local_parameter(ratelaw, kf, kfname)
+    if repressor is not None:
+        for value, name in hill:
+            _add_local_parameter(ratelaw, value, name)
     ratelaw.setFormula(ratestring);
 
     # If the reverse rate is given, switch things around create reverse reaction
@@ -225,6 +307,52 @@ def add_reaction(mixture, reactants, products, kf, kr=None, id=None,
 
     return reaction
 
+# Name used in a kinetic law for a rate (parameter, string or number)
+def _rate_name(value, default):
+    if isinstance(value, (float, int)):
+        return default
+    elif isinstance(value, Parameter):
+        return value.value if value.type == 'Global' else value.name
+    elif isinstance(value, str):
+        return value
+    raise TypeError("add reaction: unknown parameter type", value)
+
+# Create a local parameter in a kinetic law (unless it refers to a global)
+def _add_local_parameter(ratelaw, value, name):
+    if isinstance(value, Parameter) and value.type == 'Global':
+        return                  # model-level parameter (see add_reaction)
+    elif isinstance(value, Parameter):
+        param = ratelaw.createParameter();
+        param.setId(name)
+
+        # Set the parameter value
+        if value.type == 'Numeric':
+            param.setValue(value.value)
+        elif value.type == 'Expression':
+            #! TODO: handle more general expressions
+            param.setValue(float(eval(value.value)))
+        else:
+            warn("add_reaction: parameter type %s not supported" % value.type)
+
+    elif isinstance(value, (float, int)):
+        param = ratelaw.createParameter();
+        param.setId(name)
+        param.setValue(float(value))
+
+# Combine a list of species into (species, coefficient) pairs
+def _combine_species(model, species_list):
+    combined = {}
+    for entry in species_list:
+        species, coeff = entry if isinstance(entry, tuple) else (entry, 1)
+        if isinstance(species, numbers.Integral):
+            species = model.getSpecies(int(species))
+        if coeff <= 0:
+            raise ValueError("add_reaction: stoichiometry of %s must be "
+                             "positive" % species.getId())
+        total = combined.setdefault(species.getId(), [species, 0])
+        total[1] += coeff
+    return [(species, float(coeff)) for species, coeff in combined.values()]
+
 # Utility function to convert name to id
 def _id_from_name(name):
     "Convert name to a id (remove spaces and other characters)"
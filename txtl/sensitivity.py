@@ -0,0 +1,336 @@
+# sensitivity.py - global sensitivity analysis
+# AP, 19 Oct 2026
+#
+# This file contains functions for global sensitivity analysis of a
+# mixture with respect to ranges of parameter values (Morris elementary
+# effects screening and Sobol variance-based indices, using Saltelli
+# sample designs).  The mixture is compiled once into a ReactionNetwork
+# and the samples are simulated in batches (see runsim_batch()), with
+# the batches distributed over a pool of worker processes, so that
+# designs with 10^4-10^5 evaluations do not require the SBML model to
+# be rebuilt.
+#
+# The factors of the analysis are named by the parameters of the
+# network (the names used in the kinetic laws, eg 'RNAPbound_F' or
+# 'TL_Rate'), or by species ids (eg 'RNAP'), in which case the factor
+# is the initial concentration of the species.  Extract parameters
+# that set initial concentrations can also be given by name (eg
+# 'RNAP_IC' for the initial concentration of 'RNAP'); note that the
+# range is then given as a concentration in the mixture (after
+# dilution of the extract).
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import numpy as np
+from scipy.stats import qmc
+
+from .simulate import get_network, runsim_batch
+from .parallel import parallel_map
+
+class SensitivityResult:
+    """Result of a global sensitivity analysis
+
+    Data attributes
+    ---------------
+    method      Name of the method ('morris' or 'sobol')
+    names       Names of the factors (list of str)
+    outputs     Names of the outputs (list of str)
+    samples     Factor values that were simulated (ndarray, N x factors)
+    values      Output values for each sample (ndarray, N x outputs)
+    indices     Sensitivity indices (dict mapping index names to arrays
+                of shape factors x outputs); 'mu', 'mu_star' and 'sigma'
+                for the Morris method, 'S1' and 'ST' (and 'S1_conf' and
+                'ST_conf' if bootstrap intervals were computed) for the
+                Sobol method
+
+    The indices can also be accessed by indexing the result (eg,
+    `result['ST']`).
+
+    """
+    def __init__(self, method, names, outputs, samples, values, indices):
+        self.method = method
+        self.names = list(names)
+        self.outputs = list(outputs)
+        self.samples = samples
+        self.values = values
+        self.indices = indices
+
+    def __getitem__(self, name):
+        return self.indices[name]
+
+    def __str__(self):
+        lines = []
+        for m, output in enumerate(self.outputs):
+            lines.append("%s sensitivity of %s" % (self.method, output))
+            lines.append("  %-24s" % "factor" + "".join(
+                "%12s" % key for key in self.indices))
+            for i, name in enumerate(self.names):
+                lines.append("  %-24s" % name + "".join(
+                    "%12.4g" % value[i, m] for value in self.indices.values()))
+        return "\n".join(lines)
+
+#
+# Sample designs
+#
+# Designs are generated in the unit hypercube and then scaled to the
+# parameter ranges (linearly or, for factors that vary over orders of
+# magnitude, logarithmically).
+#
+
+# Morris trajectories
+def morris_design(nfactors, ntrajectories, levels=4, seed=None):
+    """Generate a Morris elementary effects design in the unit hypercube
+
+    Each of the `ntrajectories` trajectories starts at a random point
+    of a grid with `levels` levels and changes one factor at a time
+    (in random order and direction) by levels / (2 (levels - 1)).
+    Returns an array of shape (ntrajectories * (nfactors + 1), nfactors).
+
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+    grid = grid[grid <= 1 - delta + 1e-12]
+
+    design = np.empty((ntrajectories, nfactors + 1, nfactors))
+    for r in range(ntrajectories):
+        base = rng.choice(grid, nfactors)
+        direction = rng.choice([-1, 1], nfactors)
+        x = base + np.where(direction < 0, delta, 0)
+        design[r, 0] = x
+        for step, i in enumerate(rng.permutation(nfactors), 1):
+            x = x.copy()
+            x[i] += direction[i] * delta
+            design[r, step] = x
+    return design.reshape(-1, nfactors)
+
+# Saltelli design for Sobol indices
+def saltelli_design(nfactors, nsamples, seed=None):
+    """Generate a Saltelli design in the unit hypercube
+
+    The design consists of two independent (scrambled Sobol sequence)
+    sample matrices A and B, followed by the matrices AB_i in which
+    column i of A is replaced by column i of B.  Returns an array of
+    shape (nsamples * (nfactors + 2), nfactors).  The number of
+    samples should be a power of 2.
+
+    """
+    base = qmc.Sobol(2 * nfactors, scramble=True, seed=seed).random(nsamples)
+    A, B = base[:, :nfactors], base[:, nfactors:]
+    blocks = [A, B]
+    for i in range(nfactors):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        blocks.append(AB)
+    return np.concatenate(blocks)
+
+# Scale a design from the unit hypercube to the parameter ranges
+def scale_design(design, bounds, log_scale=False):
+    "Scale a unit hypercube design to a list of (low, high) bounds"
+    low, high = np.array(bounds, dtype=float).T
+    logs = np.broadcast_to(np.asarray(log_scale, dtype=bool), low.shape)
+    if np.any(logs & (low <= 0)):
+        raise ValueError("scale_design: log scaled factors must have "
+                         "positive bounds")
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(logs, low * (high / low) ** design,
+                        low + design * (high - low))
+
+#
+# Sensitivity indices
+#
+
+# Morris indices from a design and its outputs
+def morris_indices(design, values, nfactors):
+    """Compute Morris indices from a design and the corresponding outputs
+
+    The `design` must be in the unit hypercube (as returned by
+    morris_design()) and `values` is an array of shape (N, outputs).
+    Returns a dict with the mean ('mu'), mean absolute value
+    ('mu_star') and standard deviation ('sigma') of the elementary
+    effects (arrays of shape factors x outputs).
+
+    """
+    values = np.asarray(values, dtype=float).reshape(len(design), -1)
+    X = design.reshape(-1, nfactors + 1, nfactors)
+    Y = values.reshape(len(X), nfactors + 1, -1)
+    dX = np.diff(X, axis=1)
+    factor = np.argmax(np.abs(dX), axis=2)
+    step = np.take_along_axis(dX, factor[..., None], axis=2)
+    effects = np.empty((len(X), nfactors, Y.shape[2]))
+    rows = np.arange(len(X))[:, None]
+    effects[rows, factor] = np.diff(Y, axis=1) / step
+    return {
+        'mu': effects.mean(axis=0),
+        'mu_star': np.abs(effects).mean(axis=0),
+        'sigma': effects.std(axis=0, ddof=1) if len(X) > 1 else
+        np.full(effects.shape[1:], np.nan)}
+
+# Sobol indices from the outputs for a Saltelli design
+def sobol_indices(values, nfactors, nbootstrap=0, seed=None):
+    """Compute first order and total Sobol indices
+
+    The `values` are the outputs for a Saltelli design (see
+    saltelli_design()), as an array of shape (N, outputs).  The
+    indices are computed using the estimators of Saltelli (first
+    order) and Jansen (total).  If `nbootstrap` is positive, 95%
+    confidence intervals (half widths) are estimated by bootstrap
+    resampling.  Returns a dict of arrays of shape factors x outputs.
+
+    """
+    values = np.asarray(values, dtype=float).reshape(len(values), -1)
+    values = values.reshape(nfactors + 2, -1, values.shape[1])
+    fA, fB, fAB = values[0], values[1], values[2:]
+
+    def estimate(rows):
+        a, b, ab = fA[rows], fB[rows], fAB[:, rows]
+        variance = np.var(np.concatenate([a, b]), axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            S1 = np.mean(b * (ab - a), axis=1) / variance
+            ST = 0.5 * np.mean((a - ab) ** 2, axis=1) / variance
+        return S1, ST
+
+    n = fA.shape[0]
+    S1, ST = estimate(np.arange(n))
+    indices = {'S1': S1, 'ST': ST}
+    if nbootstrap > 0:
+        rng = np.random.default_rng(seed)
+        samples = [estimate(rng.integers(0, n, n)) for i in range(nbootstrap)]
+        indices['S1_conf'] = 1.96 * np.std([s[0] for s in samples], axis=0)
+        indices['ST_conf'] = 1.96 * np.std([s[1] for s in samples], axis=0)
+    return indices
+
+#
+# Evaluation of the model
+#
+
+# Figure out what each factor changes in the network
+def _factor_targets(network, names):
+    parameters = set(network.parameter_names())
+    targets = []
+    for name in names:
+        if name in parameters:
+            targets.append(('parameter', name))
+        elif name in network.species_index:
+            targets.append(('initial', name))
+        elif name.endswith('_IC') and name[:-3] in network.species_index:
+            targets.append(('initial', name[:-3]))
+        else:
+            raise KeyError("unknown parameter or species %s" % name)
+    return targets
+
+# Simulate a batch of samples (called by parallel_map)
+def _evaluate_batch(context, samples):
+    network, targets, duration, species, statistic, options = context
+    parameters, initial = {}, {}
+    for (kind, name), column in zip(targets, samples.T):
+        (parameters if kind == 'parameter' else initial)[name] = column
+    result = runsim_batch(network, duration, parameters=parameters,
+                          initial=initial, species=species, **options)
+    if callable(statistic):
+        values = statistic(result.timepoints, result.values)
+    elif statistic == 'final':
+        values = result.values[:, -1]
+    elif statistic == 'max':
+        values = result.values.max(axis=1)
+    elif statistic == 'mean':
+        values = np.trapezoid(result.values, result.timepoints, axis=1) / \
+            (result.timepoints[-1] - result.timepoints[0])
+    else:
+        raise ValueError("unknown statistic '%s'" % statistic)
+    return np.asarray(values, dtype=float).reshape(len(samples), -1)
+
+# Evaluate the outputs for a set of samples
+def evaluate_samples(
+    mixture, names, samples, duration, species, statistic='final',
+    npts=50, batch_size=64, processes=None, **options
+):
+    """Simulate a mixture for a set of factor values
+
+    Each row of `samples` gives the values of the factors `names`
+    (parameter names or species ids, see txtl/sensitivity.py).  The
+    samples are simulated in batches of `batch_size` using
+    runsim_batch(), distributed over `processes` worker processes,
+    and each simulation is summarized by a `statistic` of the
+    trajectories of the `species`: 'final' (value at the final time),
+    'max', 'mean' (time average) or a function f(timepoints, values)
+    that maps the batch trajectories (array, n x npts x species) to an
+    array with n rows.  Returns an array of shape (N, outputs).
+
+    """
+    network = get_network(mixture)
+    if isinstance(species, str):
+        species = [species]
+    targets = _factor_targets(network, names)
+    samples = np.atleast_2d(np.asarray(samples, dtype=float))
+    batches = [samples[i:i + batch_size]
+               for i in range(0, len(samples), batch_size)]
+    results = parallel_map(
+        _evaluate_batch, batches, processes=processes,
+        context=(network, targets, duration, species, statistic,
+                 dict(options, npts=npts)))
+    return np.concatenate(results)
+
+# Morris screening
+def morris(
+    mixture, bounds, duration, species, ntrajectories=20, levels=4,
+    log_scale=False, seed=None, **options
+):
+    """Morris elementary effects screening of a mixture
+
+    The `bounds` are a dict mapping factor names (parameter names or
+    species ids) to (low, high) ranges, which are sampled linearly or
+    (for the factors given in `log_scale`, or all factors if
+    `log_scale` is True) logarithmically.  The design consists of
+    `ntrajectories` trajectories on a grid with `levels` levels (see
+    morris_design()).  Elementary effects are computed with respect to
+    the (unit scaled) factor ranges.  Additional keywords are passed
+    to evaluate_samples().  Returns a SensitivityResult.
+
+    """
+    names = list(bounds)
+    design = morris_design(len(names), ntrajectories, levels, seed)
+    samples = scale_design(design, [bounds[n] for n in names],
+                           _log_flags(names, log_scale))
+    values = evaluate_samples(mixture, names, samples, duration, species,
+                              **options)
+    return SensitivityResult(
+        'morris', names, _output_names(species, values), samples, values,
+        morris_indices(design, values, len(names)))
+
+# Sobol indices
+def sobol(
+    mixture, bounds, duration, species, nsamples=1024, log_scale=False,
+    nbootstrap=0, seed=None, **options
+):
+    """Variance-based (Sobol) sensitivity indices of a mixture
+
+    The factors and ranges are given as for morris().  A Saltelli
+    design with `nsamples` base samples (a power of 2) is simulated,
+    for a total of nsamples * (factors + 2) simulations, and the first
+    order and total indices are computed (see sobol_indices()).
+    Additional keywords are passed to evaluate_samples().  Returns a
+    SensitivityResult.
+
+    """
+    names = list(bounds)
+    design = saltelli_design(len(names), nsamples, seed)
+    samples = scale_design(design, [bounds[n] for n in names],
+                           _log_flags(names, log_scale))
+    values = evaluate_samples(mixture, names, samples, duration, species,
+                              **options)
+    return SensitivityResult(
+        'sobol', names, _output_names(species, values), samples, values,
+        sobol_indices(values, len(names), nbootstrap, seed))
+
+def _log_flags(names, log_scale):
+    if isinstance(log_scale, bool):
+        return [log_scale] * len(names)
+    return [name in log_scale for name in names]
+
+def _output_names(species, values):
+    species = [species] if isinstance(species, str) else list(species)
+    if len(species) == values.shape[1]:
+        return species
+    return ["output%d" % m for m in range(values.shape[1])]
@@ -0,0 +1,359 @@
+# service.py - local simulation job service
+# AP, 19 Oct 2026
+#
+# This file contains a job service that runs simulations in a pool of
+# worker processes on the local machine.  The workers are started once
+# (with txtl and the integrators already imported) and reused for all
+# jobs, and compiled reaction networks are cached (in memory in each
+# worker and as pickle files in the txtl cache directory, shared by all
+# workers and services), so that jobs submitted independently by
+# several notebooks or pipeline stages do not each pay the cost of
+# starting Python and compiling the model.
+#
+# Jobs are submitted from asyncio code using SimulationService.submit()
+# or through a local socket (see SimulationService.serve() and
+# request()), using a protocol of newline-delimited JSON messages:
+#
+#   request:  {"id": 1, "spec": {...}, "duration": 3600,
+#              "options": {"npts": 100, "species": ["Protein_deGFP"]}}
+#   response: {"id": 1, "timepoints": [...], "species": [...],
+#              "values": [[...], ...]}
+#         or: {"id": 1, "error": "message"}
+#
+# where "spec" is a mixture spec (see txtl/spec.py) and "options" are
+# keyword arguments for runsim().
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import os
+import json
+import pickle
+import asyncio
+import collections
+import multiprocessing
+import concurrent.futures
+
+import numpy as np
+
+from .network import ReactionNetwork, compile_mixture
+from .simulate import SimulationResult, runsim
+from .spec import build_mixture, spec_key
+from .pathutil import get_cache_dir
+from .paramdb import get_parameter_database, _find_files
+
+class SimulationService:
+    """Pool of worker processes for running simulations
+
+    The service is used from asyncio code, either as an asynchronous
+    context manager or by calling `start()` and `close()`:
+
+        async with SimulationService(workers=4) as service:
+            result = await service.submit(spec, 3600, npts=100)
+
+    Jobs are kept in a queue and run in the first available worker.
+
+    Parameters
+    ----------
+    workers     Number of worker processes (default: number of CPUs)
+    cache_dir   Directory for the compiled network cache (default: the
+                txtl cache directory, see txtl.pathutil.get_cache_dir())
+    cache_size  Number of compiled networks kept in memory by each worker
+
+    Data attributes
+    ---------------
+    workers     Number of worker processes (int)
+    pending     Number of jobs waiting for a worker (int)
+
+    """
+    def __init__(self, workers=None, cache_dir=None, cache_size=32):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = os.path.join(get_cache_dir(cache_dir), 'networks')
+        self.cache_size = cache_size
+        self._executor = None
+        self._queue = None
+        self._dispatchers = []
+        self._library = None
+
+    @property
+    def pending(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        "Start the worker processes and wait until they are ready"
+        if self._executor is not None:
+            return self
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Configuration files used by the library and the txtl modules
+        # (part of the cache key, so that networks compiled by another
+        # version of the library or of txtl are not reused)
+        database = get_parameter_database()
+        self._library = [(os.path.abspath(name), mtime, size)
+                         for name, mtime, size in _find_files(database.path)]
+        self._library += _source_files()
+
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_initialize_worker,
+            initargs=(self.cache_dir, self.cache_size))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _ready)
+            for i in range(self.workers)])
+
+        self._queue = asyncio.Queue()
+        self._dispatchers = [asyncio.create_task(self._dispatch())
+                             for i in range(self.workers)]
+        return self
+
+    async def close(self):
+        "Cancel the remaining jobs and stop the worker processes"
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            job, future = self._queue.get_nowait()
+            future.cancel()
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._executor.shutdown)
+        self._executor, self._queue, self._dispatchers = None, None, []
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def submit(self, mixture_spec, duration, **options):
+        """Run a simulation in a worker process
+
+        The model can be given as a mixture spec (see txtl/spec.py), a
+        Mixture or a ReactionNetwork.  Specs are built and compiled in
+        the workers, and the compiled networks are cached.  Mixtures
+        are compiled before the job is queued (in a separate thread)
+        and sent to the worker along with the job.  The `duration` and
+        `options` are passed to runsim().  Returns a SimulationResult.
+
+        """
+        if self._executor is None:
+            raise RuntimeError("submit: service has not been started")
+        if isinstance(mixture_spec, dict):
+            job = (spec_key([mixture_spec, self._library]), mixture_spec,
+                   None, duration, options)
+            network = None
+        else:
+            network = mixture_spec
+            if not isinstance(network, ReactionNetwork):
+                network = await asyncio.get_running_loop().run_in_executor(
+                    None, compile_mixture, network)
+            job = (None, None, network, duration, options)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        timepoints, values, species, checkpoint = await future
+        return SimulationResult(network, timepoints, values, species,
+                                checkpoint=checkpoint)
+
+    # Run jobs from the queue in the worker processes
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, future = await self._queue.get()
+            if future.cancelled():
+                continue
+            try:
+                result = await loop.run_in_executor(
+                    self._executor, _run_job, *job)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as error:
+                if not future.cancelled():
+                    future.set_exception(error)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    async def serve(self, path=None, host=None, port=None):
+        """Accept jobs through a local socket
+
+        Listens on a Unix socket at `path` (default: service.sock in
+        the txtl cache directory) or, if a `port` is given, on a TCP
+        socket at `host` (default: localhost).  Returns an
+        asyncio.Server; requests can be sent using request().  A
+        RuntimeError is raised if another service is already listening
+        on the Unix socket.
+
+        """
+        if port is not None:
+            return await asyncio.start_server(
+                self._handle, host or 'localhost', port)
+        path = path or default_socket()
+        if os.path.exists(path):
+            # Only remove the socket if it was left behind by a service
+            # that is no longer running
+            try:
+                reader, writer = await asyncio.open_unix_connection(path)
+            except OSError:
+                os.remove(path)
+            else:
+                writer.close()
+                raise RuntimeError(
+                    "serve: a service is already listening on %s" % path)
+        return await asyncio.start_unix_server(self._handle, path)
+
+    # Handle the requests from a socket connection
+    async def _handle(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(message):
+            try:
+                id = message.get('id')
+                result = await self.submit(
+                    message['spec'], message['duration'],
+                    **message.get('options', {}))
+                response = {
+                    'id': id, 'timepoints': result.timepoints.tolist(),
+                    'species': result.species,
+                    'values': result.values.tolist()}
+            except Exception as error:
+                response = {'id': id, 'error': "%s: %s" % (
+                    type(error).__name__, error)}
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    async with lock:
+                        writer.write(json.dumps({
+                            'id': None, 'error': "invalid request"
+                        }).encode() + b"\n")
+                        await writer.drain()
+                    continue
+                task = asyncio.create_task(answer(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+# Send requests to a service through a socket
+async def request(spec, duration, path=None, host=None, port=None,
+                  **options):
+    """Run a simulation using a service listening on a local socket
+
+    The `spec` must be a mixture spec (see txtl/spec.py); `duration`
+    and `options` are passed to runsim().  The socket is given as for
+    SimulationService.serve().  Returns a SimulationResult (without a
+    model).  A RuntimeError is raised if the job fails.
+
+    """
+    if port is not None:
+        reader, writer = await asyncio.open_connection(
+            host or 'localhost', port)
+    else:
+        reader, writer = await asyncio.open_unix_connection(
+            path or default_socket())
+    try:
+        writer.write(json.dumps({
+            'id': 0, 'spec': spec, 'duration': duration,
+            'options': options}).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    if 'error' in response:
+        raise RuntimeError(response['error'])
+    return SimulationResult(
+        None, np.array(response['timepoints']), np.array(response['values']),
+        response['species'])
+
+# Source files of the txtl package, with their modification times
+def _source_files():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    files = []
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.name.endswith('.py') and entry.is_file():
+            stat = entry.stat()
+            files.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    return files
+
+# Default location of the service socket
+def default_socket():
+    return os.path.join(get_cache_dir(), 'service.sock')
+
+# Run a service until interrupted
+def run_service(path=None, host=None, port=None, workers=None):
+    "Start a service listening on a local socket and run until interrupted"
+    async def main():
+        async with SimulationService(workers) as service:
+            server = await service.serve(path, host, port)
+            async with server:
+                await server.serve_forever()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+#
+# Functions run in the worker processes
+#
+
+_networks = None                # compiled networks, by spec key
+_cache_dir = None
+_cache_size = None
+
+# Set up a worker process
+def _initialize_worker(cache_dir, cache_size):
+    global _networks, _cache_dir, _cache_size
+    import scipy.integrate      # load the integrators before the first job
+    _networks = collections.OrderedDict()
+    _cache_dir, _cache_size = cache_dir, cache_size
+
+# Used to wait for the workers to start
+def _ready():
+    return os.getpid()
+
+# Run a simulation job
+def _run_job(key, spec, network, duration, options):
+    if network is None:
+        network = _get_network(key, spec)
+    result = runsim(network, duration, **options)
+    return result.timepoints, result.values, result.species, \
+        result.checkpoint
+
+# Find a compiled network in the caches, or build it
+def _get_network(key, spec):
+    if key in _networks:
+        _networks.move_to_end(key)
+        return _networks[key]
+
+    filename = os.path.join(_cache_dir, key + '.pkl')
+    try:
+        with open(filename, 'rb') as file:
+            network = pickle.load(file)
+    except Exception:
+        # Missing, truncated or incompatible file: compile the spec
+        network = compile_mixture(build_mixture(spec))
+        tmpname = "%s.%d.tmp" % (filename, os.getpid())
+        try:
+            with open(tmpname, 'wb') as file:
+                pickle.dump(network, file)
+            os.replace(tmpname, filename)
+        except OSError:
+            pass                # cache not writable; keep in memory
+
+    _networks[key] = network
+    while len(_networks) > _cache_size:
+        _networks.popitem(last=False)
+    return network
@@ -0,0 +1,628 @@
+# simulate.py - native ODE simulation of mixtures
+# AP, 19 Oct 2026
+#
+# This file contains functions for simulating a mixture using the
+# compiled ReactionNetwork representation and the stiff integrators
+# in scipy.  Unlike the BioSCRAPE interface (txtl.bioscrape), no SBML
+# file needs to be written and the compiled network can be reused for
+# many simulations (with different parameter values).
+#
+# The integrators are stepped directly (rather than through solve_ivp)
+# so that only the requested outputs (a subset of the species, or
+# weighted sums of species) are stored at each recorded time point.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import time
+import numpy as np
+import scipy.sparse
+import scipy.integrate
+from scipy.integrate import OdeSolution
+
+from .network import ReactionNetwork, compile_mixture
+
+class SimulationResult:
+    """Result of a simulation
+
+    Data attributes
+    ---------------
+    model       Reaction network that was simulated (ReactionNetwork)
+    timepoints  Time points at which the state was recorded (ndarray)
+    values      Species concentrations (ndarray, len(timepoints) x species,
+                or N x len(timepoints) x species for a batch simulation)
+    species     Species ids (or observable names) for the columns of
+                `values` (list of str)
+    checkpoint  State at the end of the simulation (Checkpoint)
+    dense       Continuous interpolant for the recorded outputs, if
+                requested (callable, see `interpolate()`)
+    stats       Integrator statistics, if requested (SolverStats)
+
+    """
+    def __init__(self, model, timepoints, values, species=None,
+                 checkpoint=None, dense=None, stats=None):
+        self.model = model
+        self.timepoints = timepoints
+        self.values = values
+        self.species = list(species if species is not None else model.species)
+        self.checkpoint = checkpoint
+        self.dense = dense
+        self.stats = stats
+
+    def interpolate(self, timepoints):
+        """Evaluate the recorded outputs at arbitrary time points
+
+        Requires the simulation to be run with `dense=True`.  Returns an
+        array with the same layout as `values`.
+
+        """
+        if self.dense is None:
+            raise ValueError("interpolate: simulation was run without "
+                             "dense output")
+        return self.dense(timepoints)
+
+    def get(self, species):
+        "Return the trajectory of a species (or list of species)"
+        if isinstance(species, str):
+            return self.values[..., self.species.index(species)]
+        return self.values[..., [self.species.index(s) for s in species]]
+
+class Checkpoint:
+    """State of a simulation at a given time
+
+    Checkpoints are generated at the end of each simulation (see the
+    `checkpoint` attribute of SimulationResult) and can be used to
+    continue the simulation, or to start a new branch with modified
+    species concentrations, without recomputing the initial segment.
+
+    Data attributes
+    ---------------
+    time        Simulation time of the checkpoint
+    state       Concentrations of all species (ndarray, n_species,
+                or N x n_species for a batch simulation)
+    species     Species ids for the entries of `state` (list of str)
+    model_hash  Structure hash of the network that was simulated
+
+    """
+    def __init__(self, time, state, species, model_hash):
+        self.time = float(time)
+        self.state = np.array(state, dtype=float)
+        self.species = list(species)
+        self.model_hash = model_hash
+
+    def save(self, filename):
+        "Save a checkpoint to a file (numpy .npz format)"
+        with open(filename, 'wb') as file:
+            np.savez(file, time=self.time, state=self.state,
+                     species=np.array(self.species),
+                     model_hash=np.array(self.model_hash))
+
+    def check(self, network):
+        "Make sure that a checkpoint matches a network"
+        if self.model_hash != network.structure_hash():
+            raise ValueError("checkpoint was generated by a different model")
+
+# Load a checkpoint from a file
+def load_checkpoint(filename):
+    "Load a checkpoint that was saved with Checkpoint.save()"
+    with np.load(filename) as data:
+        return Checkpoint(data['time'], data['state'], list(data['species']),
+                          str(data['model_hash']))
+
+class Output:
+    """Selection of the outputs recorded during a simulation
+
+    An output consists of a subset of the species, followed by a set of
+    observables (weighted sums of species concentrations, eg the total
+    amount of a protein in all of its complexes).
+
+    Parameters
+    ----------
+    network     Reaction network (ReactionNetwork)
+    species     Species ids to record (list of str, default = all
+                species unless observables are given)
+    observables Observables to record (dict mapping names to a dict of
+                species weights, or to a list of species to sum)
+
+    """
+    def __init__(self, network, species=None, observables={}):
+        if species is None:
+            species = [] if observables else network.species
+        elif isinstance(species, str):
+            species = [species]
+        self.names = list(species) + list(observables)
+        self.indices = np.array(network.get_species_index(list(species)),
+                                dtype=int)
+        self.weights = np.zeros((network.nspecies, len(observables)))
+        for column, terms in enumerate(observables.values()):
+            if not isinstance(terms, dict):
+                terms = dict.fromkeys(terms, 1)
+            for name, weight in terms.items():
+                self.weights[network.get_species_index(name), column] += weight
+        self.all_species = list(species) == list(network.species) and \
+            not observables
+
+    def __call__(self, x):
+        "Compute the outputs for a state (array, ... x n_species)"
+        if self.all_species:
+            return x
+        return np.concatenate([x[..., self.indices], x @ self.weights],
+                              axis=-1)
+
+# Interpolant for the outputs of a simulation (picklable)
+class _DenseOutput:
+    def __init__(self, solution, output, shape):
+        self.solution = solution
+        self.output = output
+        self.shape = shape
+
+    def __call__(self, timepoints):
+        y = np.moveaxis(self.solution(timepoints), 0, -1)
+        values = self.output(y.reshape(y.shape[:-1] + self.shape))
+        if len(self.shape) > 1 and values.ndim > 2:
+            # Batch simulation: put the batch dimension first
+            values = np.moveaxis(values, 0, -2)
+        return values
+
+class SolverStats:
+    """Statistics of the integrator for a simulation
+
+    The number of rejected steps is not reported by all integrators
+    (in particular LSODA), so it is estimated from the step size that
+    the integrator proposes before each step: a step that is shorter
+    than proposed (and does not end at the final time) needed at least
+    one retry with a smaller step size, after an error test or
+    convergence failure.
+
+    Data attributes
+    ---------------
+    method      Integration method (str)
+    nsteps      Number of steps taken by the integrator
+    nrejected   Number of steps that were retried with a smaller step
+                size (estimated, see above; None if the integrator
+                doesn't provide the proposed step size)
+    nfev        Number of evaluations of the right hand side
+    njev        Number of evaluations of the Jacobian
+    nlu         Number of LU decompositions
+    times       Wall time in seconds for each phase of the integration
+                (dict): 'rhs' and 'jacobian' for evaluating the right
+                hand side and the Jacobian, 'output' for recording the
+                outputs, 'solver' for the rest of the integrator (linear
+                algebra, error control) and 'total'
+
+    """
+    def __init__(self, method):
+        self.method = method if isinstance(method, str) else method.__name__
+        self.nsteps = 0
+        self.nrejected = 0
+        self.nfev = 0
+        self.njev = 0
+        self.nlu = 0
+        self.times = dict.fromkeys(
+            ('rhs', 'jacobian', 'output', 'solver', 'total'), 0.0)
+
+    def __str__(self):
+        return "%s: %d steps (%s rejected), %d rhs, %d jacobian, %d LU; " \
+            "%.3g s (rhs %.3g s, jacobian %.3g s, output %.3g s, " \
+            "solver %.3g s)" % (
+                self.method, self.nsteps,
+                "?" if self.nrejected is None else self.nrejected, self.nfev,
+                self.njev, self.nlu, self.times['total'], self.times['rhs'],
+                self.times['jacobian'], self.times['output'],
+                self.times['solver'])
+
+    def _timed(self, function, phase):
+        "Wrap a function so that its wall time is added to a phase"
+        if function is None:
+            return None
+
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.times[phase] += time.perf_counter() - start
+        return timed
+
+    def _step(self, solver, t_old, proposed):
+        "Update the statistics after a step of the integrator"
+        self.nsteps += 1
+        taken = abs(solver.t - t_old)
+        if proposed is None:
+            self.nrejected = None
+        elif self.nrejected is not None and proposed and \
+                solver.t != solver.t_bound and taken < proposed * (1 - 1e-9):
+            self.nrejected += 1
+
+    def _finish(self, solver, elapsed):
+        "Record the evaluation counts and the total time"
+        self.nfev, self.njev, self.nlu = solver.nfev, solver.njev, solver.nlu
+        self.times['total'] = elapsed
+        self.times['solver'] = max(elapsed - self.times['rhs'] -
+                                   self.times['jacobian'] -
+                                   self.times['output'], 0.0)
+
+# Step size that an integrator will attempt next (None if unknown)
+def _proposed_step(solver):
+    if isinstance(solver, scipy.integrate.LSODA):
+        # The LSODA wrapper only exposes the step size through the work
+        # array of the underlying (private) integrator object
+        try:
+            return solver._lsoda_solver._integrator.rwork[11]
+        except (AttributeError, IndexError, TypeError):
+            return None
+    return getattr(solver, 'h_abs', None)
+
+# Integrators that can be used for simulations
+_methods = {name: getattr(scipy.integrate, name) for name in
+            ('RK23', 'RK45', 'DOP853', 'Radau', 'BDF', 'LSODA')}
+
+# Integrate a system of ODEs, recording only selected outputs
+def _integrate(fun, jac, y0, t0, tf, timepoints, output, shape, dense,
+               method, rtol, atol, options, scaling=None, stats=None):
+    """Step an integrator from t0 to tf and record outputs
+
+    If `timepoints` is given, the outputs are recorded at these times
+    (using the interpolant for each step); if it is None, the outputs
+    are recorded at each step taken by the integrator, so that the
+    sampling is set by the error control of the integrator.  The state
+    is reshaped to `shape` before computing the outputs.
+
+    If `scaling` is given, it is a tuple (scales, time scale), and the
+    system is integrated in the variables y / scales and t / time scale
+    (the tolerances are then interpreted for the scaled variables).
+    The functions, time points and results are in the original units.
+
+    If `stats` is given (SolverStats), it is updated with the step
+    counts and timings of the integration.
+
+    Returns the recorded time points, the outputs (array, len(times) x
+    output shape), the interpolant for the solution (or None) and the
+    final state.
+
+    """
+    scales, tscale = (1, 1) if scaling is None else scaling
+    if scaling is not None:
+        fun, jac = _scaled_functions(fun, jac, scales, tscale)
+        y0, t0, tf = y0 / scales, t0 / tscale, tf / tscale
+        if timepoints is not None:
+            timepoints = np.asarray(timepoints, dtype=float) / tscale
+
+    start = time.perf_counter()
+    if stats is not None:
+        fun = stats._timed(fun, 'rhs')
+        jac = stats._timed(jac, 'jacobian')
+    solver_class = _methods[method] if isinstance(method, str) else method
+    solver = solver_class(fun, t0, y0, tf, rtol=rtol, atol=atol, jac=jac,
+                          **options)
+
+    def record(y):
+        y = y * scales
+        return output(y.reshape(y.shape[:-1] + shape))
+    if stats is not None:
+        record = stats._timed(record, 'output')
+
+    # Record the outputs at (or before) the initial time
+    if timepoints is None:
+        times, values = [t0], [record(y0)]
+    else:
+        timepoints = np.asarray(timepoints, dtype=float)
+        next = np.searchsorted(timepoints, t0, side='right')
+        times, values = [timepoints], [record(np.tile(y0, (next, 1)))]
+
+    segments, interpolants = [t0], []
+    while solver.status == 'running':
+        t_old = solver.t
+        proposed = None if stats is None else _proposed_step(solver)
+        message = solver.step()
+        if solver.status == 'failed':
+            raise RuntimeError("integrate: %s" % message)
+        if stats is not None:
+            stats._step(solver, t_old, proposed)
+
+        interpolant = None
+        if timepoints is None:
+            times.append(solver.t)
+            values.append(record(solver.y))
+        else:
+            stop = np.searchsorted(timepoints, solver.t, side='right')
+            if stop > next:
+                interpolant = solver.dense_output()
+                values.append(record(interpolant(timepoints[next:stop]).T))
+                next = stop
+        if dense:
+            segments.append(solver.t)
+            interpolants.append(interpolant or solver.dense_output())
+
+    if timepoints is None:
+        times, values = np.array(times), np.array(values)
+    else:
+        times, values = timepoints, np.concatenate(values)
+    solution = OdeSolution(segments, interpolants) if dense else None
+    if stats is not None:
+        stats._finish(solver, time.perf_counter() - start)
+    if scaling is not None:
+        times = times * tscale
+        if dense:
+            solution = _ScaledSolution(solution, scales, tscale)
+    return times, values, solution, solver.y * scales
+
+# Right hand side and Jacobian for scaled variables
+def _scaled_functions(fun, jac, scales, tscale):
+    def scaled_fun(t, y):
+        return tscale * fun(t * tscale, y * scales) / scales
+
+    def scaled_jac(t, y):
+        J = jac(t * tscale, y * scales)
+        if scipy.sparse.issparse(J):
+            return (tscale * scipy.sparse.diags(1 / scales) @ J @
+                    scipy.sparse.diags(scales)).tocsc()
+        return tscale * J * scales[None, :] / scales[:, None]
+
+    return scaled_fun, scaled_jac if jac is not None else None
+
+# Interpolant for a solution computed in scaled variables (picklable)
+class _ScaledSolution:
+    def __init__(self, solution, scales, tscale):
+        self.solution = solution
+        self.scales = scales
+        self.tscale = tscale
+
+    def __call__(self, t):
+        y = self.solution(np.asarray(t) / self.tscale)
+        return y * self.scales.reshape((-1,) + (1,) * (y.ndim - 1))
+
+# Scaling and absolute tolerance for simulating a network
+def _scaling(network, atol, N=1):
+    """Return the scaling and absolute tolerance for an integration
+
+    If the network has no scaling, the scaling is None and the default
+    absolute tolerance is 1e-9.  Otherwise, the default tolerance is the
+    one stored with the scaling (for the scaled concentrations), and an
+    explicit tolerance (in concentration units) is converted to the
+    scaled concentrations of each species.
+
+    """
+    if network.scaling is None:
+        return None, 1e-9 if atol is None else atol
+    scales = np.tile(network.scaling.species, N)
+    return (scales, network.scaling.time), \
+        network.scaling.atol if atol is None else atol / scales
+
+# Convert a mixture (or network) to a reaction network
+def get_network(model):
+    "Return a ReactionNetwork for a mixture (compiling it if needed)"
+    if isinstance(model, ReactionNetwork):
+        return model
+    return compile_mixture(model)
+
+# Integrate a reaction network
+def integrate(network, timepoints, x0=None, k=None, t0=None,
+              method='LSODA', rtol=1e-6, atol=None, output=None, **options):
+    """Integrate a reaction network and return the state at timepoints
+
+    Returns an array of shape (len(timepoints), n_species), or
+    (len(timepoints), n_outputs) if an Output is given.  The initial
+    condition `x0` and rate constants `k` default to the values stored
+    in the network; the initial time `t0` defaults to the first time
+    point.  The integration `method` is the name of one of the scipy
+    integrators (eg 'LSODA' or 'BDF'); additional keywords are passed
+    to the integrator.  A RuntimeError is raised if the integration
+    fails.
+
+    The absolute tolerance `atol` is in concentration units and
+    defaults to 1e-9, or, if the network has a scaling (see
+    `ReactionNetwork.set_scaling()`), to the tolerance for the scaled
+    concentrations stored with the scaling.
+
+    """
+    timepoints = np.asarray(timepoints, dtype=float)
+    x0 = network.x0 if x0 is None else np.asarray(x0, dtype=float)
+    k = network.k if k is None else k
+    t0 = timepoints[0] if t0 is None else t0
+    scaling, atol = _scaling(network, atol)
+
+    times, values, solution, final = _integrate(
+        lambda t, x: network.rhs(t, x, k),
+        lambda t, x: network.jacobian(t, x, k),
+        x0, t0, timepoints[-1], timepoints,
+        output or (lambda x: x), (network.nspecies,), False,
+        method, rtol, atol, options, scaling)
+    return values
+
+# Run a simulation
+def runsim(
+    mixture, duration, npts=1000, t0=0, checkpoint=None, initial={},
+    preincubation=None, species=None, observables={}, sampling='uniform',
+    dense=False, method='LSODA', rtol=1e-6, atol=None, stats=False,
+    **options
+):
+    """Simulate a mixture
+
+    The mixture is compiled into a ReactionNetwork (a compiled network
+    can also be passed directly) and simulated from `t0` to `duration`
+    (in seconds), with the state recorded at `npts` evenly spaced
+    points.
+
+    To reduce the size of the result for large mixtures, a subset of
+    the `species` can be recorded, along with `observables` (dict
+    mapping names to dicts of species weights, or to lists of species
+    whose concentrations are summed).  If only observables are given,
+    no species are recorded.  If `sampling` is 'adaptive', the outputs
+    are recorded at the steps taken by the integrator (so that the
+    number of points is set by the error control rather than by
+    `npts`).  If `dense` is True, the result also contains a continuous
+    interpolant for the outputs (see SimulationResult.interpolate()).
+
+    If a `checkpoint` is given, the simulation starts from the state
+    and time stored in the checkpoint (instead of the initial
+    conditions of the network at `t0`), so that a previous simulation
+    can be extended to a later final time.  The `initial` argument can
+    be used to override the concentrations of selected species at the
+    start of the simulation (dict mapping species ids to values), eg
+    to add an inducer to a branch of a simulation.  If a
+    `preincubation` is given (see txtl.incubation.preincubate()), the
+    extract species start from their (diluted) pre-incubated state.
+
+    Additional keywords are passed to the integrator (see
+    `integrate()`).  If the network has a scaling, the simulation is
+    carried out in nondimensional variables (see
+    `ReactionNetwork.set_scaling()`); the results are always in
+    concentration units.  The result includes a checkpoint for the
+    final state of the simulation (with all species) and, if `stats` is
+    True, the step counts and timings of the integrator (SolverStats).
+
+    """
+    network = get_network(mixture)
+    x0 = network.x0.copy()
+    if checkpoint is not None:
+        checkpoint.check(network)
+        t0, x0 = checkpoint.time, checkpoint.state.copy()
+    if preincubation is not None:
+        for name, value in preincubation.initial(network).items():
+            x0[network.get_species_index(name)] = value
+    for name, value in initial.items():
+        x0[network.get_species_index(name)] = value
+    output = Output(network, species, observables)
+    k = network.k
+    scaling, atol = _scaling(network, atol)
+
+    timepoints = _sample_times(t0, duration, npts, sampling)
+    stats = SolverStats(method) if stats else None
+    times, values, solution, final = _integrate(
+        lambda t, x: network.rhs(t, x, k),
+        lambda t, x: network.jacobian(t, x, k),
+        x0, t0, duration, timepoints, output, (network.nspecies,), dense,
+        method, rtol, atol, options, scaling, stats)
+    return SimulationResult(
+        network, times, values, output.names, checkpoint=Checkpoint(
+            duration, final, network.species, network.structure_hash()),
+        dense=_DenseOutput(solution, output, (network.nspecies,))
+        if dense else None, stats=stats)
+
+# Time points at which to record the outputs of a simulation
+def _sample_times(t0, duration, npts, sampling):
+    if sampling == 'uniform':
+        return np.linspace(t0, duration, npts)
+    elif sampling == 'adaptive':
+        return None
+    raise ValueError("unknown sampling method '%s'" % sampling)
+
+# Run a batch of simulations as a single (vectorized) system
+def runsim_batch(
+    mixtures, duration, npts=1000, t0=0, x0=None, k=None,
+    parameters={}, initial={}, checkpoint=None, preincubation=None,
+    species=None, observables={}, sampling='uniform', dense=False,
+    method='BDF', rtol=1e-6, atol=None, stats=False, **options
+):
+    """Simulate a batch of structurally identical mixtures
+
+    The states of N mixtures with the same species and reactions (eg,
+    the wells of a plate, with different DNA concentrations or
+    parameter values) are stacked into a single state array of shape
+    (N, n_species) and integrated as one system.  The right hand side
+    for all wells is evaluated in a single vectorized call and the
+    Jacobian is block diagonal (sparse), so the per-call overhead is
+    paid once per batch instead of once per mixture.
+
+    Parameters
+    ----------
+    mixtures    List of mixtures (or compiled ReactionNetworks) with the
+                same structure, or a single mixture/network that is used
+                as the template for all members of the batch
+    duration    Final time of the simulation (seconds)
+    npts        Number of (evenly spaced) time points to record
+    t0          Initial time
+    x0          Initial conditions (array, N x n_species)
+    k           Rate constants (array, N x n_reactions)
+    parameters  Parameter values for each member of the batch
+                (dict mapping parameter names to arrays of length N)
+    initial     Initial concentrations for each member of the batch
+                (dict mapping species ids to arrays of length N)
+    checkpoint  Checkpoint to start from (replaces x0 and t0)
+    preincubation
+                Pre-incubated extract state (see txtl.incubation), used
+                for the extract species of each member of the batch
+
+    The `species`, `observables`, `sampling` and `dense` arguments
+    select the outputs that are recorded, and `stats` requests the
+    integrator statistics, as in `runsim()`.  Additional keywords are
+    passed to the integrator.
+    Since all members of the batch share the same time steps, the step
+    size is set by the member that is hardest to integrate.
+
+    Returns a SimulationResult with values of shape
+    (N, npts, n_outputs).
+
+    """
+    if isinstance(mixtures, (list, tuple)):
+        networks = [get_network(m) for m in mixtures]
+        network = networks[0]
+        if any(n.structure_hash() != network.structure_hash()
+               for n in networks[1:]):
+            raise ValueError("runsim_batch: mixtures must have the same "
+                             "species and reactions")
+        if network.hill is not None and any(
+                not np.array_equal(n.hill, network.hill)
+                for n in networks[1:]):
+            raise ValueError("runsim_batch: mixtures must have the same "
+                             "Hill constants")
+        x0 = np.array([n.x0 for n in networks]) if x0 is None else x0
+        k = np.array([n.k for n in networks]) if k is None else k
+    else:
+        network = get_network(mixtures)
+    if checkpoint is not None:
+        checkpoint.check(network)
+        t0, x0 = checkpoint.time, checkpoint.state
+
+    # Figure out the size of the batch
+    sizes = [len(np.atleast_2d(a)) for a in (x0, k) if a is not None]
+    sizes += [len(v) for v in list(parameters.values()) +
+              list(initial.values())]
+    N = max(sizes) if sizes else 1
+
+    # Set up the initial conditions and rate constants for each member
+    X0 = np.array(np.broadcast_to(
+        network.x0 if x0 is None else x0, (N, network.nspecies)))
+    if preincubation is not None:
+        members = networks if isinstance(mixtures, (list, tuple)) else \
+            [network]
+        for i, member in enumerate(members):
+            for name, value in preincubation.initial(member).items():
+                X0[i if len(members) > 1 else slice(None),
+                   network.get_species_index(name)] = value
+    for name, values in initial.items():
+        X0[:, network.get_species_index(name)] = values
+    K = np.array(np.broadcast_to(
+        network.k if k is None else k, (N, network.nreactions)))
+    for name, values in parameters.items():
+        K[:, network.parameter_indices(name)] = \
+            np.asarray(values, dtype=float)[:, None]
+
+    # Block diagonal sparsity pattern for the Jacobian
+    n = network.nspecies
+    rows, cols = network.jacobian_pattern()
+    offsets = (np.arange(N) * n)[:, None]
+    pattern = ((rows + offsets).ravel(), (cols + offsets).ravel())
+
+    def fun(t, y):
+        return network.rhs(t, y.reshape(N, n), K).ravel()
+
+    def jac(t, y):
+        values = network.jacobian_values(t, y.reshape(N, n), K)
+        return scipy.sparse.csc_matrix((values.ravel(), pattern),
+                                       shape=(N * n, N * n))
+
+    output = Output(network, species, observables)
+    scaling, atol = _scaling(network, atol, N)
+    timepoints = _sample_times(t0, duration, npts, sampling)
+    stats = SolverStats(method) if stats else None
+    times, values, solution, final = _integrate(
+        fun, jac, X0.ravel(), t0, duration, timepoints, output, (N, n),
+        dense, method, rtol, atol, options, scaling, stats)
+    return SimulationResult(
+        network, times, values.transpose(1, 0, 2), output.names,
+        checkpoint=Checkpoint(duration, final.reshape(N, n),
+                              network.species, network.structure_hash()),
+        dense=_DenseOutput(solution, output, (N, n)) if dense else None,
+        stats=stats)
@@ -0,0 +1,119 @@
+# spec.py - declarative descriptions of mixtures
+# AP, 19 Oct 2026
+#
+# This file contains functions for building a mixture from a
+# declarative description (a dictionary that can be read from a JSON
+# file or sent over a socket), so that mixtures can be described in
+# experiment files and rebuilt in other processes.  A mixture spec has
+# the form
+#
+#   {
+#     "name": "geneexpr",                       # optional
+#     "extract": "BL21_DE3",                    # optional
+#     "buffer": "stdbuffer",                    # optional
+#     "dna": [                                  # DNA assemblies
+#       {"parts": ["ptet(50)", "BCD2(20)", "tetR(1200)"], "conc": 1},
+#       {"parts": [{"type": "RepressedPromoter", "name": "ptet",
+#                   "repressor": "tetR", "dimer": true},
+#                  "BCD2(20)",
+#                  {"type": "ProteinCDS", "name": "deGFP", "length": 1000}],
+#        "conc": 2, "type": "plasmid"}
+#     ],
+#     "volumes": [1, 1, 1]                      # optional
+#   }
+#
+# DNA parts are given either as strings in the 'name(length)' form used
+# by assemble_dna() or as dictionaries giving the name of a DNA class
+# in txtl.dna and its arguments.  The extract, buffer and DNA are
+# placed in separate tubes, which are then combined (in equal volumes,
+# unless `volumes` is given), as in the examples.  The extract can
+# also be given as a dictionary with keys "name", "parameters" (to
+# override extract parameter values) and "fidelity" (see
+# create_extract()).
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import json
+import hashlib
+
+from . import dna
+from .mixture import create_mixture, create_buffer, add_dna, combine_mixtures
+from .extract import create_extract
+from .parameter import _to_parameter
+
+# Build a mixture from a spec
+def build_mixture(spec):
+    """Create a mixture from a declarative description
+
+    See the description at the top of txtl/spec.py for the format of
+    the `spec` dictionary.  Returns a Mixture.
+
+    """
+    unknown = set(spec) - {'name', 'extract', 'buffer', 'dna', 'volumes'}
+    if unknown:
+        raise ValueError("unknown mixture spec keys: %s" %
+                         ", ".join(sorted(unknown)))
+    name = spec.get('name', 'mixture')
+    tubes = []
+
+    # Extract (with optional parameter overrides)
+    if spec.get('extract') is not None:
+        extract = spec['extract']
+        if isinstance(extract, str):
+            extract = {'name': extract}
+        tube = create_extract(extract['name'], fidelity=extract.get(
+            'fidelity', 'detailed'))
+        component = tube.components[0]
+        for key, value in extract.get('parameters', {}).items():
+            component.parameters[key] = _to_parameter(key, value)
+        tube.parameters = component.parameters
+        tubes.append(tube)
+
+    # Buffer
+    if spec.get('buffer') is not None:
+        tubes.append(create_buffer(spec['buffer']))
+
+    # DNA assemblies
+    if spec.get('dna'):
+        tube = create_mixture(name)
+        for entry in spec['dna']:
+            add_dna(tube, assemble(entry), entry.get('conc', 1),
+                    entry.get('type'))
+        tubes.append(tube)
+
+    if len(tubes) == 1 and spec.get('volumes') is None:
+        tubes[0].name = name
+        return tubes[0]
+    return combine_mixtures(tubes, spec.get('volumes'), name)
+
+# Create a DNA assembly from a spec
+def assemble(entry):
+    """Create a DNA assembly from a DNA spec
+
+    The spec is a dictionary with keys "parts" (list of promoter, 5'
+    UTR, CDS and optionally C-terminal tag and 3' UTR) and optionally
+    "name", "parameters", "conc" and "type" (the last two are used by
+    build_mixture()).
+
+    """
+    parts = [_part(part) for part in entry['parts']]
+    return dna.assemble_dna(
+        *parts, assy_name=entry.get('name'),
+        parameters=entry.get('parameters', {}))
+
+# Create a DNA part from a string or dictionary
+def _part(part):
+    if part is None or isinstance(part, str):
+        return part
+    arguments = dict(part)
+    cls = getattr(dna, arguments.pop('type', ''), None)
+    if not (isinstance(cls, type) and issubclass(cls, dna.DNA)):
+        raise ValueError("unknown DNA part type %s" % part.get('type'))
+    return cls(**arguments)
+
+# Hash of a spec (used as a cache key)
+def spec_key(spec):
+    "Return a string that identifies a mixture spec"
+    return hashlib.sha1(
+        json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
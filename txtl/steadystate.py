@@ -0,0 +1,302 @@
+# steadystate.py - direct computation of steady states
+# AP, 19 Oct 2026
+#
+# This file contains functions for computing the steady state of a
+# mixture directly, without integrating the full trajectory.  The
+# steady state is found using Newton's method on the compiled reaction
+# network, with the conservation laws of the network (eg, total RNAP
+# or total DNA) used to make the system of equations nonsingular.  If
+# Newton's method fails to converge, pseudo-transient continuation is
+# used to approach the steady state before switching back to Newton's
+# method.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import numpy as np
+import scipy.linalg
+
+from .simulate import get_network
+
+class SteadyState:
+    """Steady state of a mixture (or of a batch of designs)
+
+    Data attributes
+    ---------------
+    model       Reaction network (ReactionNetwork)
+    values      Steady state concentrations (ndarray, n_species or
+                N x n_species for a batch)
+    species     Species ids for the entries in `values` (list of str)
+    converged   True if the solver converged (bool or array of bool)
+    residual    Maximum absolute value of the time derivative at `values`
+    iterations  Number of iterations used (Newton plus continuation)
+
+    """
+    def __init__(self, model, values, converged, residual, iterations):
+        self.model = model
+        self.species = list(model.species)
+        self.values = values
+        self.converged = converged
+        self.residual = residual
+        self.iterations = iterations
+
+    def get(self, species):
+        "Return the steady state value(s) of a species (or list of species)"
+        if isinstance(species, str):
+            return self.values[..., self.species.index(species)]
+        return self.values[..., [self.species.index(s) for s in species]]
+
+# Compute the conservation laws for a network
+def conservation_laws(network):
+    """Compute the conservation laws for a reaction network
+
+    Returns a matrix L with orthonormal columns such that L.T @ x is
+    constant along all trajectories of the network (L spans the left
+    null space of the stoichiometry matrix).
+
+    """
+    return scipy.linalg.null_space(network.stoichiometry.T.toarray())
+
+# Compute the steady state for a mixture
+def steady_state(
+    mixture, x0=None, k=None, rtol=1e-8, atol=1e-10,
+    maxiter=50, ptc_maxiter=1000, dt0=1.0
+):
+    """Compute the steady state of a mixture
+
+    The steady state is computed using Newton's method with the
+    analytic Jacobian of the compiled network.  The conservation laws
+    of the network are enforced using the totals computed from the
+    initial condition, so that the steady state reached from `x0` is
+    found.  Designs for which Newton's method fails are solved using
+    pseudo-transient continuation (implicit Euler steps with growing
+    step size), followed by Newton's method.  Steps that would make
+    concentrations negative are clipped and projected back onto the
+    conserved totals.  Designs that don't converge (for instance
+    because a species keeps accumulating) are reported in the
+    `converged` attribute of the result.
+
+    Parameters
+    ----------
+    mixture     Mixture or compiled ReactionNetwork, or a list of them
+    x0          Initial condition(s) (array, n_species or N x n_species)
+    k           Rate constants (array, n_reactions or N x n_reactions)
+    rtol, atol  Convergence tolerance on the time derivative and on the
+                conserved totals, relative to the magnitude of the state
+                (max |dx/dt| <= atol + rtol * max |x|)
+    maxiter     Maximum number of Newton iterations
+    ptc_maxiter Maximum number of pseudo-transient continuation steps
+    dt0         Initial step size for pseudo-transient continuation
+
+    A batch of designs can be solved at once by passing initial
+    conditions and/or rate constants with a leading batch dimension,
+    or by passing a list of structurally identical mixtures.  All
+    designs in a batch are iterated together using vectorized
+    evaluations.  If a list of mixtures with different structures is
+    given, a list of results is returned.
+
+    Returns a SteadyState object.
+
+    """
+    if isinstance(mixture, (list, tuple)):
+        networks = [get_network(m) for m in mixture]
+        if len(set(n.structure_hash() for n in networks)) > 1:
+            return [steady_state(network, None, None, rtol, atol, maxiter,
+                                 ptc_maxiter, dt0) for network in networks]
+        network = networks[0]
+        x0 = np.array([n.x0 for n in networks]) if x0 is None else x0
+        k = np.array([n.k for n in networks]) if k is None else k
+    else:
+        network = get_network(mixture)
+
+    x0 = network.x0 if x0 is None else np.asarray(x0, dtype=float)
+    k = network.k if k is None else np.asarray(k, dtype=float)
+    batch = np.broadcast_shapes(x0.shape[:-1], k.shape[:-1])
+    X = np.array(np.broadcast_to(x0, batch + x0.shape[-1:])).reshape(
+        -1, network.nspecies)
+    K = np.array(np.broadcast_to(k, batch + k.shape[-1:])).reshape(
+        -1, network.nreactions)
+
+    # Designs in which some reactions are switched off (zero rate) can
+    # have additional conservation laws, so solve them separately
+    converged = np.zeros(X.shape[0], dtype=bool)
+    iterations = np.zeros(X.shape[0], dtype=int)
+    patterns, groups = np.unique(K != 0, axis=0, return_inverse=True)
+    for group, pattern in enumerate(patterns):
+        members = np.flatnonzero(groups.ravel() == group)
+        X[members], converged[members], iterations[members] = _solve(
+            network, X[members], K[members], pattern, rtol, atol,
+            maxiter, ptc_maxiter, dt0)
+
+    residual = np.max(np.abs(network.rhs(0, X, K)), axis=-1)
+    shape = batch + (network.nspecies,)
+    if batch == ():
+        return SteadyState(network, X[0], bool(converged[0]), residual[0],
+                           int(iterations[0]))
+    return SteadyState(network, X.reshape(shape), converged.reshape(batch),
+                       residual.reshape(batch), iterations.reshape(batch))
+
+# Solve for the steady state of a batch of designs
+def _solve(network, X, K, pattern, rtol, atol, maxiter, ptc_maxiter, dt0):
+    # Set up the reduced system: dynamics projected onto the range of
+    # the stoichiometry matrix, plus the conservation laws
+    S = network.stoichiometry[:, np.flatnonzero(pattern)].toarray()
+    L = scipy.linalg.null_space(S.T)
+    Q = scipy.linalg.orth(S) if S.size else np.zeros((network.nspecies, 0))
+    totals = X @ L
+
+    initial = X.copy()
+    solver = _Solver(network, K, Q, L, totals, rtol, atol)
+    converged, iterations = solver.newton(X, maxiter)
+
+    # Use pseudo-transient continuation for anything that didn't converge
+    if not np.all(converged):
+        failed = ~converged
+        Xc = initial[failed]
+        subsolver = _Solver(network, K[failed], Q, L, totals[failed],
+                            rtol, atol)
+        ptc_converged, ptc_iterations = subsolver.continuation(
+            Xc, ptc_maxiter, dt0)
+        newton_converged, newton_iterations = subsolver.newton(Xc, maxiter)
+        X[failed] = Xc
+        converged[failed] = newton_converged | ptc_converged
+        iterations[failed] += ptc_iterations + newton_iterations
+
+    return X, converged, iterations
+
+# Maximum number of alternating projections for restoring the totals
+_max_projections = 100
+
+# Internal class used to hold the data for a batch of steady state solves
+class _Solver:
+    def __init__(self, network, K, Q, L, totals, rtol, atol):
+        self.network = network
+        self.K = K
+        self.Q = Q
+        self.L = L
+        self.totals = totals
+        self.rtol = rtol
+        self.atol = atol
+
+    def residual(self, X, active):
+        "Residual of the reduced system (dynamics plus conservation)"
+        f = self.network.rhs(0, X, self.K[active])
+        return np.concatenate(
+            [f @ self.Q, X @ self.L - self.totals[active]], axis=-1), f
+
+    def conserved(self, X, active):
+        "Check whether the conservation laws hold (within tolerance)"
+        error = X @ self.L - self.totals[active]
+        return np.max(np.abs(error), axis=-1, initial=0) <= \
+            self.atol + self.rtol * np.max(np.abs(X), axis=-1)
+
+    def converged(self, X, f, active):
+        return self.conserved(X, active) & (
+            np.max(np.abs(f), axis=-1) <=
+            self.atol + self.rtol * np.max(np.abs(X), axis=-1))
+
+    def project(self, X, active):
+        """Clip negative concentrations, restoring the conserved totals
+
+        Alternates between clipping and projecting onto the states with
+        the given totals; states for which this doesn't converge are
+        caught by conserved().
+
+        """
+        X = np.maximum(X, 0)
+        for iteration in range(_max_projections):
+            error = X @ self.L - self.totals[active]
+            if np.all(self.conserved(X, active)):
+                break
+            X = np.maximum(X - error @ self.L.T, 0)
+        return X
+
+    def newton(self, X, maxiter):
+        "Newton iteration with backtracking (updates X in place)"
+        nbatch = X.shape[0]
+        converged = np.zeros(nbatch, dtype=bool)
+        iterations = np.zeros(nbatch, dtype=int)
+        active = np.arange(nbatch)
+        for iteration in range(maxiter):
+            F, f = self.residual(X[active], active)
+            done = self.converged(X[active], f, active)
+            converged[active[done]] = True
+            active = active[~done]
+            if len(active) == 0:
+                break
+            F = F[~done]
+            iterations[active] += 1
+
+            # Compute the Newton step for the reduced system
+            J = self.network.jacobian(0, X[active], self.K[active])
+            G = np.concatenate(
+                [np.swapaxes(J, -1, -2) @ self.Q,
+                 np.broadcast_to(self.L, J.shape[:-1] + self.L.shape[-1:])],
+                axis=-1)
+            G = np.swapaxes(G, -1, -2)
+            try:
+                dX = np.linalg.solve(G, -F[..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                dX = np.array([np.linalg.lstsq(g, -r, rcond=None)[0]
+                               for g, r in zip(G, F)])
+
+            # Backtrack until the residual decreases (keeping x >= 0
+            # without changing the conserved totals)
+            norm = np.linalg.norm(F, axis=-1)
+            alpha = np.ones(len(active))
+            pending = np.ones(len(active), dtype=bool)
+            for halving in range(20):
+                trial = self.project(X[active[pending]] + alpha[pending, None]
+                                     * dX[pending], active[pending])
+                Ftrial, _ = self.residual(trial, active[pending])
+                better = self.conserved(trial, active[pending]) & \
+                    (np.linalg.norm(Ftrial, axis=-1) < norm[pending])
+                accept = np.flatnonzero(pending)[better]
+                X[active[accept]] = trial[better]
+                pending[accept] = False
+                if not np.any(pending):
+                    break
+                alpha[pending] /= 2
+            else:
+                # No decrease possible: stop iterating on these designs
+                active = active[~pending]
+                if len(active) == 0:
+                    break
+
+        return converged, iterations
+
+    def continuation(self, X, maxiter, dt0):
+        "Pseudo-transient continuation (updates X in place)"
+        nbatch, n = X.shape
+        active = np.arange(nbatch)
+        converged = np.zeros(nbatch, dtype=bool)
+        iterations = np.zeros(nbatch, dtype=int)
+        dt = np.full(nbatch, dt0)
+        f = self.network.rhs(0, X, self.K)
+        norm = np.linalg.norm(f, axis=-1)
+        identity = np.eye(n)
+        for iteration in range(maxiter):
+            done = self.converged(X[active], f[active], active)
+            converged[active[done]] = True
+            active = active[~done]
+            if len(active) == 0:
+                break
+            iterations[active] += 1
+
+            # Take a linearly implicit Euler step
+            J = self.network.jacobian(0, X[active], self.K[active])
+            A = identity / dt[active, None, None] - J
+            try:
+                dX = np.linalg.solve(A, f[active][..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                dX = np.array([np.linalg.lstsq(a, r, rcond=None)[0]
+                               for a, r in zip(A, f[active])])
+            X[active] = self.project(X[active] + dX, active)
+
+            # Update the step size using switched evolution relaxation
+            f[active] = self.network.rhs(0, X[active], self.K[active])
+            new_norm = np.linalg.norm(f[active], axis=-1)
+            dt[active] *= np.clip(norm[active] / np.maximum(new_norm, 1e-300),
+                                  0.5, 10)
+            norm[active] = new_norm
+        return converged, iterations
@@ -0,0 +1,296 @@
+# sweep.py - adaptive parameter sweeps and dose-response maps
+# AP, 19 Oct 2026
+#
+# This file contains functions for sweeping one or more parameters (or
+# initial concentrations) of a mixture over a range of values.  Rather
+# than simulating every point of a dense grid, the sweep starts from a
+# coarse grid and recursively splits the grid cells in which the
+# outputs change by more than a given fraction of their range, or
+# cross a threshold (eg, the half-maximal expression of a reporter), so
+# that the simulations are concentrated where the response surface is
+# steep (eg, the transition region of an aTc titration on ptet) rather
+# than in the flat regions.  The grid points are nested, so each level
+# of refinement only simulates the new points, and the new points of a
+# level are simulated in batches over a pool of worker processes using
+# the compiled network of the mixture (see evaluate_samples() in
+# txtl/sensitivity.py, which also describes how factors are named).
+#
+# The cells that are not refined any further are interpolated
+# (multilinearly) to give the outputs on the dense grid with the
+# resolution of the finest level.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import os
+import itertools
+import numpy as np
+
+from .simulate import get_network
+from .sensitivity import evaluate_samples, scale_design, _log_flags, \
+    _output_names
+
+class SweepResult:
+    """Result of an adaptive sweep
+
+    The points of the sweep lie on a dense grid with `resolution` points
+    per factor, and are identified by their integer coordinates on the
+    grid (`indices`).  Each cell of the final refinement is a hypercube
+    on the grid, given by its lower corner and its size.
+
+    Data attributes
+    ---------------
+    names       Names of the factors (list of str)
+    outputs     Names of the outputs (list of str)
+    axes        Factor values along each axis of the dense grid (list of
+                ndarrays)
+    resolution  Number of points of the dense grid along each axis (int)
+    indices     Grid coordinates of the points that were evaluated
+                (ndarray, N x factors)
+    samples     Factor values of the points that were evaluated
+                (ndarray, N x factors)
+    values      Outputs for each point (ndarray, N x outputs)
+    cells       Cells of the final refinement (list of (lower corner,
+                size) tuples, in grid coordinates)
+    levels      Number of new points evaluated at each level (list)
+
+    """
+    def __init__(self, names, outputs, axes, indices, values, cells,
+                 levels):
+        self.names = list(names)
+        self.outputs = list(outputs)
+        self.axes = axes
+        self.resolution = len(axes[0])
+        self.indices = indices
+        self.samples = np.array([[axis[i] for axis, i in zip(axes, point)]
+                                 for point in indices])
+        self.values = values
+        self.cells = cells
+        self.levels = levels
+
+    @property
+    def npoints(self):
+        "Number of points that were evaluated"
+        return len(self.indices)
+
+    def grid(self):
+        """Interpolate the outputs on the dense grid
+
+        Returns an array of shape (resolution, ..., resolution, outputs)
+        (one axis per factor), with the outputs interpolated
+        multilinearly from the corners of each cell of the final
+        refinement.
+
+        """
+        d = len(self.names)
+        lookup = {tuple(point): row for row, point in enumerate(self.indices)}
+        result = np.full((self.resolution,) * d + (self.values.shape[1],),
+                         np.nan)
+        for lower, size in self.cells:
+            t = np.linspace(0, 1, size + 1)
+            block = 0
+            for offset in itertools.product((0, 1), repeat=d):
+                corner = tuple(l + size * o for l, o in zip(lower, offset))
+                weight = 1
+                for axis, o in enumerate(offset):
+                    shape = [1] * d
+                    shape[axis] = size + 1
+                    weight = weight * (t if o else 1 - t).reshape(shape)
+                block = block + weight[..., None] * \
+                    self.values[lookup[corner]]
+            result[tuple(slice(l, l + size + 1) for l in lower)] = block
+        return result
+
+    def __str__(self):
+        return "adaptive sweep of %s: %d points evaluated (%s per level), " \
+            "dense grid %s = %d points" % (
+                ", ".join(self.names), self.npoints,
+                "+".join(str(n) for n in self.levels),
+                " x ".join([str(self.resolution)] * len(self.names)),
+                self.resolution ** len(self.names))
+
+# Corners of a cell on the grid
+def _corners(lower, size):
+    return [tuple(l + size * o for l, o in zip(lower, offset))
+            for offset in itertools.product((0, 1), repeat=len(lower))]
+
+# Multilinear interpolation from the corners of a cell
+def _interpolate(values, cell, points):
+    lower, size = cell
+    u = (np.array(points) - lower) / size
+    weights = np.ones((len(points), len(values)))
+    for k, offset in enumerate(itertools.product((0, 1), repeat=len(lower))):
+        for axis, o in enumerate(offset):
+            weights[:, k] *= u[:, axis] if o else 1 - u[:, axis]
+    return weights @ values
+
+# Adaptive refinement of a function on a grid
+def adaptive_grid(evaluate, bounds, npoints=5, depth=4, tol=0.05,
+                  thresholds=None, log_scale=False, max_points=None,
+                  names=None):
+    """Evaluate a function on an adaptively refined grid
+
+    The function `evaluate(samples)` maps an array of factor values
+    (N x factors) to an array of outputs (N x outputs), and is called
+    once for each level of refinement with all the new points of that
+    level.  The factors range over the (low, high) `bounds` (sampled
+    logarithmically for the factors for which `log_scale` is True, see
+    scale_design()).
+
+    The initial grid has `npoints` points per factor.  At each of the
+    `depth` levels of refinement, the cells of the previous level are
+    split into 2^factors cells of half the size if they contain one of
+    the `thresholds` (a list of values for all outputs, or a list per
+    output), or if their error exceeds a fraction `tol` of the range of
+    the outputs over all points evaluated so far.  The error of a cell
+    of the coarse grid is the change of the outputs across the cell;
+    for the other cells, it is the largest difference between the
+    outputs at the corners of the cell and their multilinear
+    interpolation from the corners of the cell it was split from, so
+    that cells on which the outputs are (close to) linear are not
+    refined any further.  If `max_points` is given, the cells that
+    contain thresholds and those with the largest errors are refined
+    first, and refinement stops when the next cell would exceed the
+    number of points.  Returns a SweepResult, with a dense grid of
+    (npoints - 1) 2^depth + 1 points per factor.
+
+    """
+    if npoints < 2:
+        raise ValueError("adaptive_grid: npoints must be at least 2")
+    d = len(bounds)
+    names = list(names) if names is not None else \
+        ["x%d" % i for i in range(d)]
+    resolution = (npoints - 1) * 2 ** depth + 1
+    flags = log_scale if isinstance(log_scale, (list, tuple)) else \
+        [log_scale] * d
+    axes = [scale_design(np.linspace(0, 1, resolution)[:, None],
+                         [bound], [flag])[:, 0]
+            for bound, flag in zip(bounds, flags)]
+
+    points, rows = [], {}
+    values = None
+
+    def add_points(new):
+        nonlocal values
+        new = [p for p in dict.fromkeys(new) if p not in rows]
+        if not new:
+            return 0
+        samples = np.array([[axis[i] for axis, i in zip(axes, point)]
+                            for point in new])
+        result = np.asarray(evaluate(samples), dtype=float)
+        result = result.reshape(len(new), -1)
+        for point in new:
+            rows[point] = len(points)
+            points.append(point)
+        values = result if values is None else np.concatenate(
+            [values, result])
+        return len(new)
+
+    # Coarse grid
+    size = 2 ** depth
+    cells = [(tuple(size * i for i in lower), size)
+             for lower in itertools.product(range(npoints - 1), repeat=d)]
+    levels = [add_points(c for cell in cells for c in _corners(*cell))]
+    nout = values.shape[1]
+    if thresholds is None:
+        thresholds = [[]] * nout
+    elif np.isscalar(thresholds):
+        thresholds = [[thresholds]] * nout
+    elif all(np.isscalar(t) for t in thresholds):
+        thresholds = [list(thresholds)] * nout
+
+    final = []
+    parents = [None] * len(cells)
+    for level in range(depth):
+        span = np.ptp(values, axis=0)
+
+        # Score each cell by the change of the outputs across it (on
+        # the coarse grid) or by the error of the interpolation from
+        # the cell that it was split from
+        candidates = []
+        for cell, parent in zip(cells, parents):
+            corner = values[[rows[c] for c in _corners(*cell)]]
+            low, high = corner.min(axis=0), corner.max(axis=0)
+            crossing = any(low[m] < t <= high[m]
+                           for m in range(nout) for t in thresholds[m])
+            if parent is None:
+                error = high - low
+            else:
+                error = np.abs(corner - _interpolate(
+                    values[[rows[c] for c in _corners(*parent)]], parent,
+                    _corners(*cell))).max(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                score = np.max(np.where(span > 0, error / span, 0))
+            if crossing or score > tol:
+                candidates.append((np.inf if crossing else score, cell))
+            else:
+                final.append(cell)
+        candidates.sort(key=lambda candidate: -candidate[0])
+
+        # Split the cells (within the budget of points)
+        half, refined, parents, new = cells[0][1] // 2, [], [], set()
+        for n, (score, cell) in enumerate(candidates):
+            children = [(corner, half) for corner in _corners(cell[0], half)]
+            corners = {c for child in children for c in _corners(*child)
+                       if c not in rows}
+            if max_points is not None and \
+               len(points) + len(new | corners) > max_points:
+                final += [c for s, c in candidates[n:]]
+                break
+            new |= corners
+            refined += children
+            parents += [cell] * len(children)
+        if not refined:
+            cells = []
+            break
+        levels.append(add_points(sorted(new)))
+        cells = refined
+
+    return SweepResult(names, ["output%d" % m for m in range(nout)], axes,
+                       np.array(points), values, final + cells, levels)
+
+# Adaptive sweep of a mixture
+def adaptive_sweep(
+    mixture, bounds, duration, species, npoints=5, depth=4, tol=0.05,
+    thresholds=None, log_scale=False, max_points=None, statistic='final',
+    batch_size=64, processes=None, **options
+):
+    """Sweep parameters of a mixture on an adaptively refined grid
+
+    The `bounds` are a dict mapping factor names (parameter names or
+    species ids, as for morris()) to (low, high) ranges, which are
+    sampled linearly or (for the factors given in `log_scale`, or all
+    factors if `log_scale` is True) logarithmically.  The outputs are
+    a `statistic` of the trajectories of the `species` (see
+    evaluate_samples()), and the grid is refined where they change
+    rapidly or cross `thresholds` (which can also be given as a dict
+    mapping species to lists of values; see adaptive_grid() for the
+    `npoints`, `depth`, `tol`, `thresholds` and `max_points`
+    arguments).  The mixture is compiled once, and the new points of
+    each level are simulated in batches (of at most `batch_size`
+    points, split so that all `processes` are used) with runsim_batch().
+    Additional keywords are passed to evaluate_samples().
+
+    Returns a SweepResult; the outputs on the dense grid are given by
+    its grid() method.
+
+    """
+    network = get_network(mixture)
+    names = list(bounds)
+    if isinstance(thresholds, dict):
+        species = [species] if isinstance(species, str) else list(species)
+        thresholds = [thresholds.get(name, []) for name in species]
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    def evaluate(samples):
+        size = max(1, min(batch_size, -(-len(samples) // processes)))
+        return evaluate_samples(network, names, samples, duration, species,
+                                statistic=statistic, batch_size=size,
+                                processes=processes, **options)
+
+    result = adaptive_grid(
+        evaluate, [bounds[name] for name in names], npoints, depth, tol,
+        thresholds, _log_flags(names, log_scale), max_points, names)
+    result.outputs = _output_names(species, result.values)
+    return result
@@ -0,0 +1,715 @@
+# template.py - reaction templates for DNA assemblies
+# AP, 19 Oct 2026
+#
+# This file contains the AssemblyTemplate class, which is used to speed
+# up the creation of models containing many DNA assemblies with the
+# same architecture (eg, a library of genes that differ only in the
+# names of the promoter, RBS or coding sequence and in the values of
+# their parameters).  All such assemblies generate the same pattern of
+# species and reactions, but the normal path through the element
+# update functions, get_mechanisms(), eval_parameter() and
+# add_reaction() has to be followed for each of them.
+#
+# The first assembly with a given architecture is used to record a
+# template: the update functions are run with the names of the
+# assembly and its elements replaced by placeholders, and with the
+# numeric parameters of the elements replaced by marker values.  The
+# species and reactions that are created identify which names and
+# rate constants depend on which element names and parameters.  The
+# recording is done twice (with different placeholders and markers)
+# so that values that depend on names or parameters in any other way
+# are detected, in which case the assembly is not templated.  Later
+# assemblies with the same architecture are instantiated from the
+# template by substituting their names and parameter values.
+#
+# When a mixture is compiled into a ReactionNetwork, the reactions
+# generated by templates are not added to the SBML model; instead, the
+# reactions for all instances of a template are added to the network
+# as arrays (see `compile_mixture()`).
+#
+# The architecture of an assembly is described by its class, the
+# classes of its elements, the primitive (str, number, bool, tuple)
+# attributes of the assembly and its elements (other than names), the
+# mechanisms used for each element, and the names and types of their
+# parameters.  Assemblies whose update functions depend on other
+# information can set the `template` attribute to False.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import re
+import math
+import weakref
+import functools
+import libsbml
+import numpy as np
+
+from . import sbmlutil
+from .sbmlutil import _id_from_name, _species_table
+from .mechanism import get_mechanisms
+from .parameter import ParameterTable
+
+# Placeholders used for names while recording a template
+_placeholder = "__txtl%s%d__"
+_placeholder_pattern = re.compile(r"__txtl([ab])(\d+)__")
+_identifier_pattern = re.compile(r"[A-Za-z_]\w*")
+
+# Elements of a DNA assembly (in the order they are processed)
+_elements = ('promoter', 'utr5', 'cds', 'ctag', 'utr3')
+
+# Attributes that are not part of the architecture of an assembly
+# (including the indices of the species created by the assembly; the
+# dimer flag of a repressed promoter is also reflected in its tfname)
+_ignored_attributes = set(_elements) | {
+    'name', 'assy', 'parameters', 'mechanisms', 'default_mechanisms',
+    'custom_mechanisms', 'config_file', 'template', 'rnaname', 'protname',
+    'dna', 'rna', 'protein', 'rnap_bound', 'ribo_bound', 'tf_bound', 'dimer'}
+
+# Attributes of an assembly and its elements that refer to species (by
+# index in the model) or hold species names; they are set for each
+# instance of a template when its species are created
+_species_attributes = ('dna', 'rna', 'protein', 'rnap_bound', 'ribo_bound',
+                       'tf_bound', 'dimer')
+_name_attributes = ('rnaname', 'protname')
+
+# Values used for concentrations and parameters while recording
+_recording_concentration = {'a': 0.75, 'b': 1.25}
+_rounding_tolerance = 1e-12
+def _marker(tag, j):
+    return (1.0 if tag == 'a' else 2.0) + (j + 1) / 1024.
+
+class TemplateError(Exception):
+    "Assembly can not be represented by a template"
+
+# Get the objects that make up an assembly (assembly plus elements)
+def _objects(assy):
+    return [assy] + [getattr(assy, slot) for slot in _elements
+                     if getattr(assy, slot) is not None]
+
+# Get the attributes of an object (including slots)
+def _attributes(obj):
+    names = list(getattr(obj, '__dict__', ())) + _slot_names(type(obj))
+    return {name: getattr(obj, name) for name in names
+            if hasattr(obj, name)}
+
+@functools.lru_cache(maxsize=None)
+def _slot_names(cls):
+    names = []
+    for base in cls.__mro__:
+        slots = base.__dict__.get('__slots__', ())
+        names += [slots] if isinstance(slots, str) else list(slots)
+    return [name for name in names if name not in ('__dict__', '__weakref__')]
+
+# Restore the attributes of an object
+def _restore(obj, state):
+    for name in _attributes(obj):
+        if name not in state:
+            delattr(obj, name)
+    for name, value in state.items():
+        setattr(obj, name, value)
+
+# Primitive attributes of an object (used to describe the architecture)
+def _attribute_key(obj):
+    return tuple(sorted(
+        (name, value) for name, value in _attributes(obj).items()
+        if name not in _ignored_attributes and
+        isinstance(value, (str, int, float, bool, tuple, type(None)))))
+
+# Compute the architecture of an assembly in a mixture
+def assembly_signature(mixture, assy, mechanism_keys=None):
+    """Return a hashable description of the architecture of an assembly
+
+    Assemblies with the same signature (in the same mixture) generate
+    the same species and reactions, up to the names of the assembly and
+    its elements and the values of the numeric parameters of the
+    elements.  Returns None if the assembly can not be templated.  The
+    optional dictionary `mechanism_keys` is used to store the keys of
+    the mechanisms between calls.
+
+    """
+    signature = [type(assy), _attribute_key(assy)]
+    for obj in _objects(assy):
+        if not isinstance(obj.parameters, ParameterTable):
+            return None
+        mechanisms = get_mechanisms(
+            mixture, assy, obj.mechanisms if obj is not assy else {})
+        signature.append((
+            type(obj), _attribute_key(obj), obj.parameters.structure(),
+            tuple((name, _mechanism_key(mech, mechanism_keys))
+                  for name, mech in mechanisms.items())))
+    return tuple(signature)
+
+# Key identifying the behavior of a mechanism
+def _mechanism_key(mech, cache=None):
+    # Mechanisms are usually created per component, so instances whose
+    # state consists only of simple values are compared by value; any
+    # other mechanism is only equivalent to itself
+    if cache is not None and id(mech) in cache:
+        return cache[id(mech)][1]
+    if all(isinstance(value, (str, int, float, bool, tuple, type(None)))
+           for value in _attributes(mech).values()):
+        key = type(mech), _attribute_key(mech)
+    else:
+        key = id(mech)
+    if cache is not None:
+        cache[id(mech)] = (mech, key)   # keep mech alive so the id is unique
+    return key
+
+# Initial concentration of a species (None if not set)
+def _initial_concentration(species):
+    if species.isSetInitialConcentration():
+        return species.getInitialConcentration()
+    return None
+
+# Value of a parameter of an instance, or of a concentration
+class _Value:
+    def __init__(self, kind, data=None):
+        self.kind = kind        # 'const', 'conc' or 'param'
+        self.data = data        # value, scale factor or parameter index
+
+    def __eq__(self, other):
+        return (self.kind, self.data) == (other.kind, other.data)
+
+    def evaluate(self, instance):
+        if self.kind == 'const':
+            return self.data
+        elif self.kind == 'conc':
+            return self.data * instance.concentration
+        return instance.values[self.data]
+
+    def evaluate_batch(self, instances):
+        "Evaluate for a list of instances (returns an array)"
+        if self.kind == 'const':
+            return np.full(len(instances), self.data, dtype=float)
+        elif self.kind == 'conc':
+            return self.data * np.array(
+                [inst.concentration for inst in instances], dtype=float)
+        return np.array([inst.values[self.data] for inst in instances])
+
+# Instance of a template (names, concentration and parameter values)
+class TemplateInstance:
+    __slots__ = ('fields', 'concentration', 'values', 'species_ids')
+
+    def __init__(self, fields, concentration, values):
+        self.fields = fields
+        self.concentration = concentration
+        self.values = values
+        self.species_ids = None
+
+# Split a name into literal text and placeholders
+def _split(name, tag):
+    parts = []
+    for i, part in enumerate(_placeholder_pattern.split(name)):
+        # re.split returns [text, tag, index, text, tag, index, ...]
+        if i % 3 == 0:
+            if part: parts.append(part)
+        elif i % 3 == 1:
+            if part != tag:
+                raise TemplateError("inconsistent placeholder")
+        else:
+            parts.append(int(part))
+    return tuple(parts)
+
+# Render a split name for a list of field values
+def _render(parts, fields):
+    return "".join(p if isinstance(p, str) else fields[p] for p in parts)
+
+class AssemblyTemplate:
+    """Parameterized subnetwork for assemblies with the same architecture
+
+    Data attributes
+    ---------------
+    signature       Architecture of the assemblies (see assembly_signature)
+    parameter_keys  Numeric parameters that are substituted, for the
+                    assembly and each of its elements (list of lists)
+    species         Species created by the assembly: split name and
+                    initial concentration (list of tuples)
+    roles           Attributes of the assembly and its elements that are
+                    set when the species are created: object position,
+                    attribute name and template species (index, or id
+                    of a species created elsewhere) or split name (list
+                    of tuples)
+    reactions       Reactions created by the assembly (list of dict), or
+                    None if they have not been recorded yet
+    compilable      True if all reactions have mass-action kinetics
+
+    Templates are created by `TemplateCache` while a mixture is being
+    built; the species part of a template is recorded when species are
+    created and the reaction part when reactions are created (so that
+    species created by other components are available).
+
+    """
+    def __init__(self, mixture, assy, signature):
+        self.signature = signature
+        self.parameter_keys = [
+            [key for key, type in zip(*obj.parameters.structure()[::2])
+             if type == 'Numeric'] for obj in _objects(assy)]
+        self.reactions = None
+        self.compilable = False
+
+        # Record the species created by the assembly
+        records = [self._record(mixture, assy, tag, False)
+                   for tag in ('a', 'b')]
+        self.species = self._match_species(*[r[0] for r in records])
+        self.roles = self._match_roles(*records)
+
+    # Create the data for an instance of the template
+    def bind(self, assy, concentration):
+        objects = _objects(assy)
+        values = np.concatenate(
+            [obj.parameters.get_values(keys)
+             for obj, keys in zip(objects, self.parameter_keys)])
+        return TemplateInstance([obj.name for obj in objects],
+                                concentration, values)
+
+    #
+    # Recording
+    #
+    # The update functions for the assembly are called with names and
+    # parameter values replaced by placeholders and markers.  All
+    # changes to the model are undone after the recording.
+    #
+    def _record(self, mixture, assy, tag, reactions):
+        model = mixture.model
+        table = _species_table(mixture)
+        nspecies, nreactions = model.getNumSpecies(), model.getNumReactions()
+        counts = (model.getNumParameters(), model.getNumRules(),
+                  model.getNumCompartments(), model.getNumEvents())
+
+        # Initial concentrations are only set by sbmlutil.add_species(),
+        # which logs the previous values of the species it modifies
+        log = mixture.__dict__['_species_log'] = {}
+
+        objects = _objects(assy)
+        states = [_attributes(obj) for obj in objects]
+        try:
+            j = 0
+            for i, (obj, keys) in enumerate(zip(objects, self.parameter_keys)):
+                obj.name = _placeholder % (tag, i)
+                obj.parameters = obj.parameters.copy()
+                obj.parameters.set_values(
+                    keys, [_marker(tag, j + m) for m in range(len(keys))])
+                j += len(keys)
+
+            # Remove species attributes left from a previous model, so
+            # that only the attributes set by the assembly are recorded
+            for obj in objects:
+                for name, value in _attributes(obj).items():
+                    if _is_species_attribute(name, value):
+                        delattr(obj, name)
+
+            assy.update_species(mixture, _recording_concentration[tag])
+            roles = _record_roles(model, objects)
+            if reactions:
+                assy.update_reactions(mixture)
+
+            if counts != (model.getNumParameters(), model.getNumRules(),
+                          model.getNumCompartments(), model.getNumEvents()):
+                raise TemplateError("assembly modifies model parameters")
+
+            # Species modified (sorted by name) or created by the assembly
+            new = set(model.getSpecies(i).getId()
+                      for i in range(nspecies, model.getNumSpecies()))
+            modified = sorted(
+                (table[id].getName(), id, _initial_concentration(table[id]))
+                for id, ic in log.items() if id not in new and
+                _initial_concentration(table[id]) != ic)
+            species = modified + [
+                (s.getName(), s.getId(), _initial_concentration(s))
+                for s in (model.getSpecies(i)
+                          for i in range(nspecies, model.getNumSpecies()))]
+
+            record = (species, [_reaction_record(
+                model.getReaction(j), tag, model, table)
+                for j in range(nreactions, model.getNumReactions())], roles)
+
+        finally:
+            # Undo the changes to the model and the assembly
+            del mixture.__dict__['_species_log']
+            for j in reversed(range(nreactions, model.getNumReactions())):
+                model.removeReaction(j)
+            for i in reversed(range(nspecies, model.getNumSpecies())):
+                table.pop(model.getSpecies(i).getId(), None)
+                model.removeSpecies(i)
+            # The positions of the removed species may be reused
+            mixture.__dict__.pop('_species_positions', None)
+            for id, ic in log.items():
+                if id not in table:
+                    continue
+                elif ic is None:
+                    table[id].unsetInitialConcentration()
+                else:
+                    table[id].setInitialConcentration(ic)
+            for obj, state in zip(objects, states):
+                _restore(obj, state)
+
+        return record
+
+    # Compare two recordings and classify the values that differ
+    def _classify(self, a, b):
+        if a == b:
+            return _Value('const', a)
+        if a is None or b is None:
+            raise TemplateError("inconsistent values")
+        j = round((a - 1.0) * 1024) - 1
+        if j >= 0 and a == _marker('a', j) and b == _marker('b', j):
+            return _Value('param', j)
+        # Values computed from the concentration can differ by rounding
+        ca, cb = _recording_concentration['a'], _recording_concentration['b']
+        if math.isclose(a / ca, b / cb, rel_tol=_rounding_tolerance):
+            return _Value('conc', a / ca)
+        raise TemplateError("value depends on parameters")
+
+    def _match_species(self, species_a, species_b):
+        if len(species_a) != len(species_b):
+            raise TemplateError("inconsistent species")
+        species = []
+        for (name_a, id_a, ic_a), (name_b, id_b, ic_b) in \
+                zip(species_a, species_b):
+            parts = _split(name_a, 'a')
+            if parts != _split(name_b, 'b'):
+                raise TemplateError("inconsistent species names")
+            species.append((parts, self._classify(ic_a, ic_b)))
+        return species
+
+    # Match the attributes set by two recordings to template species
+    def _match_roles(self, record_a, record_b):
+        (species_a, reactions_a, roles_a), (species_b, reactions_b, roles_b) \
+            = record_a, record_b
+        ids = [{id: i for i, (name, id, ic) in enumerate(species)}
+               for species in (species_a, species_b)]
+        if len(roles_a) != len(roles_b):
+            raise TemplateError("inconsistent species attributes")
+        roles = []
+        for (i, name, kind, a), (j, other, kind_b, b) in \
+                zip(roles_a, roles_b):
+            if (i, name, kind) != (j, other, kind_b):
+                raise TemplateError("inconsistent species attributes")
+            if kind == 'name':
+                value = _split(a, 'a')
+                if value != _split(b, 'b'):
+                    raise TemplateError("inconsistent species attributes")
+            else:
+                value = _species_ref(a, ids[0])
+                if value != _species_ref(b, ids[1]):
+                    raise TemplateError("inconsistent species attributes")
+            roles.append((i, name, value))
+        return roles
+
+    # Record the reactions for the template
+    def record_reactions(self, mixture, assy):
+        records = [self._record(mixture, assy, tag, True)
+                   for tag in ('a', 'b')]
+        if self._match_species(records[0][0], records[1][0]) != self.species:
+            raise TemplateError("inconsistent species")
+        if len(records[0][1]) != len(records[1][1]):
+            raise TemplateError("inconsistent reactions")
+
+        # Map species ids (with placeholders) to template species
+        ids = [{id: i for i, (name, id, ic) in enumerate(r[0])}
+               for r in records]
+        self.reactions = []
+        for ra, rb in zip(records[0][1], records[1][1]):
+            refs_a = [_species_ref(s, ids[0]) for s, c in ra['references']]
+            refs_b = [_species_ref(s, ids[1]) for s, c in rb['references']]
+            formula_a = _split_formula(ra['formula'], ids[0])
+            formula_b = _split_formula(rb['formula'], ids[1])
+            if (ra['prefix'], ra['reversible'], ra['roles'], refs_a,
+                formula_a, ra['rate'], [p for p, v in ra['local']]) != \
+               (rb['prefix'], rb['reversible'], rb['roles'], refs_b,
+                formula_b, rb['rate'], [p for p, v in rb['local']]):
+                raise TemplateError("inconsistent reactions")
+            self.reactions.append({
+                'prefix': ra['prefix'], 'reversible': ra['reversible'],
+                'references': [(ref, role, coeff) for ref, role, (s, coeff)
+                               in zip(refs_a, ra['roles'], ra['references'])],
+                'formula': formula_a, 'rate': ra['rate'],
+                'local': [(pa, self._classify(va, vb)) for (pa, va), (pb, vb)
+                          in zip(ra['local'], rb['local'])]})
+        self.compilable = all(r['rate'] is not None for r in self.reactions)
+
+    #
+    # Instantiation
+    #
+    def add_species(self, mixture, instance, assy=None):
+        """Create the species for an instance of the template
+
+        If the assembly is given, the attributes of the assembly and its
+        elements that refer to species (eg, `assy.dna` or `cds.dimer`)
+        are set, as they would be by its update_species() function.
+
+        """
+        model = mixture.model
+        table = _species_table(mixture)
+        compartment = mixture.compartment.getId()
+        ids = []
+        for parts, ic in self.species:
+            name = _render(parts, instance.fields)
+            species_id = _id_from_name(name)
+            species = table.get(species_id)
+            if species is None:
+                species = model.createSpecies()
+                species.setName(name)
+                species.setId(species_id)
+                species.setCompartment(compartment)
+                species.setConstant(False)
+                species.setBoundaryCondition(False)
+                species.setHasOnlySubstanceUnits(False)
+                table[species_id] = species
+            value = ic.evaluate(instance)
+            if value is not None:
+                species.setInitialConcentration(float(value))
+            ids.append(species_id)
+        instance.species_ids = ids
+
+        if assy is not None:
+            objects = _objects(assy)
+            for i, name, value in self.roles:
+                if isinstance(value, tuple):
+                    value = _render(value, instance.fields)
+                else:
+                    value = sbmlutil.species_index(
+                        mixture, value if isinstance(value, str)
+                        else ids[value])
+                setattr(objects[i], name, value)
+
+    def add_reactions(self, mixture, instance):
+        "Create the reactions for an instance of the template"
+        model = mixture.model
+        ids = instance.species_ids
+        for r in self.reactions:
+            reaction = model.createReaction()
+            reaction.setReversible(r['reversible'])
+            reaction.setFast(False)
+            reaction.setId("%s%d" % (r['prefix'], sbmlutil.reaction_id))
+            sbmlutil.reaction_id += 1
+
+            for ref, role, coeff in r['references']:
+                species_ref = reaction.createReactant() if role == 'reactant' \
+                    else reaction.createProduct()
+                species_ref.setSpecies(ref if isinstance(ref, str) else ids[ref])
+                species_ref.setConstant(True)
+                if coeff is not None:
+                    species_ref.setStoichiometry(coeff)
+
+            law = reaction.createKineticLaw()
+            for name, value in r['local']:
+                param = law.createParameter()
+                param.setId(name)
+                param.setValue(value.evaluate(instance))
+            law.setFormula("".join(
+                p if isinstance(p, str) else ids[p] for p in r['formula']))
+
+    def compile_reactions(self, instances, species_index, parameters):
+        """Generate the reactions for a list of instances as arrays
+
+        Returns the reaction ids, rate constant names, rate constants,
+        reactant index lists (padded with len(species_index)) and the
+        (species, reaction, coefficient) entries of the stoichiometry
+        matrix, with reactions ordered by instance.
+
+        """
+        N, R = len(instances), len(self.reactions)
+        nspecies = len(species_index)
+        roles = np.array([[species_index[id] for id in inst.species_ids]
+                          for inst in instances], dtype=np.intp).reshape(
+                              N, len(self.species))
+
+        def column(ref):
+            if isinstance(ref, str):
+                return np.full(N, species_index[ref], dtype=np.intp)
+            return roles[:, ref]
+
+        order = max([1] + [sum(int(c if c is not None else 1)
+                               for ref, role, c in r['references']
+                               if role == 'reactant') for r in self.reactions])
+        reactants = np.full((N, R, order), nspecies, dtype=np.intp)
+        k = np.empty((N, R))
+        rows, cols, coeffs = [], [], []
+        for j, r in enumerate(self.reactions):
+            position = 0
+            for ref, role, coeff in r['references']:
+                coeff = coeff if coeff is not None else 1
+                sign = -1 if role == 'reactant' else 1
+                rows.append(column(ref))
+                cols.append(np.arange(N) * R + j)
+                coeffs.append(np.full(N, sign * coeff, dtype=float))
+                if role == 'reactant':
+                    for m in range(int(coeff)):
+                        reactants[:, j, position] = column(ref)
+                        position += 1
+
+            # Rate constant: local parameter or global model parameter
+            local = dict(r['local'])
+            if r['rate'] in local:
+                k[:, j] = local[r['rate']].evaluate_batch(instances)
+            else:
+                k[:, j] = parameters[r['rate']]
+
+        start = sbmlutil.reaction_id
+        sbmlutil.reaction_id += N * R
+        ids = ["%s%d" % (self.reactions[m % R]['prefix'], start + m)
+               for m in range(N * R)]
+        rate_names = [r['rate'] for r in self.reactions] * N
+        return (ids, rate_names, k.ravel(), reactants.reshape(N * R, order),
+                np.concatenate(rows), np.concatenate(cols),
+                np.concatenate(coeffs))
+
+# Check whether an attribute holds a species index or species name
+def _is_species_attribute(name, value):
+    if name in _name_attributes:
+        return isinstance(value, str)
+    # The dimer flag of a repressed promoter is a bool, not an index
+    return name in _species_attributes and \
+        isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+# Record the species attributes set by the update functions
+def _record_roles(model, objects):
+    roles = []
+    for i, obj in enumerate(objects):
+        for name, value in sorted(_attributes(obj).items()):
+            if not _is_species_attribute(name, value):
+                continue
+            elif name in _name_attributes:
+                roles.append((i, name, 'name', value))
+            else:
+                roles.append((i, name, 'species',
+                              model.getSpecies(int(value)).getId()))
+    return roles
+
+# Record the information describing a reaction
+def _reaction_record(reaction, tag, model, table):
+    law = reaction.getKineticLaw()
+    references = [(ref.getSpecies(), ref.getStoichiometry()
+                   if ref.isSetStoichiometry() else None)
+                  for ref in reaction.getListOfReactants()] + \
+                 [(ref.getSpecies(), ref.getStoichiometry()
+                   if ref.isSetStoichiometry() else None)
+                  for ref in reaction.getListOfProducts()]
+    roles = ['reactant'] * reaction.getNumReactants() + \
+        ['product'] * reaction.getNumProducts()
+    if reaction.getNumModifiers() > 0 or law is None:
+        raise TemplateError("unsupported reaction")
+
+    # Name of the rate constant (if the reaction is mass-action)
+    from .network import _mass_action_parameter
+    try:
+        rate = _mass_action_parameter(reaction, table)
+    except (NotImplementedError, ValueError):
+        rate = None
+
+    return {
+        'prefix': re.sub(r"\d+$", "", reaction.getId()),
+        'reversible': reaction.getReversible(),
+        'references': references, 'roles': roles,
+        'formula': libsbml.formulaToL3String(law.getMath()),
+        'rate': rate,
+        'local': [(p.getId(), p.getValue())
+                  for p in law.getListOfParameters()]}
+
+# Convert a species id to a template reference (index or literal id)
+def _species_ref(species_id, ids):
+    if _placeholder_pattern.search(species_id) is None:
+        return species_id
+    if species_id not in ids:
+        raise TemplateError("unknown species %s" % species_id)
+    return ids[species_id]
+
+# Split a kinetic law into literal text and species references
+def _split_formula(formula, ids):
+    parts, position = [], 0
+    for match in _identifier_pattern.finditer(formula):
+        name = match.group()
+        if _placeholder_pattern.search(name) is not None:
+            parts.append(formula[position:match.start()])
+            parts.append(_species_ref(name, ids))
+            position = match.end()
+    parts.append(formula[position:])
+    return [p for p in parts if p != ""]
+
+class TemplateCache:
+    """Templates used while building the model for a mixture
+
+    The cache is created by `Mixture._update_sbml_model()` and is used
+    to create the species and reactions for DNA assemblies.  Assemblies
+    that can not be templated (or whose template could not be recorded,
+    which is signalled by a TemplateError or NotImplementedError) are
+    created using their own update functions; other errors raised while
+    recording a template are propagated.
+
+    Data attributes
+    ---------------
+    templates   Templates, indexed by assembly signature (dict); None
+                marks a signature that can not be templated
+    instances   Template and instance for each templated component,
+                indexed by position in the mixture (dict)
+    deferred    Template instances whose reactions were not added to the
+                model (list of (template, instance) pairs)
+
+    """
+    def __init__(self, mixture, defer=False):
+        # The mixture holds the cache, so keep a weak reference to it
+        # (to avoid a reference cycle that would keep the SBML document
+        # alive after the mixture is discarded)
+        self._mixture = weakref.ref(mixture)
+        self.defer = defer
+        self.templates = {}
+        self.instances = {}
+        self.deferred = []
+        self._mechanism_keys = {}
+
+    @property
+    def mixture(self):
+        return self._mixture()
+
+    def add_species(self, position, component, concentration):
+        """Create the species for a component using a template
+
+        Returns False if the component can not be templated.
+
+        """
+        if not getattr(component, 'template', False):
+            return False
+        signature = assembly_signature(
+            self.mixture, component, self._mechanism_keys)
+        if signature is None:
+            return False
+        template = self.templates.get(signature, False)
+        if template is False:
+            try:
+                template = AssemblyTemplate(self.mixture, component, signature)
+            except (TemplateError, NotImplementedError):
+                template = None
+            self.templates[signature] = template
+        if template is None:
+            return False
+
+        instance = template.bind(component, concentration)
+        template.add_species(self.mixture, instance, component)
+        self.instances[position] = (template, instance)
+        return True
+
+    def add_reactions(self, position, component, concentration):
+        """Create the reactions for a component using a template
+
+        Returns False if the component was not templated (or if its
+        reactions can not be templated), in which case its species and
+        reactions should be created using its update functions.
+
+        """
+        if position not in self.instances:
+            return False
+        template, instance = self.instances[position]
+        if template.reactions is None:
+            try:
+                template.record_reactions(self.mixture, component)
+            except (TemplateError, NotImplementedError):
+                template.reactions = False
+        if template.reactions is False:
+            return False
+
+        if self.defer and template.compilable:
+            self.deferred.append((template, instance))
+        else:
+            template.add_reactions(self.mixture, instance)
+        return True
@@ -0,0 +1,251 @@
+# validate.py - structural checks for mixtures and reaction networks
+# AP, 19 Oct 2026
+#
+# This file contains functions for checking the model generated by a
+# mixture for structural problems (undefined or unused species, missing
+# rate constants, duplicate reactions and values that look like they
+# were given in the wrong units) before it is exported or simulated.
+# The checks work on the compiled reaction network, using vectorized
+# operations on the reactant and stoichiometry arrays, so that they are
+# fast enough to be run every time a model is built.
+#
+# Copyright (c) 2018, Build-A-Cell. All rights reserved.
+# See LICENSE file in the project root directory for details.
+
+import numpy as np
+
+from .network import ReactionNetwork, compile_sbml_model
+
+class ValidationIssue:
+    """Problem found when validating a model
+
+    Data attributes
+    ---------------
+    severity    'error' (the model is not usable) or 'warning' (str)
+    check       Name of the check that found the problem (str)
+    target      Id of the species or reaction involved (str)
+    message     Description of the problem (str)
+
+    """
+    def __init__(self, severity, check, target, message):
+        self.severity = severity
+        self.check = check
+        self.target = target
+        self.message = message
+
+    def __str__(self):
+        return "%s: %s" % (self.severity, self.message)
+
+    def __repr__(self):
+        return "ValidationIssue(%r, %r, %r, %r)" % (
+            self.severity, self.check, self.target, self.message)
+
+class ValidationError(ValueError):
+    "Model has structural errors"
+
+class ValidationReport:
+    """Result of validating a mixture or reaction network
+
+    Data attributes
+    ---------------
+    network     Compiled reaction network (None if the model could not
+                be built)
+    issues      Problems found in the model (list of ValidationIssue)
+    errors      Issues with severity 'error' (list of ValidationIssue)
+    warnings    Issues with severity 'warning' (list of ValidationIssue)
+    ok          True if no errors were found (bool)
+
+    """
+    def __init__(self, network, issues):
+        self.network = network
+        self.issues = list(issues)
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue.severity == 'error']
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue.severity == 'warning']
+
+    @property
+    def ok(self):
+        return len(self.errors) == 0
+
+    def find(self, check):
+        "Return the issues found by a given check"
+        return [issue for issue in self.issues if issue.check == check]
+
+    def raise_errors(self):
+        "Raise a ValidationError if any errors were found"
+        if not self.ok:
+            raise ValidationError("\n".join(str(e) for e in self.errors))
+
+    def __str__(self):
+        if not self.issues:
+            return "No problems found"
+        return "\n".join(str(issue) for issue in self.issues)
+
+# Validate a mixture
+def validate(mixture, scale_decades=6):
+    """Check a mixture (or compiled network) for structural problems
+
+    The following checks are performed:
+
+      build                 the model could not be generated (error)
+      undefined_species     a reaction uses a species that is not
+                            defined in the model (error)
+      kinetic_law           a kinetic law is not mass-action (error)
+      undefined_parameter   a rate constant is not defined (error)
+      missing_rate          a rate constant has no value (error)
+      negative_rate         a rate constant is negative (error)
+      initial_concentration an initial concentration is negative or
+                            not finite (error)
+      unreferenced_species  a species is not used by any reaction
+      unproduced_species    a species is a reactant, but has zero
+                            initial concentration and is never produced
+      duplicate_reaction    two reactions have the same reactants and
+                            net stoichiometry
+      scaling               a rate constant (compared with other
+                            reactions of the same order) or an initial
+                            concentration differs from the median by
+                            more than `scale_decades` orders of
+                            magnitude, which usually means it was given
+                            in the wrong units
+
+    Returns a ValidationReport.  Use `report.raise_errors()` to turn
+    errors into an exception.
+
+    """
+    if isinstance(mixture, ReactionNetwork):
+        network, problems = mixture, []
+    else:
+        # Build the model, recording problems instead of stopping
+        try:
+            mixture._update_sbml_model(defer_templates=True)
+        except (NameError, KeyError, TypeError, ValueError) as error:
+            return ValidationReport(None, [ValidationIssue(
+                'error', 'build', mixture.name,
+                "model for %s could not be built: %s" % (mixture.name, error))])
+        templates, problems = mixture._templates, []
+        network = compile_sbml_model(
+            mixture.model, name=mixture.name, issues=problems,
+            deferred=templates.deferred if templates is not None else ())
+        if templates is not None and templates.deferred:
+            mixture._SBMLdoc = None     # model lacks templated reactions
+
+    issues = [ValidationIssue('error', check, target, message)
+              for check, target, message in problems]
+    reported = set(target for check, target, message in problems)
+    issues += _check_rates(network, reported)
+    issues += _check_species(network)
+    issues += _check_duplicates(network)
+    issues += _check_scaling(network, scale_decades)
+    return ValidationReport(network, issues)
+
+# Check the values of the rate constants
+def _check_rates(network, reported):
+    issues = []
+    for j in np.flatnonzero(~np.isfinite(network.k)):
+        if network.reactions[j] not in reported:
+            issues.append(ValidationIssue(
+                'error', 'missing_rate', network.reactions[j],
+                "reaction %s: rate constant %s has no value" %
+                (network.reactions[j], network.rate_names[j])))
+    for j in np.flatnonzero(network.k < 0):
+        issues.append(ValidationIssue(
+            'error', 'negative_rate', network.reactions[j],
+            "reaction %s: rate constant %s is negative (%g)" %
+            (network.reactions[j], network.rate_names[j], network.k[j])))
+    return issues
+
+# Check the species for bad initial conditions and missing reactions
+def _check_species(network):
+    issues = []
+    n = network.nspecies
+    for i in np.flatnonzero(~np.isfinite(network.x0) | (network.x0 < 0)):
+        issues.append(ValidationIssue(
+            'error', 'initial_concentration', network.species[i],
+            "species %s: invalid initial concentration (%g)" %
+            (network.species[i], network.x0[i])))
+
+    stoich = network.stoichiometry.tocsc()
+    consumed = np.zeros(n + 1, dtype=bool)
+    consumed[network.reactants.ravel()] = True
+    produced = np.zeros(n, dtype=bool)
+    produced[stoich.indices[stoich.data > 0]] = True
+    referenced = consumed[:n].copy()
+    referenced[stoich.indices] = True
+
+    for i in np.flatnonzero(~referenced):
+        issues.append(ValidationIssue(
+            'warning', 'unreferenced_species', network.species[i],
+            "species %s is not used by any reaction" % network.species[i]))
+    for i in np.flatnonzero(consumed[:n] & ~produced & (network.x0 == 0)):
+        issues.append(ValidationIssue(
+            'warning', 'unproduced_species', network.species[i],
+            "species %s is a reactant but is never produced and has zero "
+            "initial concentration" % network.species[i]))
+    return issues
+
+# Look for reactions with the same reactants and net stoichiometry
+def _check_duplicates(network):
+    if network.nreactions == 0:
+        return []
+    stoich = network.stoichiometry.tocsc()
+    stoich.sort_indices()
+
+    # Store the nonzero entries of each column in padded arrays
+    counts = np.diff(stoich.indptr)
+    width = max(int(counts.max()), 1)
+    offsets = np.arange(stoich.nnz) - np.repeat(stoich.indptr[:-1], counts)
+    columns = np.repeat(np.arange(network.nreactions), counts)
+    species = np.full((network.nreactions, width), -1.0)
+    coeffs = np.zeros((network.nreactions, width))
+    species[columns, offsets] = stoich.indices
+    coeffs[columns, offsets] = stoich.data
+
+    keys = np.hstack([np.sort(network.reactants, axis=1), species, coeffs])
+    _, inverse, counts = np.unique(
+        keys, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+
+    issues = []
+    for group in np.flatnonzero(counts > 1):
+        ids = [network.reactions[j] for j in np.flatnonzero(inverse == group)]
+        issues.append(ValidationIssue(
+            'warning', 'duplicate_reaction', ids[0],
+            "reactions %s have the same reactants and products" %
+            ", ".join(ids)))
+    return issues
+
+# Look for values that are very different from similar values
+def _check_scaling(network, scale_decades):
+    issues = []
+    order = np.sum(network.reactants < network.nspecies, axis=1)
+    for value in np.unique(order):
+        rxns = np.flatnonzero((order == value) & np.isfinite(network.k) &
+                              (network.k > 0))
+        for j in _outliers(network.k[rxns], scale_decades):
+            j = rxns[j]
+            issues.append(ValidationIssue(
+                'warning', 'scaling', network.reactions[j],
+                "reaction %s: rate constant %s = %g is far from the other "
+                "order %d rate constants" % (network.reactions[j],
+                network.rate_names[j], network.k[j], value)))
+
+    species = np.flatnonzero(np.isfinite(network.x0) & (network.x0 > 0))
+    for i in _outliers(network.x0[species], scale_decades):
+        i = species[i]
+        issues.append(ValidationIssue(
+            'warning', 'scaling', network.species[i],
+            "species %s: initial concentration %g is far from the other "
+            "initial concentrations" % (network.species[i], network.x0[i])))
+    return issues
+
+# Find the positive values that are far from the median (in log scale)
+def _outliers(values, decades):
+    if len(values) < 3:
+        return []
+    logs = np.log10(values)
+    return np.flatnonzero(np.abs(logs - np.median(logs)) > decades)